@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class AuthenticationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.authentication'
+
+    def ready(self):
+        from django.contrib.auth.models import User
+        from django.db.models.signals import post_delete, post_save
+
+        from .models import sync_user_email
+        from .user_cache import invalidate_cached_user
+
+        post_save.connect(sync_user_email, sender=User, dispatch_uid='sync_user_email')
+        post_save.connect(invalidate_cached_user, sender=User, dispatch_uid='invalidate_cached_user_save')
+        post_delete.connect(invalidate_cached_user, sender=User, dispatch_uid='invalidate_cached_user_delete')
@@ -0,0 +1,71 @@
+from django.conf import settings
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .revocation import revocation_filter
+from .user_cache import user_cache
+
+
+# Claims CustomTokenObtainPairSerializer.get_token adds for token users.
+TOKEN_USER_CLAIMS = ('username', 'email', 'is_staff')
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    ``JWTAuthentication`` that rejects revoked access tokens and resolves
+    users through the per-process user cache.
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if settings.TOKEN_REVOCATION_CHECK_ACCESS and revocation_filter.is_revoked(
+            validated_token.get(api_settings.JTI_CLAIM, '')
+        ):
+            raise InvalidToken("Token is blacklisted")
+        return validated_token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        user = user_cache.get(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+        elif api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed("The user's password has been changed.", code='password_changed')
+        return user
+
+
+class TokenUserJWTAuthentication(CachedJWTAuthentication):
+    """
+    For safe-method requests, builds ``request.user`` from the token claims
+    (a ``TokenUser`` exposing ``id``, ``username``, ``email`` and
+    ``is_staff``) without loading the ``User``. Other methods, and tokens
+    that lack those claims, get the full cached user.
+
+    Views using it must only read those attributes, filtering on
+    ``owner_id=request.user.pk`` rather than ``owner=request.user``.
+    """
+
+    def authenticate(self, request):
+        self.token_user_allowed = request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        if self.token_user_allowed and all(claim in validated_token for claim in TOKEN_USER_CLAIMS):
+            if api_settings.USER_ID_CLAIM not in validated_token:
+                raise InvalidToken("Token contained no recognizable user identification")
+            return api_settings.TOKEN_USER_CLASS(validated_token)
+        return super().get_user(validated_token)
+
+
+TOKEN_USER_AUTHENTICATION_CLASSES = [TokenUserJWTAuthentication, SessionAuthentication]
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.authentication.revocation import purge_expired_tokens
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired outstanding tokens and their blacklist entries in batches. "
+        "Run it periodically (e.g. from cron) to keep the token tables bounded."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help="Number of tokens deleted per statement (default: 1000).",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        deleted = 0
+        for count in purge_expired_tokens(options['batch_size']):
+            deleted += count
+            self.stdout.write(f"Deleted {deleted} expired tokens")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Purged {deleted} expired tokens in {time.perf_counter() - started:.2f}s."
+        ))
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.3 on 2026-10-17 00:06
+
+import django.db.models.deletion
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def backfill_user_emails(apps, schema_editor):
+    # The oldest account keeps an address shared (in any case) by several users.
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    UserEmail = apps.get_model('authentication', 'UserEmail')
+    db_alias = schema_editor.connection.alias
+
+    last_pk = None
+    while True:
+        queryset = User.objects.using(db_alias).exclude(email='').order_by('pk')
+        if last_pk is not None:
+            queryset = queryset.filter(pk__gt=last_pk)
+        batch = list(queryset.values_list('pk', 'email')[:BACKFILL_BATCH_SIZE])
+        if not batch:
+            break
+        emails = {}
+        for pk, email in batch:
+            if email.strip():
+                emails.setdefault(email.strip().lower(), pk)
+        claimed = set(
+            UserEmail.objects.using(db_alias)
+            .alias(email_lower=Lower('email'))
+            .filter(email_lower__in=list(emails))
+            .values_list('email', flat=True)
+        )
+        UserEmail.objects.using(db_alias).bulk_create([
+            UserEmail(user_id=pk, email=email)
+            for email, pk in emails.items()
+            if email not in claimed
+        ])
+        last_pk = batch[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(help_text='Normalized (lower-cased) copy of User.email', max_length=254)),
+                ('user', models.OneToOneField(help_text='User this address belongs to', on_delete=django.db.models.deletion.CASCADE, related_name='normalized_email', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'User Email',
+                'verbose_name_plural': 'User Emails',
+                'db_table': 'user_emails',
+                'constraints': [models.UniqueConstraint(django.db.models.functions.text.Lower('email'), name='user_emails_email_lower_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_user_emails, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.3 on 2026-10-17 01:20
+
+from django.db import migrations, models
+
+
+# The blacklist tables belong to simplejwt, so their indexes are created
+# through the schema editor rather than declared on the models.
+INDEXES = [
+    ('BlacklistedToken', models.Index(fields=['blacklisted_at'], name='token_blacklisted_at_idx')),
+    ('OutstandingToken', models.Index(fields=['expires_at'], name='token_outstanding_expires_idx')),
+]
+
+
+def add_indexes(apps, schema_editor):
+    for model_name, index in INDEXES:
+        schema_editor.add_index(apps.get_model('token_blacklist', model_name), index)
+
+
+def remove_indexes(apps, schema_editor):
+    for model_name, index in INDEXES:
+        schema_editor.remove_index(apps.get_model('token_blacklist', model_name), index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0001_user_emails'),
+        ('token_blacklist', '0012_alter_outstandingtoken_user'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_indexes, remove_indexes),
+    ]
@@ -1,3 +1,61 @@
+from django.conf import settings
 from django.db import models
+from django.db.models.functions import Lower
 
-# Create your models here.
+
+def normalize_email(value):
+    return (value or '').strip().lower()
+
+
+class UserEmailQuerySet(models.QuerySet):
+
+    def matching(self, email):
+        """Rows whose address equals ``email`` ignoring case, served by the lower(email) index."""
+        return self.alias(email_lower=Lower('email')).filter(email_lower=normalize_email(email))
+
+
+class UserEmail(models.Model):
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='normalized_email',
+        help_text="User this address belongs to"
+    )
+    email = models.EmailField(help_text="Normalized (lower-cased) copy of User.email")
+
+    objects = UserEmailQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'user_emails'
+        verbose_name = 'User Email'
+        verbose_name_plural = 'User Emails'
+        constraints = [
+            models.UniqueConstraint(Lower('email'), name='user_emails_email_lower_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.email} - {self.user_id}"
+
+
+def email_owner_id(email, exclude_user=None):
+    """Return the id of the user owning ``email`` (any case), or ``None``."""
+    queryset = UserEmail.objects.matching(email)
+    if exclude_user is not None:
+        queryset = queryset.exclude(user_id=exclude_user.pk)
+    return queryset.values_list('user_id', flat=True).first()
+
+
+def sync_user_email(sender, instance, **kwargs):
+    """
+    Mirror ``User.email`` into ``UserEmail`` after every save. An address
+    already claimed by another account is not taken over: that user simply
+    has no email login until the conflict is resolved.
+    """
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and 'email' not in update_fields:
+        return
+    email = normalize_email(instance.email)
+    if not email or email_owner_id(email, exclude_user=instance) is not None:
+        UserEmail.objects.filter(user_id=instance.pk).delete()
+        return
+    UserEmail.objects.update_or_create(user_id=instance.pk, defaults={'email': email})
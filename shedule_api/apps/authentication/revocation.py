@@ -0,0 +1,175 @@
+"""
+Token revocation backed by the simplejwt blacklist tables.
+
+Every process keeps a Bloom filter over the ``jti`` of blacklisted tokens,
+topped up from ``BlacklistedToken`` at most every
+``TOKEN_REVOCATION_REFRESH_INTERVAL`` seconds. A token whose ``jti`` misses
+the filter is not revoked and costs no query; only filter hits (revoked
+tokens and rare false positives) are confirmed against the database.
+Both read the primary, so a token revoked at logout is never accepted
+again from a lagging replica.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from schedule_api.replicas import use_primary
+
+
+# Rows are read by blacklisted_at; the overlap picks up transactions that
+# committed late with an earlier timestamp.
+REFRESH_OVERLAP = timedelta(minutes=1)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter sized for ``capacity`` keys at ``error_rate``."""
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        # Double hashing over one 128-bit digest (Kirsch-Mitzenmacher).
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + index * second) % self.size for index in range(self.hashes)]
+
+    def add(self, key):
+        positions = self._positions(key)
+        if all(self.bits[position >> 3] & (1 << (position & 7)) for position in positions):
+            return
+        for position in positions:
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key)
+        )
+
+
+class RevocationFilter:
+
+    def __init__(self):
+        self.bloom = None
+        self.watermark = None
+        self.checked_at = None
+        self.lock = threading.Lock()
+
+    def needs_refresh(self):
+        return (
+            self.checked_at is None
+            or time.monotonic() - self.checked_at >= settings.TOKEN_REVOCATION_REFRESH_INTERVAL
+        )
+
+    def refresh(self):
+        """Add tokens blacklisted since the last refresh, rebuilding the filter when it is full."""
+        with self.lock:
+            if not self.needs_refresh():
+                return
+            started = timezone.now()
+            bloom = self.bloom
+            if bloom is not None:
+                jtis = list(
+                    BlacklistedToken.objects.filter(blacklisted_at__gte=self.watermark - REFRESH_OVERLAP)
+                    .order_by().values_list('token__jti', flat=True)
+                )
+            if bloom is None or bloom.count + len(jtis) > bloom.capacity:
+                # Expired tokens fail validation anyway, so a rebuild drops them.
+                jtis = list(
+                    BlacklistedToken.objects.filter(token__expires_at__gt=started)
+                    .order_by().values_list('token__jti', flat=True)
+                )
+                bloom = BloomFilter(
+                    max(settings.TOKEN_REVOCATION_FILTER_CAPACITY, 2 * len(jtis)),
+                    settings.TOKEN_REVOCATION_FILTER_ERROR_RATE,
+                )
+            for jti in jtis:
+                bloom.add(jti)
+
+            self.bloom = bloom
+            self.watermark = started
+            self.checked_at = time.monotonic()
+
+    def add(self, jti):
+        if self.bloom is not None:
+            self.bloom.add(jti)
+
+    def might_be_revoked(self, jti):
+        return jti in self.bloom
+
+    def is_revoked(self, jti):
+        with use_primary():
+            if self.needs_refresh():
+                self.refresh()
+            if not self.might_be_revoked(jti):
+                return False
+            return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+    async def ais_revoked(self, jti):
+        with use_primary():
+            if self.needs_refresh():
+                await sync_to_async(self.refresh)()
+            if not self.might_be_revoked(jti):
+                return False
+            return await BlacklistedToken.objects.filter(token__jti=jti).aexists()
+
+    def clear(self):
+        with self.lock:
+            self.bloom = self.watermark = self.checked_at = None
+
+
+revocation_filter = RevocationFilter()
+
+
+def revoke_token(token):
+    """
+    Blacklist ``token`` (refresh or access) and add it to this process's
+    filter right away; other processes see it after their next refresh.
+    """
+    jti = token[api_settings.JTI_CLAIM]
+    User = get_user_model()
+    user = User.objects.filter(
+        **{api_settings.USER_ID_FIELD: token.get(api_settings.USER_ID_CLAIM)}
+    ).first()
+    outstanding, _ = OutstandingToken.objects.get_or_create(
+        jti=jti,
+        defaults={
+            'user': user,
+            'created_at': token.current_time,
+            'token': str(token),
+            'expires_at': datetime_from_epoch(token['exp']),
+        },
+    )
+    BlacklistedToken.objects.get_or_create(token=outstanding)
+    revocation_filter.add(jti)
+
+
+def purge_expired_tokens(batch_size, now=None):
+    """
+    Delete expired outstanding tokens, and with them their blacklist
+    entries, ``batch_size`` rows per statement. Yields the rows deleted by each batch.
+    """
+    now = now or timezone.now()
+    expired = OutstandingToken.objects.filter(expires_at__lte=now).order_by('pk')
+    while True:
+        pks = list(expired.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return
+        BlacklistedToken.objects.filter(token_id__in=pks).delete()
+        OutstandingToken.objects.filter(pk__in=pks).delete()
+        yield len(pks)
@@ -1,7 +1,9 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
+from django.db import IntegrityError, transaction
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from .models import UserEmail, email_owner_id
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):    
@@ -23,14 +25,20 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
 
     def validate_email(self, value):
         
-        if User.objects.filter(email=value).exists():
+        if email_owner_id(value) is not None:
             raise serializers.ValidationError("A user with this email already exists.")
         return value
 
     def create(self, validated_data):
         
         validated_data.pop('password_confirm')
-        user = User.objects.create_user(**validated_data)
+        try:
+            # A concurrent registration can claim the address between
+            # validation and the user_emails insert.
+            with transaction.atomic():
+                user = User.objects.create_user(**validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError({'email': ["A user with this email already exists."]})
         return user
 
 
@@ -71,6 +79,15 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         return token
 
     def validate(self, attrs):
+        # Accept an email address in the username field. Usernames may contain
+        # '@' too, so an exact username match wins over the email lookup.
+        login = attrs.get(self.username_field, '')
+        if '@' in login and not User.objects.filter(**{User.USERNAME_FIELD: login}).exists():
+            username = UserEmail.objects.matching(login).values_list(
+                f'user__{User.USERNAME_FIELD}', flat=True
+            ).first()
+            if username is not None:
+                attrs[self.username_field] = username
         data = super().validate(attrs)        
         
         data.update({
@@ -95,6 +112,12 @@ class UserProfileSerializer(serializers.ModelSerializer):
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 'date_joined', 'is_staff']
         read_only_fields = ['id', 'username', 'date_joined', 'is_staff']
 
+    def validate_email(self, value):
+        
+        if value and email_owner_id(value, exclude_user=self.instance) is not None:
+            raise serializers.ValidationError("A user with this email already exists.")
+        return value
+
 
 class ChangePasswordSerializer(serializers.Serializer):
     
@@ -1,9 +1,24 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import skipUnless
+
 from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework.test import APITestCase
 from rest_framework import status
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from .models import UserEmail, email_owner_id
+from .revocation import BloomFilter, revocation_filter
+from .serializers import CustomTokenObtainPairSerializer, UserProfileSerializer
+from .user_cache import user_cache
+
 
 class AuthenticationAPITest(APITestCase):   
     
@@ -71,6 +86,42 @@ class AuthenticationAPITest(APITestCase):
         self.assertIn('user', response.data)
         self.assertEqual(response.data['user']['username'], 'existinguser')
 
+    def test_user_registration_existing_email_any_case(self):
+        
+        invalid_data = self.user_data.copy()
+        invalid_data['email'] = ' Existing@EXAMPLE.com'
+        
+        url = reverse('authentication:register')
+        response = self.client.post(url, invalid_data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('email', response.data)
+
+    def test_user_login_with_email(self):
+        
+        login_data = {
+            'username': 'EXISTING@example.com',
+            'password': 'testpass123'
+        }
+        
+        url = reverse('authentication:login')
+        response = self.client.post(url, login_data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['user']['username'], 'existinguser')
+
+    def test_username_with_at_sign_wins_over_email(self):
+        
+        User.objects.create_user(username='bob@example.com', password='bobpass123')
+        User.objects.create_user(username='robert', email='Bob@example.com', password='robertpass123')
+        url = reverse('authentication:login')
+
+        response = self.client.post(url, {'username': 'bob@example.com', 'password': 'bobpass123'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['user']['username'], 'bob@example.com')
+        response = self.client.post(url, {'username': 'BOB@example.com', 'password': 'robertpass123'}, format='json')
+        self.assertEqual(response.data['user']['username'], 'robert')
+
     def test_user_login_invalid_credentials(self):
         
         login_data = {
@@ -222,4 +273,241 @@ class AuthenticationAPITest(APITestCase):
         
         for url in endpoints:
             response = self.client.get(url)
-            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
\ No newline at end of file
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+class UserEmailTest(TestCase):
+
+    def setUp(self):
+        
+        self.user = User.objects.create_user(username='first', email='Shared@Example.com')
+
+    def test_email_is_mirrored_normalized(self):
+        
+        self.assertEqual(self.user.normalized_email.email, 'shared@example.com')
+        self.assertEqual(email_owner_id('SHARED@example.COM'), self.user.pk)
+
+        self.user.email = 'renamed@example.com'
+        self.user.save()
+        self.assertIsNone(email_owner_id('shared@example.com'))
+        self.assertEqual(email_owner_id('Renamed@example.com'), self.user.pk)
+
+        self.user.email = ''
+        self.user.save()
+        self.assertFalse(UserEmail.objects.filter(user=self.user).exists())
+
+    def test_claimed_address_is_not_taken_over(self):
+        
+        other = User.objects.create_user(username='second', email='shared@example.com')
+
+        self.assertFalse(UserEmail.objects.filter(user=other).exists())
+        self.assertEqual(email_owner_id('shared@example.com'), self.user.pk)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            UserEmail.objects.create(user=other, email='SHARED@example.com')
+
+    def test_profile_update_rejects_claimed_address(self):
+        
+        other = User.objects.create_user(username='second', email='other@example.com')
+        serializer = UserProfileSerializer(other, data={'email': 'shared@EXAMPLE.com'}, partial=True)
+
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('email', serializer.errors)
+        self.assertTrue(UserProfileSerializer(self.user, data={'email': 'SHARED@example.com'}, partial=True).is_valid())
+
+    @skipUnless(connection.vendor == 'sqlite', "Query plan text is SQLite specific")
+    def test_lookup_uses_lower_email_index(self):
+        
+        sql, params = UserEmail.objects.matching('Shared@Example.com').values('user_id').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+
+        self.assertIn('user_emails_email_lower_uniq', plan)
+
+
+class UserResolutionTest(APITestCase):
+
+    def setUp(self):
+        
+        user_cache.clear()
+        self.user = User.objects.create_user(
+            username='cacheduser',
+            email='cached@example.com',
+            password='testpass123'
+        )
+        access = CustomTokenObtainPairSerializer.get_token(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    def _user_queries(self, url):
+        
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, [query for query in context.captured_queries if 'auth_user' in query['sql']]
+
+    def test_read_only_endpoints_use_token_claims(self):
+        
+        url = reverse('schedules:schedule-statistics')
+        response, queries = self._user_queries(url)
+
+        self.assertEqual(queries, [])
+        self.assertEqual(response.data['user'], 'cacheduser')
+
+    def test_token_without_claims_falls_back_to_user(self):
+        
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+        response, queries = self._user_queries(reverse('schedules:schedule-statistics'))
+
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(response.data['user'], 'cacheduser')
+
+    def test_full_user_is_cached(self):
+        
+        url = reverse('authentication:profile')
+        _, first = self._user_queries(url)
+        _, second = self._user_queries(url)
+
+        self.assertEqual(len(first), 1)
+        self.assertEqual(second, [])
+
+    @override_settings(AUTH_USER_CACHE_TTL=0)
+    def test_cache_can_be_disabled(self):
+        
+        url = reverse('authentication:profile')
+        self._user_queries(url)
+        _, queries = self._user_queries(url)
+
+        self.assertEqual(len(queries), 1)
+
+    def test_profile_and_password_changes_invalidate_cache(self):
+        
+        url = reverse('authentication:profile')
+        self._user_queries(url)
+
+        self.client.patch(url, {'first_name': 'Renamed'}, format='json')
+        response, queries = self._user_queries(url)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(response.data['first_name'], 'Renamed')
+
+        response = self.client.post(reverse('authentication:change-password'), {
+            'old_password': 'testpass123',
+            'new_password': 'newpass12345',
+            'new_password_confirm': 'newpass12345',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(user_cache.get(self.user.pk))
+
+    def test_cache_evicts_least_recently_used(self):
+        
+        other = User.objects.create_user(username='other', password='testpass123')
+        with override_settings(AUTH_USER_CACHE_SIZE=1):
+            user_cache.set(self.user.pk, self.user)
+            user_cache.set(other.pk, other)
+
+        self.assertIsNone(user_cache.get(self.user.pk))
+        cached = user_cache.get(other.pk)
+        self.assertEqual(cached, other)
+        self.assertIsNot(cached, user_cache.get(other.pk))
+
+
+class TokenRevocationTest(APITestCase):
+
+    def setUp(self):
+        
+        revocation_filter.clear()
+        self.user = User.objects.create_user(username='revoked', password='testpass123')
+        self.refresh = RefreshToken.for_user(self.user)
+        self.access = self.refresh.access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+
+    def _blacklist_queries(self, url):
+        
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        return response, [query for query in context.captured_queries if 'token_blacklist' in query['sql']]
+
+    def test_bloom_filter(self):
+        
+        bloom = BloomFilter(1000, 0.01)
+        for index in range(1000):
+            bloom.add(f'revoked-{index}')
+
+        self.assertTrue(all(f'revoked-{index}' in bloom for index in range(1000)))
+        false_positives = sum(f'valid-{index}' in bloom for index in range(10000))
+        self.assertLess(false_positives, 300)
+
+    def test_logout_revokes_refresh_and_access_tokens(self):
+        
+        url = reverse('authentication:profile')
+        response = self.client.post(reverse('authentication:logout'), {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.post(reverse('authentication:token-refresh'), {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(
+            self.client.get(reverse('schedules_async:protected-endpoint')).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+
+    def test_valid_tokens_skip_the_blacklist_query(self):
+        
+        url = reverse('authentication:profile')
+        RefreshToken.for_user(self.user).blacklist()
+        _, first = self._blacklist_queries(url)
+        response, second = self._blacklist_queries(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(first), 1)
+        self.assertEqual(second, [])
+
+    def test_revocations_from_other_processes_apply_after_refresh(self):
+        
+        url = reverse('authentication:profile')
+        self.client.get(url)
+        # Blacklisted directly in the database, as another worker would.
+        outstanding = OutstandingToken.objects.create(
+            jti=self.access['jti'], token=str(self.access), expires_at=timezone.now() + timedelta(hours=1)
+        )
+        BlacklistedToken.objects.create(token=outstanding)
+
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+        with override_settings(TOKEN_REVOCATION_REFRESH_INTERVAL=0):
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @skipUnless(connection.vendor == 'sqlite', "Query plan check uses SQLite's EXPLAIN QUERY PLAN")
+    def test_refresh_queries_use_indexes(self):
+        
+        RefreshToken.for_user(self.user).blacklist()
+        with CaptureQueriesContext(connection) as context:
+            revocation_filter.refresh()
+            with override_settings(TOKEN_REVOCATION_REFRESH_INTERVAL=0):
+                revocation_filter.refresh()
+
+        queries = [query['sql'] for query in context.captured_queries]
+        self.assertEqual(len(queries), 2)
+        with connection.cursor() as cursor:
+            for sql in queries:
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+                plan = [row[-1] for row in cursor.fetchall()]
+                self.assertFalse([line for line in plan if line.startswith('SCAN ')], '\n'.join(plan))
+
+    def test_purge_expired_tokens(self):
+        
+        now = timezone.now()
+        for index in range(5):
+            token = OutstandingToken.objects.create(
+                jti=f'expired-{index}', token='', expires_at=now - timedelta(minutes=1)
+            )
+            if index % 2:
+                BlacklistedToken.objects.create(token=token)
+        RefreshToken.for_user(self.user).blacklist()
+
+        out = StringIO()
+        call_command('purge_expired_tokens', batch_size=2, stdout=out)
+
+        self.assertIn('Purged 5 expired tokens', out.getvalue())
+        self.assertFalse(OutstandingToken.objects.filter(expires_at__lte=now).exists())
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+        self.assertEqual(OutstandingToken.objects.count(), 2)
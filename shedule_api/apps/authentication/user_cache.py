@@ -0,0 +1,62 @@
+"""
+Per-process LRU cache of authenticated ``User`` rows.
+
+Entries live for ``AUTH_USER_CACHE_TTL`` seconds and the cache holds at most
+``AUTH_USER_CACHE_SIZE`` users. Saving or deleting a user (profile update,
+password change, deactivation) evicts it in the process that made the change;
+other processes pick the change up when their entry expires.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class UserCache:
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, user_id):
+        """Return a private copy of the cached user, or ``None``."""
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at <= time.monotonic():
+                del self.entries[user_id]
+                return None
+            self.entries.move_to_end(user_id)
+        # Views modify request.user (set_password, profile updates) before
+        # saving, so callers never share the cached instance.
+        return copy.copy(user)
+
+    def set(self, user_id, user):
+        ttl = settings.AUTH_USER_CACHE_TTL
+        size = settings.AUTH_USER_CACHE_SIZE
+        if ttl <= 0 or size <= 0:
+            return
+        with self.lock:
+            self.entries[user_id] = (time.monotonic() + ttl, copy.copy(user))
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+user_cache = UserCache()
+
+
+def invalidate_cached_user(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
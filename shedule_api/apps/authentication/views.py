@@ -2,7 +2,7 @@ from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 from django.contrib.auth.models import User
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
@@ -12,6 +12,7 @@ from .serializers import (
     UserProfileSerializer,
     ChangePasswordSerializer,
 )
+from .revocation import revoke_token
 
 
 class UserRegistrationAPIView(generics.CreateAPIView):
@@ -155,7 +156,7 @@ def change_password(request):
 
 @swagger_auto_schema(
     method='post',
-    operation_description="Logout user by blacklisting the refresh token",
+    operation_description="Logout user by revoking the refresh token and the access token used for the request",
     request_body=openapi.Schema(
         type=openapi.TYPE_OBJECT,
         properties={
@@ -189,12 +190,14 @@ def logout(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        token = RefreshToken(refresh_token)
-        token.blacklist()
+        revoke_token(RefreshToken(refresh_token))
+        # The access token used for this request stops working too.
+        if isinstance(request.auth, AccessToken):
+            revoke_token(request.auth)
         
         return Response({'message': 'Successfully logged out.'})
     except Exception as e:
         return Response(
             {'error': 'Invalid token.'}, 
             status=status.HTTP_400_BAD_REQUEST
-        )
\ No newline at end of file
+        )
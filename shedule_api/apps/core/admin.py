@@ -1,10 +1,24 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin.utils import model_ngettext
 
 
 class BaseModelAdmin(admin.ModelAdmin):
     readonly_fields = ('id', 'created_at', 'updated_at')
     list_filter = ('is_active', 'created_at')
+    actions = ['soft_delete_selected', 'restore_selected']
     
     def get_queryset(self, request):
         
-        return self.model.all_objects.get_queryset()
\ No newline at end of file
+        return self.model.all_objects.get_queryset()
+
+    @admin.action(description="Deactivate selected %(verbose_name_plural)s", permissions=['change'])
+    def soft_delete_selected(self, request, queryset):
+        
+        count = queryset.soft_delete()
+        self.message_user(request, f"Deactivated {count} {model_ngettext(self.opts, count)}.", messages.SUCCESS)
+
+    @admin.action(description="Restore selected %(verbose_name_plural)s", permissions=['change'])
+    def restore_selected(self, request, queryset):
+        
+        count = queryset.restore()
+        self.message_user(request, f"Restored {count} {model_ngettext(self.opts, count)}.", messages.SUCCESS)
\ No newline at end of file
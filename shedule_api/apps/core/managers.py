@@ -1,11 +1,55 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
 
 
-class ActiveManager(models.Manager):    
+def state_updates(is_active, now):
+    return {'is_active': is_active, 'updated_at': now, 'deleted_at': None if is_active else now}
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    """
+    Bulk ``soft_delete()`` / ``restore()``: one UPDATE per table however many
+    rows match. Reverse relations named in ``cascade`` follow their parent
+    and share its ``deleted_at``; a restore only brings back the children
+    whose ``deleted_at`` still matches the parent's.
+    """
+
+    cascade = ()
+
+    def soft_delete(self):
+        return self._set_active(False)
+
+    def restore(self):
+        return self._set_active(True)
+
+    def active_updates(self, is_active, now):
+        """Column values written to every row whose state changes."""
+        return state_updates(is_active, now)
+
+    def _set_active(self, is_active):
+        now = timezone.now()
+        changed = self.exclude(is_active=is_active)
+        with transaction.atomic(using=self.db):
+            # Children first: once the parents are updated ``changed`` no longer matches them.
+            for name in self.cascade:
+                relation = self.model._meta.get_field(name)
+                parent = relation.field.name
+                children = relation.related_model._base_manager.db_manager(self.db).filter(
+                    **{f'{parent}__in': changed.values('pk')}
+                ).exclude(is_active=is_active)
+                if is_active:
+                    # Deactivated by the parent's cascade, not on their own.
+                    children = children.filter(deleted_at=F(f'{parent}__deleted_at'))
+                children.update(**state_updates(is_active, now))
+            return changed.update(**self.active_updates(is_active, now))
+
+
+class ActiveManager(models.Manager.from_queryset(SoftDeleteQuerySet)):    
     def get_queryset(self):
         return super().get_queryset().filter(is_active=True)
 
 
-class AllObjectsManager(models.Manager):    
+class AllObjectsManager(models.Manager.from_queryset(SoftDeleteQuerySet)):    
     def get_queryset(self):
         return super().get_queryset()
\ No newline at end of file
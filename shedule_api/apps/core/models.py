@@ -1,21 +1,35 @@
 from django.db import models
-import uuid
+from django.utils import timezone
+
+from .uuids import uuid7
 
 
 class BaseModel(models.Model):    
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+    # Set by soft_delete(); a cascade writes the parent's value to its children.
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
 
     class Meta:
         abstract = True
         ordering = ['-created_at']
 
+    def save(self, *args, **kwargs):        
+        if self.is_active:
+            self.deleted_at = None
+        elif self.deleted_at is None:
+            self.deleted_at = timezone.now()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'is_active' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'deleted_at'}
+        super().save(*args, **kwargs)
+
     def soft_delete(self):        
-        self.is_active = False
-        self.save(update_fields=['is_active', 'updated_at'])
+        type(self).all_objects.filter(pk=self.pk).soft_delete()
+        self.refresh_from_db()
 
     def restore(self):        
-        self.is_active = True
-        self.save(update_fields=['is_active', 'updated_at'])
\ No newline at end of file
+        type(self).all_objects.filter(pk=self.pk).restore()
+        self.refresh_from_db()
\ No newline at end of file
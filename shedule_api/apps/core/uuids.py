@@ -0,0 +1,55 @@
+"""
+Time-ordered UUIDs (version 7, RFC 9562) for primary keys.
+
+A v7 UUID starts with the Unix time in milliseconds, so new rows land at the
+right-hand edge of the primary-key B-tree instead of at a random page as with
+``uuid.uuid4``. The layout follows ``uuid.uuid7`` from Python 3.14: 48-bit
+timestamp, a 42-bit counter that keeps ids generated within one millisecond
+in order, and 32 random bits.
+"""
+import os
+import threading
+import time
+import uuid
+
+
+_COUNTER_MAX = (1 << 42) - 1
+_VERSION_7_FLAGS = (7 << 76) | (0b10 << 62)
+
+_lock = threading.Lock()
+_last_timestamp = None
+_last_counter = 0
+
+
+def _counter_and_tail():
+    random = int.from_bytes(os.urandom(10), 'big')
+    # The counter starts with its top bit clear to leave room for increments.
+    return (random >> 32) & (_COUNTER_MAX >> 1), random & 0xffff_ffff
+
+
+def uuid7():
+    """
+    Return a version 7 UUID. Ids from one process are strictly increasing,
+    also when the clock stands still or goes backwards.
+    """
+    global _last_timestamp, _last_counter
+
+    with _lock:
+        timestamp = time.time_ns() // 1_000_000
+        if _last_timestamp is None or timestamp > _last_timestamp:
+            counter, tail = _counter_and_tail()
+        else:
+            timestamp = _last_timestamp
+            counter = _last_counter + 1
+            if counter > _COUNTER_MAX:
+                timestamp += 1
+                counter, tail = _counter_and_tail()
+            else:
+                tail = int.from_bytes(os.urandom(4), 'big')
+        _last_timestamp, _last_counter = timestamp, counter
+
+    value = (timestamp & 0xffff_ffff_ffff) << 80
+    value |= (counter >> 30) << 64
+    value |= (counter & 0x3fff_ffff) << 32
+    value |= tail
+    return uuid.UUID(int=value | _VERSION_7_FLAGS)
@@ -1,3 +1,35 @@
-from django.shortcuts import render
+from django.db import connections
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
 
-# Create your views here.
+from schedule_api.database import pool_stats
+
+
+@swagger_auto_schema(
+    method='get',
+    operation_description=(
+        "Connection settings and, when pooling is enabled, the psycopg pool counters "
+        "of the worker process that served the request (staff only)"
+    ),
+    responses={
+        200: "Database connection status",
+        401: "Unauthorized",
+        403: "Forbidden"
+    }
+)
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def database_status(request):
+    
+    databases = {}
+    for alias in connections:
+        connection = connections[alias]
+        databases[alias] = {
+            'vendor': connection.vendor,
+            'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+            'conn_health_checks': connection.settings_dict['CONN_HEALTH_CHECKS'],
+            'pool': pool_stats(alias),
+        }
+    return Response(databases)
@@ -1,9 +1,10 @@
 from django.contrib import admin
+from apps.core.admin import BaseModelAdmin
 from .models import Schedule, TimeSlot
 
 
 @admin.register(Schedule)
-class ScheduleAdmin(admin.ModelAdmin):
+class ScheduleAdmin(BaseModelAdmin):
     list_display = ('name', 'owner', 'created_at', 'is_active')
     list_filter = ('is_active', 'created_at', 'owner')
     search_fields = ('name', 'description', 'owner__username')
@@ -21,7 +22,7 @@ class ScheduleAdmin(admin.ModelAdmin):
 
 
 @admin.register(TimeSlot)
-class TimeSlotAdmin(admin.ModelAdmin):
+class TimeSlotAdmin(BaseModelAdmin):
     list_display = ('schedule', 'day_of_week', 'start_time', 'end_time', 'ids_display', 'is_active')
     list_filter = ('day_of_week', 'is_active', 'schedule')
     search_fields = ('schedule__name', 'schedule__owner__username')
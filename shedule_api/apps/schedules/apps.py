@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class SchedulesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.schedules'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+
+        from .members import sync_ids_gin_index
+
+        post_migrate.connect(sync_ids_gin_index, sender=self, dispatch_uid='sync_ids_gin_index')
@@ -0,0 +1,16 @@
+from django.urls import path
+from .async_views import (
+    schedule_list,
+    schedule_detail,
+    protected_endpoint,
+    schedule_statistics,
+)
+
+app_name = 'schedules_async'
+
+urlpatterns = [
+    path('', schedule_list, name='schedule-list'),
+    path('<uuid:id>/', schedule_detail, name='schedule-detail'),
+    path('protected/', protected_endpoint, name='protected-endpoint'),
+    path('statistics/', schedule_statistics, name='schedule-statistics'),
+]
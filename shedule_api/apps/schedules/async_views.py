@@ -0,0 +1,122 @@
+"""
+Async implementations of the schedule read endpoints.
+
+They return the same payloads as the DRF views in ``views.py`` but are plain
+Django coroutines using the async ORM, so under ASGI a request does not
+occupy a worker thread while it waits on the client or the database.
+"""
+from functools import wraps
+
+from django.db.models import Prefetch, aprefetch_related_objects
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from apps.authentication.async_auth import async_jwt_required
+from .conditional import (
+    aschedule_list_validators,
+    aschedule_validators,
+    evaluate_conditional,
+    stamp_validators,
+)
+from .models import Schedule, TimeSlot
+from .pagination import AsyncPageNumberPagination, ScheduleKeysetPagination
+from .serializers import ScheduleDetailSerializer, ScheduleListSerializer
+from .statistics import aget_owner_statistics
+from .views import ScheduleListCreateAPIView, schedule_list_queryset
+
+
+def _render(data, status_code=200):
+    return HttpResponse(
+        JSONRenderer().render(data), status=status_code, content_type='application/json'
+    )
+
+
+def _api_view(view):
+    """GET-only, JWT-authenticated async view that renders DRF ``APIException``s like DRF."""
+    @require_GET
+    @async_jwt_required
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            return await view(request, *args, **kwargs)
+        except APIException as exc:
+            data = exc.detail if isinstance(exc.detail, (dict, list)) else {'detail': exc.detail}
+            return _render(data, exc.status_code)
+    return wrapper
+
+
+async def _conditional(request, validators, build_data):
+    not_modified, etag, timestamp = evaluate_conditional(request, validators)
+    response = not_modified or _render(await build_data())
+    return stamp_validators(response, etag, timestamp)
+
+
+@_api_view
+async def schedule_list(request):
+
+    async def build_data():
+        drf_request = Request(request)
+        queryset = schedule_list_queryset(request.user, request.GET.get('contains_id'))
+        if request.GET.get('pagination') == ScheduleListCreateAPIView.keyset_pagination_value:
+            paginator = ScheduleKeysetPagination()
+        else:
+            paginator = AsyncPageNumberPagination()
+        page = await paginator.apaginate_queryset(queryset, drf_request)
+        return paginator.get_paginated_response(ScheduleListSerializer(page, many=True).data).data
+
+    validators = await aschedule_list_validators(Schedule.objects.filter(owner=request.user), request)
+    return await _conditional(request, validators, build_data)
+
+
+@_api_view
+async def schedule_detail(request, id):
+
+    queryset = Schedule.objects.filter(owner=request.user)
+
+    async def build_data():
+        try:
+            schedule = await queryset.select_related('owner').aget(pk=id)
+        except Schedule.DoesNotExist:
+            raise NotFound("No Schedule matches the given query.")
+        if schedule.schedule_snapshot is None:
+            await aprefetch_related_objects(
+                [schedule],
+                Prefetch('time_slots', queryset=TimeSlot.objects.order_by('start_minute', 'end_minute')),
+            )
+        return ScheduleDetailSerializer(schedule).data
+
+    validators = await aschedule_validators(queryset, id)
+    if validators is None:
+        raise NotFound("No Schedule matches the given query.")
+    return await _conditional(request, validators, build_data)
+
+
+@_api_view
+async def protected_endpoint(request):
+
+    user = request.user
+    schedules_count = await Schedule.objects.filter(owner=user).acount()
+
+    return _render({
+        'message': f'Hello {user.username}! This is a protected endpoint.',
+        'user': user.username,
+        'user_id': user.id,
+        'schedules_count': schedules_count,
+        'is_staff': user.is_staff,
+        'date_joined': user.date_joined.isoformat(),
+    })
+
+
+@_api_view
+async def schedule_statistics(request):
+
+    user = request.user
+    statistics = await aget_owner_statistics(user.pk)
+
+    return _render({
+        **statistics,
+        'user': user.username,
+    })
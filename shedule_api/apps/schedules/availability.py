@@ -0,0 +1,41 @@
+import numpy as np
+
+from .bitmaps import DAY_NAMES, MINUTES_PER_DAY
+
+
+def format_minute(minute):
+    """Format a minute of the day as ``HH:MM``; the end of the day is ``24:00``."""
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+def runs(mask, min_length=1):
+    """Return ``[start, end)`` index pairs of the ``True`` runs in ``mask`` at least ``min_length`` long."""
+    edges = np.flatnonzero(np.diff(np.concatenate(([False], mask, [False])).astype(np.int8)))
+    starts, ends = edges[0::2], edges[1::2]
+    keep = ends - starts >= min_length
+    return list(zip(starts[keep].tolist(), ends[keep].tolist()))
+
+
+def free_busy(matrix, min_minutes=1):
+    """
+    Per-day free/busy windows across every schedule in ``matrix``.
+
+    ``busy`` merges the minutes where any schedule is occupied, ``free`` the
+    minutes where none is, and ``common`` the minutes where all of them are.
+    ``free`` and ``common`` windows shorter than ``min_minutes`` are dropped.
+    """
+    counts = matrix.counts().reshape(len(DAY_NAMES), MINUTES_PER_DAY)
+    total = len(matrix)
+
+    def intervals(pairs):
+        return [{'start': format_minute(start), 'stop': format_minute(end)} for start, end in pairs]
+
+    result = {}
+    for day, day_counts in zip(DAY_NAMES, counts):
+        busy = day_counts > 0
+        result[day] = {
+            'busy': intervals(runs(busy)),
+            'free': intervals(runs(~busy, min_minutes)),
+            'common': intervals(runs(day_counts == total, min_minutes)) if total else [],
+        }
+    return result
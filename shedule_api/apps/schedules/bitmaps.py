@@ -0,0 +1,202 @@
+import json
+
+import numpy as np
+
+from .models import MINUTES_PER_DAY, TimeSlot
+
+
+DAY_NAMES = [day for day, _ in TimeSlot.DAYS_OF_WEEK]
+MINUTES_PER_WEEK = len(DAY_NAMES) * MINUTES_PER_DAY
+OCCUPANCY_BYTES = MINUTES_PER_WEEK // 8
+
+# Set bits per byte value, so coverage is a table lookup plus a sum.
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
+
+def minute_of_week(day, value):
+    """Return the minute of the week for ``day`` at ``value`` (a ``time`` or ``"HH:MM"``)."""
+    if isinstance(value, str):
+        hour, minute = value.split(':')[:2]
+        hour, minute = int(hour), int(minute)
+    else:
+        hour, minute = value.hour, value.minute
+    return DAY_NAMES.index(day) * MINUTES_PER_DAY + hour * 60 + minute
+
+
+def empty_bits():
+    return np.zeros(MINUTES_PER_WEEK, dtype=bool)
+
+
+def bits_from_schedule_data(schedule_data):
+    """Return the ``[start, stop)`` occupancy of a weekly schedule document as a bool array."""
+    bits = empty_bits()
+    for day, slots in schedule_data.items():
+        for slot in slots:
+            bits[minute_of_week(day, slot['start']):minute_of_week(day, slot['stop'])] = True
+    return bits
+
+
+def pack(bits):
+    return np.packbits(bits)
+
+
+def unpack(occupancy):
+    return np.unpackbits(np.frombuffer(occupancy, dtype=np.uint8), count=MINUTES_PER_WEEK).astype(bool)
+
+
+def render_occupancy(schedule_data):
+    """Return the packed 1260-byte occupancy bitmap stored on ``Schedule.occupancy``."""
+    return pack(bits_from_schedule_data(schedule_data)).tobytes()
+
+
+def _as_packed(occupancy):
+    if isinstance(occupancy, np.ndarray):
+        return occupancy if occupancy.dtype == np.uint8 else pack(occupancy)
+    return np.frombuffer(occupancy, dtype=np.uint8)
+
+
+def union(*bitmaps):
+    return np.bitwise_or.reduce([_as_packed(bitmap) for bitmap in bitmaps]).tobytes()
+
+
+def intersection(*bitmaps):
+    return np.bitwise_and.reduce([_as_packed(bitmap) for bitmap in bitmaps]).tobytes()
+
+
+def difference(bitmap, *others):
+    """Minutes set in ``bitmap`` and in none of ``others``."""
+    result = _as_packed(bitmap)
+    for other in others:
+        result = result & ~_as_packed(other)
+    return result.tobytes()
+
+
+def coverage(bitmap):
+    """Number of occupied minutes in ``bitmap``."""
+    return int(_POPCOUNT[_as_packed(bitmap)].sum())
+
+
+def coverage_by_day(bitmap):
+    """Occupied minutes of ``bitmap`` per day name."""
+    per_day = unpack(bytes(_as_packed(bitmap))).reshape(len(DAY_NAMES), MINUTES_PER_DAY).sum(axis=1)
+    return dict(zip(DAY_NAMES, (int(minutes) for minutes in per_day)))
+
+
+def is_occupied(bitmap, day, value):
+    minute = minute_of_week(day, value)
+    return bool(_as_packed(bitmap)[minute // 8] & (0x80 >> (minute % 8)))
+
+
+class OccupancyMatrix:
+    """
+    Packed occupancy of many schedules as one ``(schedules, 1260)`` uint8
+    matrix, so set operations and occupancy tests run across all of them in
+    a handful of vectorized NumPy calls.
+    """
+
+    def __init__(self, schedule_ids, packed):
+        self.schedule_ids = list(schedule_ids)
+        self.packed = packed.reshape(len(self.schedule_ids), OCCUPANCY_BYTES)
+
+    @classmethod
+    def from_queryset(cls, queryset):
+        """
+        Load the stored bitmaps of ``queryset``. Schedules written before
+        bitmaps existed are rebuilt from their snapshot, or from one time
+        slot query for all of them.
+        """
+        rows = list(cls._bitmap_rows(queryset))
+        missing = cls._missing(rows)
+        time_slots = list(cls._missing_time_slots(missing)) if missing else []
+        return cls.from_rows(rows, time_slots)
+
+    @classmethod
+    async def afrom_queryset(cls, queryset):
+        """Async counterpart of ``from_queryset``."""
+        rows = [row async for row in cls._bitmap_rows(queryset)]
+        missing = cls._missing(rows)
+        time_slots = [row async for row in cls._missing_time_slots(missing)] if missing else []
+        return cls.from_rows(rows, time_slots)
+
+    @staticmethod
+    def _bitmap_rows(queryset):
+        return queryset.order_by().values_list('pk', 'occupancy', 'schedule_snapshot')
+
+    @staticmethod
+    def _missing(rows):
+        return [pk for pk, occupancy, snapshot in rows if occupancy is None and snapshot is None]
+
+    @staticmethod
+    def _missing_time_slots(missing):
+        return TimeSlot.objects.filter(schedule_id__in=missing).order_by().values_list(
+            'schedule_id', 'start_minute', 'end_minute'
+        )
+
+    @classmethod
+    def from_rows(cls, rows, time_slots=()):
+        """
+        Build the matrix from ``(pk, occupancy, schedule_snapshot)`` rows plus
+        the ``(schedule_id, start_minute, end_minute)`` time slots of rows that have
+        neither.
+        """
+        bitmaps = {}
+        bits = {}
+        for pk, occupancy, snapshot in rows:
+            if occupancy is not None:
+                bitmaps[pk] = bytes(occupancy)
+            elif snapshot is not None:
+                bitmaps[pk] = render_occupancy(json.loads(snapshot))
+            else:
+                bits[pk] = empty_bits()
+
+        for schedule_id, start_minute, end_minute in time_slots:
+            bits[schedule_id][start_minute:end_minute] = True
+        bitmaps.update((pk, pack(value).tobytes()) for pk, value in bits.items())
+
+        schedule_ids = [pk for pk, _, _ in rows]
+        packed = np.frombuffer(b''.join(bitmaps[pk] for pk in schedule_ids), dtype=np.uint8)
+        return cls(schedule_ids, packed)
+
+    def __len__(self):
+        return len(self.schedule_ids)
+
+    def bits(self):
+        """Unpacked ``(schedules, 10080)`` bool matrix."""
+        return np.unpackbits(self.packed, axis=1, count=MINUTES_PER_WEEK).astype(bool)
+
+    def occupied_at(self, day, value):
+        """Bool mask of the schedules occupied at ``day``/``value``."""
+        minute = minute_of_week(day, value)
+        return (self.packed[:, minute // 8] & (0x80 >> (minute % 8))).astype(bool)
+
+    def occupied_during(self, day, start, end):
+        """Bool mask of the schedules with any occupied minute in ``[start, end)``."""
+        first, last = minute_of_week(day, start), minute_of_week(day, end)
+        offset = first // 8
+        window = np.unpackbits(self.packed[:, offset:(last + 7) // 8], axis=1)
+        return window[:, first - offset * 8:last - offset * 8].any(axis=1)
+
+    def union(self):
+        if not len(self):
+            return bytes(OCCUPANCY_BYTES)
+        return np.bitwise_or.reduce(self.packed, axis=0).tobytes()
+
+    def intersection(self):
+        if not len(self):
+            return bytes(OCCUPANCY_BYTES)
+        return np.bitwise_and.reduce(self.packed, axis=0).tobytes()
+
+    def coverage(self):
+        """Occupied minutes per schedule, in ``schedule_ids`` order."""
+        return _POPCOUNT[self.packed].sum(axis=1)
+
+    def counts(self, chunk_size=1024):
+        """
+        Number of occupied schedules at each minute of the week. Rows are
+        unpacked ``chunk_size`` at a time to bound memory.
+        """
+        counts = np.zeros(MINUTES_PER_WEEK, dtype=np.int32)
+        for offset in range(0, len(self), chunk_size):
+            chunk = np.unpackbits(self.packed[offset:offset + chunk_size], axis=1, count=MINUTES_PER_WEEK)
+            counts += chunk.sum(axis=0, dtype=np.int32)
+        return counts
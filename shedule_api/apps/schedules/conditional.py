@@ -0,0 +1,126 @@
+import hashlib
+
+from django.db.models import Count, Max, Sum
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    digest = hashlib.sha1(':'.join(str(part) for part in parts).encode()).hexdigest()
+    return quote_etag(digest)
+
+
+def _validator_row(queryset, pk):
+    return queryset.filter(pk=pk).order_by().values_list('version', 'updated_at')
+
+
+def _schedule_validators(pk, row):
+    if row is None:
+        return None
+    version, updated_at = row
+    return make_etag(pk, version, updated_at.isoformat()), updated_at
+
+
+def schedule_validators(queryset, pk):
+    """
+    Return ``(etag, last_modified)`` for one schedule, or ``None`` if it does
+    not exist. Only the version counter and timestamp are read.
+    """
+    return _schedule_validators(pk, _validator_row(queryset, pk).first())
+
+
+async def aschedule_validators(queryset, pk):
+    return _schedule_validators(pk, await _validator_row(queryset, pk).afirst())
+
+
+def _set_state_aggregates():
+    return {
+        'total': Count('id'),
+        'versions': Sum('version'),
+        'last_modified': Max('updated_at'),
+    }
+
+
+def _set_state(aggregate):
+    return aggregate['total'], aggregate['versions'] or 0, aggregate['last_modified']
+
+
+def schedule_set_state(queryset):
+    """
+    Summarise a set of schedules as ``(count, version sum, max updated_at)``
+    with one aggregate query. Any write to a schedule or its slots changes it.
+    """
+    return _set_state(queryset.order_by().aggregate(**_set_state_aggregates()))
+
+
+async def aschedule_set_state(queryset):
+    return _set_state(await queryset.order_by().aaggregate(**_set_state_aggregates()))
+
+
+def _list_validators(state, request):
+    total, versions, last_modified = state
+    # No Last-Modified: deleting the newest schedule would move it backwards,
+    # and If-Modified-Since would then answer 304 for a changed list. The
+    # ETag covers deletes through the row count.
+    etag = make_etag(
+        request.user.pk,
+        total,
+        versions,
+        last_modified.isoformat() if last_modified else '',
+        request.META.get('QUERY_STRING', ''),
+    )
+    return etag, None
+
+
+def schedule_list_validators(queryset, request):
+    """
+    Return ``(etag, None)`` for a schedule list. The query string is folded
+    into the ETag because pagination parameters change the representation.
+    """
+    return _list_validators(schedule_set_state(queryset), request)
+
+
+async def aschedule_list_validators(queryset, request):
+    return _list_validators(await aschedule_set_state(queryset), request)
+
+
+def evaluate_conditional(request, validators):
+    """
+    Return ``(not_modified, etag, timestamp)`` for a plain Django request;
+    ``not_modified`` is the 304/412 response to send, or ``None``.
+    """
+    etag, last_modified = validators
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    not_modified = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    return not_modified, etag, timestamp
+
+
+def stamp_validators(response, etag, timestamp):
+    """Set ``ETag``/``Last-Modified`` on 2xx and 304 responses."""
+    if 200 <= response.status_code < 300 or response.status_code == 304:
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Answer ``If-None-Match``/``If-Modified-Since`` with 304 before the view
+    does any real work, and stamp ``ETag``/``Last-Modified`` on 200 responses.
+
+    Views implement ``get_conditional_validators()`` returning
+    ``(etag, last_modified)`` or ``None`` to skip the check.
+    """
+
+    def get_conditional_validators(self):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        validators = self.get_conditional_validators()
+        if validators is None:
+            return super().get(request, *args, **kwargs)
+
+        not_modified, etag, timestamp = evaluate_conditional(request._request, validators)
+        response = not_modified or super().get(request, *args, **kwargs)
+        return stamp_validators(response, etag, timestamp)
@@ -0,0 +1,157 @@
+import json
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import F
+from django.utils import timezone
+
+from .bitmaps import render_occupancy
+from .models import MINUTES_PER_DAY, Schedule, TimeSlot
+from .statistics import invalidate_owner_statistics
+
+
+DAY_NAMES = [day for day, _ in TimeSlot.DAYS_OF_WEEK]
+
+# Per-backend SQL fragments used to build one day's slot array in the database.
+# Each template receives the quoted column names and must return a JSON array
+# ordered by (start_minute, end_minute), or NULL when the day has no slots.
+# The day is selected as a [start, end) range of start_minute so the lookup
+# stays on the (schedule, start_minute, end_minute) index.
+JSON_DAY_TEMPLATES = {
+    'sqlite': (
+        "SELECT json_group_array(json_object("
+        "'start', strftime('%%H:%%M', {start}), "
+        "'stop', strftime('%%H:%%M', {end}), "
+        "'ids', json({ids}))) "
+        "FROM (SELECT {start}, {end}, {ids} FROM {table} "
+        "WHERE {schedule} = %s AND {is_active} "
+        "AND {start_minute} >= %s AND {start_minute} < %s "
+        "ORDER BY {start_minute}, {end_minute})"
+    ),
+    'postgresql': (
+        "SELECT json_agg(json_build_object("
+        "'start', to_char({start}, 'HH24:MI'), "
+        "'stop', to_char({end}, 'HH24:MI'), "
+        "'ids', {ids}) ORDER BY {start_minute}, {end_minute}) "
+        "FROM {table} "
+        "WHERE {schedule} = %s AND {is_active} "
+        "AND {start_minute} >= %s AND {start_minute} < %s"
+    ),
+}
+
+JSON_OBJECT_FUNCTIONS = {
+    'sqlite': 'json_object',
+    'postgresql': 'json_build_object',
+}
+
+EMPTY_JSON_ARRAY = {
+    'sqlite': "json('[]')",
+    'postgresql': "'[]'::json",
+}
+
+
+def empty_week():
+    return {day: [] for day in DAY_NAMES}
+
+
+def build_schedule_data(time_slots):
+    """Bucket ``time_slots`` into the weekly ``{"monday": [...], ...}`` shape."""
+    schedule_data = empty_week()
+    for time_slot in time_slots:
+        schedule_data[time_slot.day_of_week].append({
+            'start': time_slot.start_time.strftime('%H:%M'),
+            'stop': time_slot.end_time.strftime('%H:%M'),
+            'ids': time_slot.ids,
+        })
+    return schedule_data
+
+
+def supports_json_assembly(using=None):
+    db = connections[using or DEFAULT_DB_ALIAS]
+    return db.vendor in JSON_DAY_TEMPLATES and db.features.supports_json_field
+
+
+def _schedule_document_sql(vendor, quote_name):
+    opts = TimeSlot._meta
+    columns = {
+        'table': quote_name(opts.db_table),
+        'schedule': quote_name(opts.get_field('schedule').column),
+        'start': quote_name(opts.get_field('start_time').column),
+        'end': quote_name(opts.get_field('end_time').column),
+        'start_minute': quote_name(opts.get_field('start_minute').column),
+        'end_minute': quote_name(opts.get_field('end_minute').column),
+        'ids': quote_name(opts.get_field('ids').column),
+        'is_active': quote_name(opts.get_field('is_active').column),
+    }
+    day_sql = JSON_DAY_TEMPLATES[vendor].format(**columns)
+    pairs = ', '.join(
+        f"'{day}', COALESCE(({day_sql}), {EMPTY_JSON_ARRAY[vendor]})"
+        for day in DAY_NAMES
+    )
+    return f"SELECT {JSON_OBJECT_FUNCTIONS[vendor]}({pairs})"
+
+
+def fetch_schedule_data(schedule, using=None):
+    """
+    Return the weekly schedule document for ``schedule``.
+
+    On SQLite and PostgreSQL the whole document is assembled by the database
+    in a single query; other backends fall back to the Python path.
+    """
+    db = connections[using or DEFAULT_DB_ALIAS]
+    if not supports_json_assembly(using):
+        return build_schedule_data(schedule.time_slots.all())
+
+    sql = _schedule_document_sql(db.vendor, db.ops.quote_name)
+    schedule_id = TimeSlot._meta.get_field('schedule').get_db_prep_value(
+        schedule.pk, db
+    )
+    params = []
+    for index in range(len(DAY_NAMES)):
+        params.extend([schedule_id, index * MINUTES_PER_DAY, (index + 1) * MINUTES_PER_DAY])
+
+    with db.cursor() as cursor:
+        cursor.execute(sql, params)
+        document = cursor.fetchone()[0]
+
+    # psycopg decodes json columns itself; SQLite hands back text.
+    if isinstance(document, str):
+        document = json.loads(document)
+    return document
+
+
+def render_snapshot(schedule_data):
+    return json.dumps(schedule_data)
+
+
+def refresh_schedule_snapshot(schedule, schedule_data=None):
+    """
+    Re-render and store the weekly snapshot of ``schedule``.
+
+    Callers that mutate time slots run this inside their own transaction so
+    the snapshot never disagrees with the rows it was built from.
+    """
+    if schedule_data is None:
+        schedule_data = fetch_schedule_data(schedule)
+    schedule.schedule_snapshot = render_snapshot(schedule_data)
+    schedule.snapshot_slots_count = sum(len(slots) for slots in schedule_data.values())
+    schedule.occupancy = render_occupancy(schedule_data)
+    schedule.updated_at = timezone.now()
+    # Slot changes alter the schedule's representation, so they bump the
+    # version and timestamp used for conditional GETs as well.
+    Schedule.all_objects.filter(pk=schedule.pk).update(
+        schedule_snapshot=schedule.schedule_snapshot,
+        snapshot_slots_count=schedule.snapshot_slots_count,
+        occupancy=schedule.occupancy,
+        updated_at=schedule.updated_at,
+        version=F('version') + 1,
+    )
+    schedule.version += 1
+    invalidate_owner_statistics(schedule.owner_id)
+    return schedule_data
+
+
+def load_snapshot(schedule):
+    """Return the stored snapshot of ``schedule``, or ``None`` if it was never built."""
+    if schedule.schedule_snapshot is None:
+        return None
+    return json.loads(schedule.schedule_snapshot)
@@ -0,0 +1,77 @@
+import csv
+import zlib
+from itertools import islice
+
+from django.db.models import prefetch_related_objects
+from rest_framework.utils.encoders import JSONEncoder
+
+from .documents import DAY_NAMES, load_snapshot
+from .serializers import ScheduleDetailSerializer
+
+
+CSV_HEADER = ['schedule_id', 'schedule_name', 'day_of_week', 'start', 'stop', 'ids']
+
+
+class Echo:
+    """File-like object whose ``write`` returns the value, for streaming ``csv.writer`` output."""
+
+    def write(self, value):
+        return value
+
+
+def iter_schedule_documents(queryset, chunk_size):
+    """
+    Yield the detail document of every schedule in ``queryset``.
+
+    Rows are read ``chunk_size`` at a time. Schedules without a stored
+    snapshot get their time slots with one IN query per chunk, so memory is
+    bounded by the chunk rather than the export.
+    """
+    rows = queryset.select_related('owner').order_by('pk').iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        missing = [schedule for schedule in chunk if load_snapshot(schedule) is None]
+        if missing:
+            prefetch_related_objects(missing, 'time_slots')
+        for schedule in chunk:
+            yield ScheduleDetailSerializer(schedule).data
+
+
+def ndjson_lines(documents):
+    encoder = JSONEncoder()
+    for document in documents:
+        yield encoder.encode(document) + '\n'
+
+
+def csv_lines(documents):
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_HEADER)
+    for document in documents:
+        for day in DAY_NAMES:
+            for time_slot in document['schedule'][day]:
+                yield writer.writerow([
+                    document['id'],
+                    document['name'],
+                    day,
+                    time_slot['start'],
+                    time_slot['stop'],
+                    ' '.join(str(member_id) for member_id in time_slot['ids']),
+                ])
+
+
+def gzip_stream(lines, flush_bytes=64 * 1024):
+    """Compress ``lines`` on the fly, emitting a gzip member in ~``flush_bytes`` pieces."""
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    pending = 0
+    for line in lines:
+        data = line.encode() if isinstance(line, str) else line
+        pending += len(data)
+        compressed = compressor.compress(data)
+        if pending >= flush_bytes:
+            compressed += compressor.flush(zlib.Z_SYNC_FLUSH)
+            pending = 0
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,152 @@
+import json
+import logging
+import tempfile
+
+from django.db import DatabaseError, transaction
+from schedule_api.database import retry_on_lock
+
+from .bitmaps import render_occupancy
+from .documents import build_schedule_data, render_snapshot
+from .members import create_time_slot_members
+from .models import Schedule, TimeSlot
+from .serializers import ScheduleCreateUpdateSerializer, build_time_slots
+from .statistics import invalidate_owner_statistics
+
+
+logger = logging.getLogger(__name__)
+
+# Reports up to this size stay in memory; larger ones spill to a temporary file.
+REPORT_SPOOL_BYTES = 1024 * 1024
+
+class LineTooLong(ValueError):
+    pass
+
+
+def iter_ndjson(stream, max_line_bytes):
+    """
+    Yield ``(line number, document or exception)`` for each non-blank line
+    read from ``stream``. Only one line is held in memory at a time; lines
+    longer than ``max_line_bytes`` are skipped and reported.
+    """
+    line_number = 0
+    while True:
+        line = stream.readline(max_line_bytes + 1)
+        if not line:
+            return
+        line_number += 1
+        if len(line) > max_line_bytes and not line.endswith(b'\n'):
+            # Drain the rest of the oversized line without buffering it.
+            while line and not line.endswith(b'\n'):
+                line = stream.readline(max_line_bytes)
+            yield line_number, LineTooLong(f"Line exceeds {max_line_bytes} bytes.")
+            continue
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as exc:
+            yield line_number, exc
+
+
+def _error(line_number, message):
+    return {'line': line_number, 'status': 'error', 'errors': {'non_field_errors': [message]}}
+
+
+def _build_schedule(owner, validated_data):
+    schedule = Schedule(
+        owner=owner,
+        name=validated_data['name'],
+        description=validated_data.get('description', ''),
+    )
+    time_slots = build_time_slots(schedule, validated_data['schedule'])
+    schedule_data = build_schedule_data(
+        sorted(time_slots, key=lambda time_slot: (time_slot.start_time, time_slot.end_time))
+    )
+    schedule.schedule_snapshot = render_snapshot(schedule_data)
+    schedule.snapshot_slots_count = len(time_slots)
+    schedule.occupancy = render_occupancy(schedule_data)
+    return schedule, time_slots
+
+
+@retry_on_lock
+@transaction.atomic
+def _insert_batch(owner, schedules, time_slots):
+    Schedule.objects.bulk_create(schedules)
+    TimeSlot.objects.bulk_create(time_slots)
+    create_time_slot_members(time_slots)
+    invalidate_owner_statistics(owner.pk)
+
+
+def _commit_batch(owner, batch):
+    """Insert one validated batch and return its per-line results."""
+    schedules, time_slots = [], []
+    for _, validated_data in batch:
+        schedule, slots = _build_schedule(owner, validated_data)
+        schedules.append(schedule)
+        time_slots.extend(slots)
+
+    try:
+        _insert_batch(owner, schedules, time_slots)
+    except DatabaseError:
+        # The database message names tables and constraints; keep it in the log.
+        logger.exception("Import batch for owner %s could not be saved", owner.pk)
+        return [_error(line_number, "Could not be saved.") for line_number, _ in batch]
+
+    return [
+        {'line': line_number, 'status': 'created', 'id': str(schedule.pk)}
+        for (line_number, _), schedule in zip(batch, schedules)
+    ]
+
+
+def import_schedules(stream, owner, batch_size, max_line_bytes):
+    """
+    Import NDJSON schedule documents from ``stream`` for ``owner``.
+
+    Yields one result per input line as soon as its batch is committed,
+    followed by a final ``{'summary': ...}`` entry, so neither the upload
+    nor the report is ever held in memory as a whole.
+    """
+    counts = {'created': 0, 'failed': 0}
+
+    def report(results):
+        for result in results:
+            counts['created' if result['status'] == 'created' else 'failed'] += 1
+            yield result
+
+    batch = []
+    for line_number, document in iter_ndjson(stream, max_line_bytes):
+        if isinstance(document, Exception):
+            yield from report([_error(line_number, str(document))])
+            continue
+        if not isinstance(document, dict):
+            yield from report([_error(line_number, "Expected a JSON object.")])
+            continue
+
+        serializer = ScheduleCreateUpdateSerializer(data=document)
+        if not serializer.is_valid():
+            yield from report([{'line': line_number, 'status': 'error', 'errors': serializer.errors}])
+            continue
+
+        batch.append((line_number, serializer.validated_data))
+        if len(batch) >= batch_size:
+            yield from report(_commit_batch(owner, batch))
+            batch = []
+
+    if batch:
+        yield from report(_commit_batch(owner, batch))
+
+    yield {'summary': counts}
+
+
+def import_schedules_report(stream, owner, batch_size, max_line_bytes):
+    """
+    Run ``import_schedules`` to completion and return its NDJSON report as a
+    file positioned at the start. The import finishes before anything is
+    sent, so a client that disconnects while reading the report does not
+    cut it short.
+    """
+    report = tempfile.SpooledTemporaryFile(max_size=REPORT_SPOOL_BYTES)
+    for result in import_schedules(stream, owner, batch_size, max_line_bytes):
+        report.write((json.dumps(result) + '\n').encode())
+    report.seek(0)
+    return report
@@ -0,0 +1,260 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+
+from .conditional import schedule_set_state
+from .models import MINUTES_PER_DAY, Schedule, TimeSlot
+
+
+DAY_NAMES = [day for day, _ in TimeSlot.DAYS_OF_WEEK]
+
+# Slots loaded per IN query while syncing an owner's index.
+SYNC_BATCH_SIZE = 500
+
+IndexedSlot = namedtuple('IndexedSlot', ['schedule_id', 'start', 'end', 'ids'])
+
+
+def seconds_of_day(value):
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+
+class IntervalTree:
+    """
+    Static centered interval tree over half-open ``[start, end)`` intervals.
+
+    Each node keeps the intervals containing its center twice, sorted by start
+    ascending and by end descending, so stabbing and overlap queries cost
+    ``O(log n + k)``.
+    """
+
+    __slots__ = ('center', 'by_start', 'by_end', 'left', 'right')
+
+    def __init__(self, intervals):
+        self.left = self.right = None
+        if not intervals:
+            self.center = None
+            self.by_start = self.by_end = ()
+            return
+
+        endpoints = sorted(interval.start for interval in intervals)
+        self.center = endpoints[len(endpoints) // 2]
+
+        here, left, right = [], [], []
+        for interval in intervals:
+            if interval.end <= self.center:
+                left.append(interval)
+            elif interval.start > self.center:
+                right.append(interval)
+            else:
+                here.append(interval)
+
+        self.by_start = sorted(here, key=lambda interval: interval.start)
+        self.by_end = sorted(here, key=lambda interval: interval.end, reverse=True)
+        if left:
+            self.left = IntervalTree(left)
+        if right:
+            self.right = IntervalTree(right)
+
+    def __len__(self):
+        size = len(self.by_start)
+        if self.left:
+            size += len(self.left)
+        if self.right:
+            size += len(self.right)
+        return size
+
+    def at(self, point):
+        """Return every interval with ``start <= point < end``."""
+        found = []
+        node = self
+        while node is not None and node.center is not None:
+            if point < node.center:
+                for interval in node.by_start:
+                    if interval.start > point:
+                        break
+                    found.append(interval)
+                node = node.left
+            else:
+                for interval in node.by_end:
+                    if interval.end <= point:
+                        break
+                    found.append(interval)
+                node = node.right
+        return found
+
+    def overlapping(self, start, end):
+        """Return every interval overlapping ``[start, end)``."""
+        found = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node is None or node.center is None:
+                continue
+            if end <= node.center:
+                for interval in node.by_start:
+                    if interval.start >= end:
+                        break
+                    found.append(interval)
+                stack.append(node.left)
+            elif start > node.center:
+                for interval in node.by_end:
+                    if interval.end <= start:
+                        break
+                    found.append(interval)
+                stack.append(node.right)
+            else:
+                found.extend(node.by_start)
+                stack.append(node.left)
+                stack.append(node.right)
+        return found
+
+
+class OwnerIntervalIndex:
+    """
+    Per-owner, per-day interval trees over the active slots of active
+    schedules.
+
+    ``sync()`` costs one aggregate query when nothing changed. Otherwise only
+    schedules whose version moved are reloaded, and only the days they touch
+    are rebuilt.
+    """
+
+    def __init__(self, owner_id):
+        self.owner_id = owner_id
+        self.state = None
+        # (schedules, trees) is swapped as a whole so readers never see a
+        # half-applied reload.
+        self.snapshot = ({}, {day: IntervalTree([]) for day in DAY_NAMES})
+        self.lock = threading.Lock()
+
+    def sync(self):
+        queryset = Schedule.objects.filter(owner_id=self.owner_id)
+        state = schedule_set_state(queryset)
+        if state == self.state:
+            return
+        with self.lock:
+            if state == self.state:
+                return
+            self.snapshot = self._reload(queryset)
+            self.state = state
+
+    def _reload(self, queryset):
+        schedules, trees = dict(self.snapshot[0]), dict(self.snapshot[1])
+        current = {
+            pk: (version, name)
+            for pk, version, name in queryset.order_by().values_list('id', 'version', 'name')
+        }
+        changed = [
+            pk for pk, (version, _) in current.items()
+            if pk not in schedules or schedules[pk]['version'] != version
+        ]
+        removed = [pk for pk in schedules if pk not in current]
+
+        dirty_days = set()
+        for pk in removed + changed:
+            entry = schedules.pop(pk, None)
+            if entry is not None:
+                dirty_days.update(entry['slots'])
+
+        for pk in changed:
+            version, name = current[pk]
+            schedules[pk] = {'version': version, 'name': name, 'slots': {}}
+
+        for offset in range(0, len(changed), SYNC_BATCH_SIZE):
+            batch = changed[offset:offset + SYNC_BATCH_SIZE]
+            rows = TimeSlot.objects.filter(schedule_id__in=batch).order_by().values_list(
+                'schedule_id', 'day_of_week', 'start_time', 'end_time', 'ids'
+            )
+            for schedule_id, day, start_time, end_time, ids in rows:
+                slot = IndexedSlot(
+                    schedule_id, seconds_of_day(start_time), seconds_of_day(end_time), ids
+                )
+                schedules[schedule_id]['slots'].setdefault(day, []).append(slot)
+                dirty_days.add(day)
+
+        for day in dirty_days:
+            trees[day] = IntervalTree([
+                slot
+                for entry in schedules.values()
+                for slot in entry['slots'].get(day, ())
+            ])
+        return schedules, trees
+
+    def query(self, day, start, end=None):
+        """
+        Return ``(slot, schedule name)`` pairs active at ``start`` or, when
+        ``end`` is given, overlapping ``[start, end)`` on ``day``.
+        """
+        schedules, trees = self.snapshot
+        if end is None:
+            slots = trees[day].at(seconds_of_day(start))
+        else:
+            slots = trees[day].overlapping(seconds_of_day(start), seconds_of_day(end))
+        return [(slot, schedules[slot.schedule_id]['name']) for slot in slots]
+
+
+# owner_id -> (expires_at, index), least recently used first.
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_owner_index(owner_id):
+    """
+    Return the synced in-process interval index for ``owner_id``. At most
+    ``SCHEDULE_INTERVAL_INDEX_SIZE`` owners are kept, each dropped after
+    ``SCHEDULE_INTERVAL_INDEX_TTL`` seconds without a query.
+    """
+    ttl = settings.SCHEDULE_INTERVAL_INDEX_TTL
+    size = settings.SCHEDULE_INTERVAL_INDEX_SIZE
+    now = time.monotonic()
+    with _indexes_lock:
+        entry = _indexes.pop(owner_id, None)
+        index = entry[1] if entry is not None and entry[0] > now else OwnerIntervalIndex(owner_id)
+        if ttl > 0 and size > 0:
+            _indexes[owner_id] = (now + ttl, index)
+        # Entries are ordered by last use, so expired ones sit at the front.
+        while _indexes and (len(_indexes) > size or next(iter(_indexes.values()))[0] <= now):
+            _indexes.popitem(last=False)
+    index.sync()
+    return index
+
+
+def _minute_of_day(value, round_up=False):
+    minute = value.hour * 60 + value.minute
+    if round_up and (value.second or value.microsecond):
+        minute += 1
+    return minute
+
+
+def query_active_slots(owner_id, day, start, end=None):
+    """
+    Database counterpart of ``OwnerIntervalIndex.query`` served by the
+    ``(start_minute, end_minute)`` index. Slots are stored at minute
+    precision, so a range ``end`` with seconds is rounded up.
+    """
+    day_start = DAY_NAMES.index(day) * MINUTES_PER_DAY
+    start_minute = day_start + _minute_of_day(start)
+    queryset = TimeSlot.objects.filter(
+        schedule__owner_id=owner_id,
+        schedule__is_active=True,
+        start_minute__gte=day_start,
+        end_minute__gt=start_minute,
+    )
+    if end is None:
+        queryset = queryset.filter(start_minute__lte=start_minute)
+    else:
+        queryset = queryset.filter(start_minute__lt=day_start + _minute_of_day(end, round_up=True))
+    rows = queryset.order_by().values_list(
+        'schedule_id', 'start_time', 'end_time', 'ids', 'schedule__name'
+    )
+    return [
+        (IndexedSlot(schedule_id, seconds_of_day(start_time), seconds_of_day(end_time), ids), name)
+        for schedule_id, start_time, end_time, ids, name in rows
+    ]
+
+
+def clear_interval_indexes():
+    with _indexes_lock:
+        _indexes.clear()
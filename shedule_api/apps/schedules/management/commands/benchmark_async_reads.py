@@ -0,0 +1,151 @@
+import asyncio
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.schedules.models import Schedule
+
+
+ENDPOINTS = ['list', 'detail', 'statistics', 'protected']
+MODES = {
+    'sync': '/api/v1/schedules/',
+    'async': '/api/v1/async/schedules/',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the sync DRF and async read endpoints by driving the ASGI application "
+        "in-process with concurrent requests."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help="User whose token and schedules are used.")
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=500,
+            help="Requests per endpoint and mode (default: 500).",
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=50,
+            help="Requests in flight at once (default: 50).",
+        )
+        parser.add_argument(
+            '--endpoints',
+            nargs='+',
+            choices=ENDPOINTS,
+            default=ENDPOINTS,
+            help="Endpoints to benchmark (default: all).",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['username']!r}.")
+        schedule_id = Schedule.objects.filter(owner=user).values_list('id', flat=True).first()
+        if 'detail' in options['endpoints'] and schedule_id is None:
+            raise CommandError("The detail endpoint needs the user to own at least one schedule.")
+
+        paths = {
+            'list': '',
+            'detail': f'{schedule_id}/',
+            'statistics': 'statistics/',
+            'protected': 'protected/',
+        }
+        token = str(RefreshToken.for_user(user).access_token)
+        application = get_asgi_application()
+
+        self.stdout.write(
+            f"{'endpoint':<12}{'mode':<7}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'errors':>8}"
+        )
+        for endpoint in options['endpoints']:
+            for mode, prefix in MODES.items():
+                result = asyncio.run(self._run(
+                    application,
+                    prefix + paths[endpoint],
+                    token,
+                    options['requests'],
+                    options['concurrency'],
+                ))
+                self.stdout.write(
+                    f"{endpoint:<12}{mode:<7}{result['rate']:>9.1f}{result['p50']:>9.1f}"
+                    f"{result['p95']:>9.1f}{result['errors']:>8}"
+                )
+
+    async def _run(self, application, path, token, total, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+        errors = 0
+
+        async def one():
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                status_code = await self._request(application, path, token)
+                latencies.append((time.perf_counter() - started) * 1000)
+                if status_code != 200:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            'rate': total / elapsed,
+            'p50': statistics.median(latencies),
+            'p95': latencies[int(len(latencies) * 0.95) - 1],
+            'errors': errors,
+        }
+
+    async def _request(self, application, path, token):
+        host = next(
+            (host for host in settings.ALLOWED_HOSTS if '*' not in host and not host.startswith('.')),
+            'localhost',
+        )
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': b'',
+            'root_path': '',
+            'headers': [
+                (b'host', host.encode()),
+                (b'authorization', f'Bearer {token}'.encode()),
+            ],
+            'client': ('127.0.0.1', 0),
+            'server': (host, 80),
+        }
+        messages = []
+        body_sent = False
+        finished = asyncio.Event()
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            # Like a real server, only report a disconnect once the response is out.
+            await finished.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            messages.append(message)
+            if message['type'] == 'http.response.body' and not message.get('more_body'):
+                finished.set()
+
+        await application(scope, receive, send)
+        return messages[0]['status']
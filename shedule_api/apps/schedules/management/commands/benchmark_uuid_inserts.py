@@ -0,0 +1,128 @@
+import math
+import time
+import uuid
+from datetime import time as time_of_day
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, transaction
+
+from apps.core.uuids import uuid7
+from apps.schedules.models import Schedule, TimeSlot
+
+
+GENERATORS = {
+    'uuid4': uuid.uuid4,
+    'uuid7': uuid7,
+}
+SLOTS_PER_SCHEDULE = 500
+# 7 days x 72 starts: distinct (day, start, end) keys for SLOTS_PER_SCHEDULE slots.
+SLOT_KEYS = [
+    (day, time_of_day(minute // 60, minute % 60), time_of_day((minute + 10) // 60, (minute + 10) % 60))
+    for day, _ in TimeSlot.DAYS_OF_WEEK
+    for minute in range(0, 24 * 60, 20)
+][:SLOTS_PER_SCHEDULE]
+
+
+def primary_key_index_bytes(table):
+    """Size of ``table``'s primary-key index, or ``None`` when the backend cannot tell."""
+    with connection.cursor() as cursor:
+        try:
+            if connection.vendor == 'postgresql':
+                cursor.execute(
+                    "SELECT pg_relation_size(indexrelid) FROM pg_index "
+                    "WHERE indrelid = %s::regclass AND indisprimary",
+                    [table],
+                )
+            elif connection.vendor == 'sqlite':
+                cursor.execute(
+                    "SELECT SUM(pgsize) FROM dbstat WHERE name = "
+                    "(SELECT name FROM pragma_index_list(%s) WHERE origin = 'pk')",
+                    [table],
+                )
+            else:
+                return None
+        except DatabaseError:
+            # SQLite builds without the dbstat table.
+            return None
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare insert throughput into time_slots with uuid4 and uuid7 primary keys. "
+        "Rows are committed batch by batch, then deleted again; run it against a scratch "
+        "database (SQLite or PostgreSQL via DATABASE_URL)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=50000,
+            help="Time slots inserted per run (default: 50000).",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help="Time slots per bulk INSERT and transaction (default: 1000).",
+        )
+        parser.add_argument(
+            '--rounds',
+            type=int,
+            default=2,
+            help="Alternating runs per generator (default: 2).",
+        )
+
+    def handle(self, *args, **options):
+        if options['rows'] < 1 or options['batch_size'] < 1 or options['rounds'] < 1:
+            raise CommandError("--rows, --batch-size and --rounds must be positive.")
+        if User.objects.filter(username='uuid-benchmark').exists():
+            raise CommandError("User 'uuid-benchmark' already exists; remove it or use another database.")
+
+        owner = User.objects.create_user(username='uuid-benchmark')
+        try:
+            self.stdout.write(
+                f"{connection.vendor}: {options['rows']} time slots per run, "
+                f"{options['batch_size']} per transaction"
+            )
+            self.stdout.write(f"{'generator':<11}{'round':>6}{'seconds':>10}{'rows/s':>10}{'pk index KiB':>14}")
+            for round_number in range(1, options['rounds'] + 1):
+                for name, generator in GENERATORS.items():
+                    elapsed, index_bytes = self._run(owner, generator, options['rows'], options['batch_size'])
+                    index_size = '-' if index_bytes is None else f'{index_bytes / 1024:.0f}'
+                    self.stdout.write(
+                        f"{name:<11}{round_number:>6}{elapsed:>10.2f}"
+                        f"{options['rows'] / elapsed:>10.0f}{index_size:>14}"
+                    )
+        finally:
+            owner.delete()
+
+    def _run(self, owner, generator, rows, batch_size):
+        schedules = [
+            Schedule(id=generator(), owner=owner, name=f'UUID benchmark {index}')
+            for index in range(math.ceil(rows / SLOTS_PER_SCHEDULE))
+        ]
+        Schedule.all_objects.bulk_create(schedules)
+        slots = islice((
+            TimeSlot(id=generator(), schedule=schedule, day_of_week=day, start_time=start, end_time=end, ids=[1])
+            for schedule in schedules
+            for day, start, end in SLOT_KEYS
+        ), rows)
+        before = primary_key_index_bytes(TimeSlot._meta.db_table)
+
+        # Only the INSERTs are timed, not building the model instances.
+        elapsed = 0.0
+        while batch := list(islice(slots, batch_size)):
+            started = time.perf_counter()
+            with transaction.atomic():
+                TimeSlot.all_objects.bulk_create(batch)
+            elapsed += time.perf_counter() - started
+
+        after = primary_key_index_bytes(TimeSlot._meta.db_table)
+        Schedule.all_objects.filter(owner=owner).delete()
+        index_bytes = None if before is None or after is None else after - before
+        return elapsed, index_bytes
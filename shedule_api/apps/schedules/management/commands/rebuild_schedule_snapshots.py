@@ -0,0 +1,76 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Prefetch
+
+from apps.schedules.bitmaps import render_occupancy
+from apps.schedules.documents import build_schedule_data, load_snapshot, refresh_schedule_snapshot
+from apps.schedules.models import Schedule, TimeSlot
+
+
+class Command(BaseCommand):
+    help = "Backfill or verify the pre-rendered weekly snapshots and occupancy bitmaps stored on schedules."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help="Number of schedules loaded and written per transaction (default: 500).",
+        )
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help="Only report schedules whose snapshot is missing or stale; write nothing.",
+        )
+        parser.add_argument(
+            '--missing-only',
+            action='store_true',
+            help="Only build snapshots for schedules that do not have one yet.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        verify = options['verify']
+
+        # Soft-deleted schedules are left alone: only active slots are
+        # prefetched, and restore() re-renders the snapshot anyway.
+        queryset = Schedule.objects.order_by('pk')
+        if options['missing_only']:
+            queryset = queryset.filter(schedule_snapshot__isnull=True)
+        slots = TimeSlot.objects.order_by('start_minute', 'end_minute')
+
+        processed = stale = 0
+        last_pk = None
+        while True:
+            batch_queryset = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            batch = list(
+                batch_queryset.prefetch_related(Prefetch('time_slots', queryset=slots))[:batch_size]
+            )
+            if not batch:
+                break
+
+            with transaction.atomic():
+                for schedule in batch:
+                    schedule_data = build_schedule_data(schedule.time_slots.all())
+                    slots_count = sum(len(day_slots) for day_slots in schedule_data.values())
+                    occupancy = schedule.occupancy
+                    if (load_snapshot(schedule) == schedule_data
+                            and schedule.snapshot_slots_count == slots_count
+                            and occupancy is not None
+                            and bytes(occupancy) == render_occupancy(schedule_data)):
+                        continue
+                    stale += 1
+                    if verify:
+                        self.stdout.write(f"Stale snapshot: {schedule.pk}")
+                    else:
+                        refresh_schedule_snapshot(schedule, schedule_data)
+
+            processed += len(batch)
+            last_pk = batch[-1].pk
+            self.stdout.write(f"Processed {processed} schedules ({stale} stale)")
+
+        if verify:
+            style = self.style.WARNING if stale else self.style.SUCCESS
+            self.stdout.write(style(f"Verified {processed} schedules: {stale} stale snapshots."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {stale} of {processed} schedule snapshots."))
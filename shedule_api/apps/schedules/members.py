@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, connections, router
+
+from .models import Schedule, TimeSlot, TimeSlotMember
+
+
+IDS_GIN_INDEX = 'time_slots_ids_gin_idx'
+
+
+def build_time_slot_members(time_slots):
+    """Return unsaved ``TimeSlotMember`` rows mirroring the ``ids`` of ``time_slots``."""
+    return [
+        TimeSlotMember(time_slot=time_slot, member_id=member_id)
+        for time_slot in time_slots
+        for member_id in dict.fromkeys(time_slot.ids)
+    ]
+
+
+def create_time_slot_members(time_slots, batch_size=1000):
+    """Index freshly inserted ``time_slots``."""
+    TimeSlotMember.objects.bulk_create(
+        build_time_slot_members(time_slots), batch_size=batch_size
+    )
+
+
+def replace_time_slot_members(time_slots, batch_size=1000):
+    """Re-index ``time_slots`` whose ``ids`` may have changed."""
+    TimeSlotMember.objects.filter(time_slot__in=[time_slot.pk for time_slot in time_slots]).delete()
+    create_time_slot_members(time_slots, batch_size=batch_size)
+
+
+def use_gin_lookup(db=connection):
+    return (
+        db.vendor == 'postgresql'
+        and getattr(settings, 'SCHEDULE_MEMBER_LOOKUP', 'table') == 'gin'
+    )
+
+
+def sync_ids_gin_index(using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    Build the GIN index on ``time_slots.ids`` while ``SCHEDULE_MEMBER_LOOKUP``
+    is ``'gin'`` and drop it otherwise, so other deployments do not pay for it
+    on every slot write. Runs after ``migrate`` (see ``SchedulesConfig``).
+    """
+    db = connections[using]
+    if db.vendor != 'postgresql' or not router.allow_migrate_model(using, TimeSlot):
+        return
+    with db.cursor() as cursor:
+        if use_gin_lookup(db):
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {IDS_GIN_INDEX} '
+                'ON time_slots USING gin (ids jsonb_path_ops)'
+            )
+        else:
+            cursor.execute(f'DROP INDEX IF EXISTS {IDS_GIN_INDEX}')
+
+
+def time_slots_containing(member_id):
+    """Active time slots whose ``ids`` contain ``member_id``."""
+    if use_gin_lookup():
+        return TimeSlot.objects.filter(ids__contains=[member_id])
+    return TimeSlot.objects.filter(
+        pk__in=TimeSlotMember.objects.filter(member_id=member_id).values('time_slot_id')
+    )
+
+
+def schedules_containing(member_id):
+    """Active schedules with at least one active time slot containing ``member_id``."""
+    return Schedule.objects.filter(
+        pk__in=time_slots_containing(member_id).values('schedule_id')
+    )
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-16 23:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schedule',
+            name='schedule_snapshot',
+            field=models.TextField(blank=True, editable=False, help_text='Pre-rendered weekly schedule JSON, maintained on write', null=True),
+        ),
+        migrations.AddField(
+            model_name='schedule',
+            name='snapshot_slots_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of active time slots in the snapshot'),
+        ),
+    ]
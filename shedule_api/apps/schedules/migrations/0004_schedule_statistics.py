@@ -0,0 +1,29 @@
+# Generated by Django 5.2.3 on 2026-10-16 23:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('schedules', '0003_schedule_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleStatistics',
+            fields=[
+                ('owner', models.OneToOneField(help_text='Owner these statistics were computed for', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='schedule_statistics', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('data', models.JSONField(default=dict, help_text='Materialized schedule_statistics payload')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Schedule Statistics',
+                'verbose_name_plural': 'Schedule Statistics',
+                'db_table': 'schedule_statistics',
+            },
+        ),
+    ]
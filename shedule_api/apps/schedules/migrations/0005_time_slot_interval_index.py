@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-16 23:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0004_schedule_statistics'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='timeslot',
+            index=models.Index(fields=['day_of_week', 'start_time', 'end_time'], name='time_slots_day_start_end_idx'),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.3 on 2026-10-16 23:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def backfill_time_slot_members(apps, schema_editor):
+    TimeSlot = apps.get_model('schedules', 'TimeSlot')
+    TimeSlotMember = apps.get_model('schedules', 'TimeSlotMember')
+    db_alias = schema_editor.connection.alias
+
+    last_pk = None
+    while True:
+        queryset = TimeSlot.objects.using(db_alias).order_by('pk')
+        if last_pk is not None:
+            queryset = queryset.filter(pk__gt=last_pk)
+        batch = list(queryset.values_list('pk', 'ids')[:BACKFILL_BATCH_SIZE])
+        if not batch:
+            break
+        TimeSlotMember.objects.using(db_alias).bulk_create([
+            TimeSlotMember(time_slot_id=pk, member_id=member_id)
+            for pk, ids in batch
+            for member_id in dict.fromkeys(ids or [])
+        ])
+        last_pk = batch[-1][0]
+
+
+def create_ids_gin_index(apps, schema_editor):
+    # Only for the 'gin' member lookup; the post_migrate handler in
+    # SchedulesConfig keeps the index in step with the setting afterwards.
+    if (schema_editor.connection.vendor != 'postgresql'
+            or getattr(settings, 'SCHEDULE_MEMBER_LOOKUP', 'table') != 'gin'):
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS time_slots_ids_gin_idx '
+        'ON time_slots USING gin (ids jsonb_path_ops)'
+    )
+
+
+def drop_ids_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS time_slots_ids_gin_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0005_time_slot_interval_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimeSlotMember',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('member_id', models.PositiveBigIntegerField(help_text='One entry of TimeSlot.ids')),
+                ('time_slot', models.ForeignKey(help_text='Time slot whose ids list contains this member', on_delete=django.db.models.deletion.CASCADE, related_name='members', to='schedules.timeslot')),
+            ],
+            options={
+                'verbose_name': 'Time Slot Member',
+                'verbose_name_plural': 'Time Slot Members',
+                'db_table': 'time_slot_members',
+                'constraints': [models.UniqueConstraint(fields=('member_id', 'time_slot'), name='time_slot_members_member_slot_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_time_slot_members, migrations.RunPython.noop),
+        migrations.RunPython(create_ids_gin_index, drop_ids_gin_index),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-16 23:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0006_time_slot_members'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schedule',
+            name='occupancy',
+            field=models.BinaryField(blank=True, help_text='Packed minute-of-week occupancy bitmap (10080 bits), maintained on write', null=True),
+        ),
+    ]
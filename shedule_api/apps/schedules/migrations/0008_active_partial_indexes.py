@@ -0,0 +1,35 @@
+# Generated by Django 5.2.3 on 2026-10-17 00:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0007_schedule_occupancy'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='timeslot',
+            name='time_slots_day_start_end_idx',
+        ),
+        migrations.AddIndex(
+            model_name='schedule',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['owner', '-created_at', '-id'], name='sched_active_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='schedule',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['owner', 'id', 'updated_at', 'version'], name='sched_active_owner_state_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timeslot',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['day_of_week', 'start_time', 'end_time'], name='time_slots_day_start_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timeslot',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['schedule', 'start_time', 'end_time'], name='slots_active_sched_start_idx'),
+        ),
+    ]
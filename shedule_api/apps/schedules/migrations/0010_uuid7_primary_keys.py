@@ -0,0 +1,30 @@
+# Generated by Django 5.2.3 on 2026-10-17 00:23
+
+import apps.core.uuids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0009_inactive_updated_indexes'),
+    ]
+
+    # The default is applied in Python, not by the database; altering the
+    # field for real would only rebuild both tables on SQLite.
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='schedule',
+                    name='id',
+                    field=models.UUIDField(default=apps.core.uuids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='timeslot',
+                    name='id',
+                    field=models.UUIDField(default=apps.core.uuids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+            ],
+        ),
+    ]
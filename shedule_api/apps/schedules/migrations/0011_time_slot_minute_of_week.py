@@ -0,0 +1,75 @@
+# Generated by Django 5.2.3 on 2026-10-17 00:41
+
+import apps.schedules.models
+from django.db import migrations, models
+
+
+BACKFILL_BATCH_SIZE = 1000
+MINUTES_PER_DAY = 24 * 60
+DAY_NAMES = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+
+def _minute_of_week(day, value):
+    return DAY_NAMES.index(day) * MINUTES_PER_DAY + value.hour * 60 + value.minute
+
+
+def backfill_minutes_of_week(apps, schema_editor):
+    TimeSlot = apps.get_model('schedules', 'TimeSlot')
+    db_alias = schema_editor.connection.alias
+
+    last_pk = None
+    while True:
+        queryset = TimeSlot.objects.using(db_alias).order_by('pk')
+        if last_pk is not None:
+            queryset = queryset.filter(pk__gt=last_pk)
+        batch = list(queryset.only('pk', 'day_of_week', 'start_time', 'end_time')[:BACKFILL_BATCH_SIZE])
+        if not batch:
+            break
+        for time_slot in batch:
+            time_slot.start_minute = _minute_of_week(time_slot.day_of_week, time_slot.start_time)
+            time_slot.end_minute = _minute_of_week(time_slot.day_of_week, time_slot.end_time)
+        TimeSlot.objects.using(db_alias).bulk_update(batch, ['start_minute', 'end_minute'])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0010_uuid7_primary_keys'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='timeslot',
+            name='start_minute',
+            field=apps.schedules.models.MinuteOfWeekField(default=0, editable=False, help_text='Minute of the week the slot starts (Monday 00:00 is 0)', time_field='start_time'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='timeslot',
+            name='end_minute',
+            field=apps.schedules.models.MinuteOfWeekField(default=0, editable=False, help_text='Minute of the week the slot ends (Monday 00:00 is 0)', time_field='end_time'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_minutes_of_week, migrations.RunPython.noop),
+        migrations.AlterModelOptions(
+            name='timeslot',
+            options={'ordering': ['start_minute', 'end_minute'], 'verbose_name': 'Time Slot', 'verbose_name_plural': 'Time Slots'},
+        ),
+        migrations.RemoveIndex(
+            model_name='timeslot',
+            name='time_slots_day_start_end_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='timeslot',
+            name='slots_active_sched_start_idx',
+        ),
+        migrations.AddIndex(
+            model_name='timeslot',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['start_minute', 'end_minute'], name='slots_active_week_range_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timeslot',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['schedule', 'start_minute', 'end_minute'], name='slots_active_sched_minute_idx'),
+        ),
+    ]
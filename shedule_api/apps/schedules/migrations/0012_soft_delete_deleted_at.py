@@ -0,0 +1,46 @@
+# Generated by Django 5.2.3 on 2026-10-17 01:18
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def backfill_deleted_at(apps, schema_editor):
+    # Until now a cascade wrote one updated_at to the schedule and its slots,
+    # so rows deactivated together still share it.
+    db_alias = schema_editor.connection.alias
+    for model_name in ('Schedule', 'TimeSlot'):
+        model = apps.get_model('schedules', model_name)
+        last_pk = None
+        while True:
+            queryset = model.objects.using(db_alias).filter(is_active=False).order_by('pk')
+            if last_pk is not None:
+                queryset = queryset.filter(pk__gt=last_pk)
+            pks = list(queryset.values_list('pk', flat=True)[:BACKFILL_BATCH_SIZE])
+            if not pks:
+                break
+            model.objects.using(db_alias).filter(pk__in=pks).update(deleted_at=F('updated_at'))
+            last_pk = pks[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0011_time_slot_minute_of_week'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schedule',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='timeslot',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_deleted_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-17 01:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0012_soft_delete_deleted_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schedulestatistics',
+            name='data_version',
+            field=models.PositiveIntegerField(blank=True, help_text='Version the stored data was computed at; stale when it differs', null=True),
+        ),
+        migrations.AddField(
+            model_name='schedulestatistics',
+            name='version',
+            field=models.PositiveIntegerField(default=0, help_text="Incremented by every write to the owner's schedules"),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.3 on 2026-10-17 01:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0013_schedule_statistics_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='schedule',
+            name='sched_inactive_updated_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='timeslot',
+            name='slots_inactive_updated_idx',
+        ),
+        migrations.AddIndex(
+            model_name='schedule',
+            index=models.Index(condition=models.Q(('is_active', False)), fields=['deleted_at', 'id'], name='sched_inactive_deleted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timeslot',
+            index=models.Index(condition=models.Q(('is_active', False)), fields=['deleted_at', 'id'], name='slots_inactive_deleted_idx'),
+        ),
+    ]
@@ -1,9 +1,84 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.core.validators import RegexValidator
 from django.core.exceptions import ValidationError
 from apps.core.models import BaseModel
-from apps.core.managers import ActiveManager, AllObjectsManager
+from apps.core.managers import ActiveManager, AllObjectsManager, SoftDeleteQuerySet
+
+
+MINUTES_PER_DAY = 24 * 60
+
+
+class MinuteOfWeekField(models.PositiveIntegerField):
+    """
+    Minute of the week (Monday 00:00 is 0) of the slot's ``time_field`` on its
+    ``day_of_week``, recomputed whenever the row is saved or bulk created.
+    """
+
+    def __init__(self, *args, time_field=None, **kwargs):
+        self.time_field = time_field
+        kwargs.setdefault('editable', False)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['time_field'] = self.time_field
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        opts = model_instance._meta
+        days = [day for day, _ in opts.get_field('day_of_week').choices]
+        value = opts.get_field(self.time_field).to_python(getattr(model_instance, self.time_field))
+        minute = days.index(model_instance.day_of_week) * MINUTES_PER_DAY + value.hour * 60 + value.minute
+        setattr(model_instance, self.attname, minute)
+        return minute
+
+
+class ScheduleQuerySet(SoftDeleteQuerySet):
+    cascade = ('time_slots',)
+
+    def active_updates(self, is_active, now):
+        # As in Schedule.save(): every write bumps the ETag version.
+        return {**super().active_updates(is_active, now), 'version': models.F('version') + 1}
+
+    def _set_active(self, is_active):
+        from .documents import refresh_schedule_snapshot
+        from .statistics import invalidate_owner_statistics, materialized_statistics_enabled
+
+        with transaction.atomic(using=self.db):
+            owner_ids = []
+            if materialized_statistics_enabled():
+                owner_ids = list(
+                    self.exclude(is_active=is_active).order_by()
+                    .values_list('owner_id', flat=True).distinct()
+                )
+            restored_ids = []
+            if is_active:
+                restored_ids = list(self.exclude(is_active=True).values_list('pk', flat=True))
+            changed = super()._set_active(is_active)
+            # The cascade brings slots back, so the snapshots have to follow.
+            for schedule in Schedule.all_objects.filter(pk__in=restored_ids):
+                refresh_schedule_snapshot(schedule)
+            for owner_id in owner_ids:
+                invalidate_owner_statistics(owner_id)
+        return changed
+
+
+class TimeSlotQuerySet(SoftDeleteQuerySet):
+
+    def _set_active(self, is_active):
+        from .documents import refresh_schedule_snapshot
+
+        with transaction.atomic(using=self.db):
+            schedule_ids = list(
+                self.exclude(is_active=is_active).order_by()
+                .values_list('schedule_id', flat=True).distinct()
+            )
+            changed = super()._set_active(is_active)
+            # One snapshot per affected schedule rather than per slot.
+            for schedule in Schedule.all_objects.filter(pk__in=schedule_ids):
+                refresh_schedule_snapshot(schedule)
+        return changed
 
 
 class Schedule(BaseModel):    
@@ -15,39 +90,94 @@ class Schedule(BaseModel):
         related_name='schedules',
         help_text="Owner of the schedule"
     )
+    schedule_snapshot = models.TextField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Pre-rendered weekly schedule JSON, maintained on write"
+    )
+    snapshot_slots_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of active time slots in the snapshot"
+    )
+    occupancy = models.BinaryField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Packed minute-of-week occupancy bitmap (10080 bits), maintained on write"
+    )
+    version = models.PositiveIntegerField(
+        default=1,
+        editable=False,
+        help_text="Incremented on every write; part of the HTTP ETag"
+    )
 
-    objects = ActiveManager()
-    all_objects = AllObjectsManager()
+    objects = ActiveManager.from_queryset(ScheduleQuerySet)()
+    all_objects = AllObjectsManager.from_queryset(ScheduleQuerySet)()
 
     class Meta:
         db_table = 'schedules'
         verbose_name = 'Schedule'
         verbose_name_plural = 'Schedules'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['owner', 'is_active', 'updated_at'],
+                name='schedules_owner_updated_idx',
+            ),
+            # Partial indexes over live rows (ActiveManager); backends without
+            # partial index support build them over every row instead.
+            models.Index(
+                fields=['owner', '-created_at', '-id'],
+                name='sched_active_owner_created_idx',
+                condition=models.Q(is_active=True),
+            ),
+            models.Index(
+                fields=['owner', 'id', 'updated_at', 'version'],
+                name='sched_active_owner_state_idx',
+                condition=models.Q(is_active=True),
+            ),
+            # Soft-deleted rows, oldest first, for the retention compaction.
+            models.Index(
+                fields=['deleted_at', 'id'],
+                name='sched_inactive_deleted_idx',
+                condition=models.Q(is_active=False),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.owner.username}"
 
+    def save(self, *args, **kwargs):        
+        from .statistics import invalidate_owner_statistics
+
+        if not self._state.adding:
+            self.version += 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'version'}
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            invalidate_owner_statistics(self.owner_id)
+
+    def delete(self, *args, **kwargs):        
+        from .statistics import invalidate_owner_statistics
+
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            invalidate_owner_statistics(self.owner_id)
+        return result
+
     def get_schedule_data(self):        
-        schedule_data = {
-            'monday': [],
-            'tuesday': [],
-            'wednesday': [],
-            'thursday': [],
-            'friday': [],
-            'saturday': [],
-            'sunday': []
-        }
-
-        for time_slot in self.time_slots.all():
-            day_data = {
-                'start': time_slot.start_time.strftime('%H:%M'),
-                'stop': time_slot.end_time.strftime('%H:%M'),
-                'ids': time_slot.ids
-            }
-            schedule_data[time_slot.day_of_week].append(day_data)
-
-        return {'schedule': schedule_data}
+        from .documents import fetch_schedule_data
+
+        return {'schedule': fetch_schedule_data(self)}
+
+    def refresh_snapshot(self):        
+        from .documents import refresh_schedule_snapshot
+
+        refresh_schedule_snapshot(self)
 
 
 class TimeSlot(BaseModel):    
@@ -78,16 +208,43 @@ class TimeSlot(BaseModel):
         default=list,
         help_text="List of IDs associated with this time slot"
     )
+    # Integer encoding of (day_of_week, start_time/end_time): sorts Monday
+    # first and turns time range filters into integer comparisons.
+    start_minute = MinuteOfWeekField(
+        time_field='start_time',
+        help_text="Minute of the week the slot starts (Monday 00:00 is 0)"
+    )
+    end_minute = MinuteOfWeekField(
+        time_field='end_time',
+        help_text="Minute of the week the slot ends (Monday 00:00 is 0)"
+    )
 
-    objects = ActiveManager()
-    all_objects = AllObjectsManager()
+    objects = ActiveManager.from_queryset(TimeSlotQuerySet)()
+    all_objects = AllObjectsManager.from_queryset(TimeSlotQuerySet)()
 
     class Meta:
         db_table = 'time_slots'
         verbose_name = 'Time Slot'
         verbose_name_plural = 'Time Slots'
-        ordering = ['day_of_week', 'start_time']
+        ordering = ['start_minute', 'end_minute']
         unique_together = ['schedule', 'day_of_week', 'start_time', 'end_time']
+        indexes = [
+            models.Index(
+                fields=['start_minute', 'end_minute'],
+                name='slots_active_week_range_idx',
+                condition=models.Q(is_active=True),
+            ),
+            models.Index(
+                fields=['schedule', 'start_minute', 'end_minute'],
+                name='slots_active_sched_minute_idx',
+                condition=models.Q(is_active=True),
+            ),
+            models.Index(
+                fields=['deleted_at', 'id'],
+                name='slots_inactive_deleted_idx',
+                condition=models.Q(is_active=False),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.schedule.name} - {self.day_of_week} ({self.start_time}-{self.end_time})"
@@ -105,5 +262,72 @@ class TimeSlot(BaseModel):
             raise ValidationError("All IDs must be positive integers.")
 
     def save(self, *args, **kwargs):        
+        from .members import replace_time_slot_members
+
         self.clean()
-        super().save(*args, **kwargs)
\ No newline at end of file
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'day_of_week', 'start_time', 'end_time'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'start_minute', 'end_minute'}
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            replace_time_slot_members([self])
+            self.schedule.refresh_snapshot()
+
+    def delete(self, *args, **kwargs):        
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            self.schedule.refresh_snapshot()
+        return result
+
+
+class TimeSlotMember(models.Model):    
+    time_slot = models.ForeignKey(
+        TimeSlot,
+        on_delete=models.CASCADE,
+        related_name='members',
+        help_text="Time slot whose ids list contains this member"
+    )
+    member_id = models.PositiveBigIntegerField(help_text="One entry of TimeSlot.ids")
+
+    class Meta:
+        db_table = 'time_slot_members'
+        verbose_name = 'Time Slot Member'
+        verbose_name_plural = 'Time Slot Members'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['member_id', 'time_slot'],
+                name='time_slot_members_member_slot_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.member_id} - {self.time_slot_id}"
+
+
+class ScheduleStatistics(models.Model):    
+    owner = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='schedule_statistics',
+        help_text="Owner these statistics were computed for"
+    )
+    data = models.JSONField(default=dict, help_text="Materialized schedule_statistics payload")
+    version = models.PositiveIntegerField(
+        default=0,
+        help_text="Incremented by every write to the owner's schedules"
+    )
+    data_version = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Version the stored data was computed at; stale when it differs"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'schedule_statistics'
+        verbose_name = 'Schedule Statistics'
+        verbose_name_plural = 'Schedule Statistics'
+
+    def __str__(self):
+        return f"Statistics - {self.owner_id}"
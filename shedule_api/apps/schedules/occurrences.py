@@ -0,0 +1,78 @@
+from collections import namedtuple
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from .models import TimeSlot
+
+
+DAY_NAMES = [day for day, _ in TimeSlot.DAYS_OF_WEEK]
+ONE_DAY = timedelta(days=1)
+
+Occurrence = namedtuple('Occurrence', ['start', 'end', 'schedule_id', 'ids'])
+
+
+def _offset(value):
+    return timedelta(hours=value.hour, minutes=value.minute, seconds=value.second)
+
+
+def build_week_template(time_slots):
+    """
+    Group ``(schedule_id, day_of_week, start_time, end_time, ids)`` rows into
+    one list per weekday (Monday first), sorted by start and end.
+
+    Each entry carries its offsets from local midnight, computed once and
+    reused for every week of an expansion.
+    """
+    template = [[] for _ in DAY_NAMES]
+    for schedule_id, day, start_time, end_time, ids in time_slots:
+        template[DAY_NAMES.index(day)].append(
+            (_offset(start_time), _offset(end_time), start_time, end_time, schedule_id, ids)
+        )
+    for slots in template:
+        slots.sort(key=lambda slot: (slot[0], slot[1], str(slot[4])))
+    return template
+
+
+def _to_utc(day, value, tz):
+    # fold=0: a time skipped by a DST gap moves forward by the gap and an
+    # ambiguous time resolves to its first occurrence.
+    return datetime.combine(day, value, tzinfo=tz).astimezone(dt_timezone.utc)
+
+
+def expand_occurrences(template, start_date, end_date, tz):
+    """
+    Lazily yield the ``Occurrence`` of every slot in ``template`` from
+    ``start_date`` to ``end_date`` inclusive, in chronological order, with
+    UTC ``start``/``end`` datetimes for the IANA timezone ``tz``.
+
+    Days without a UTC offset change reuse the template offsets from that
+    day's UTC midnight; only DST transition days convert each slot on its own.
+    """
+    day = start_date
+    midnight = datetime.combine(day, time(0), tzinfo=tz)
+    while day <= end_date:
+        next_midnight = datetime.combine(day + ONE_DAY, time(0), tzinfo=tz)
+        slots = template[day.weekday()]
+        if slots:
+            if midnight.utcoffset() == next_midnight.utcoffset():
+                base = midnight.astimezone(dt_timezone.utc)
+                for start_offset, end_offset, _, _, schedule_id, ids in slots:
+                    yield Occurrence(base + start_offset, base + end_offset, schedule_id, ids)
+            else:
+                # Order can change on a transition day, e.g. 01:30 falling
+                # back after 01:45.
+                converted = [
+                    Occurrence(_to_utc(day, start_time, tz), _to_utc(day, end_time, tz), schedule_id, ids)
+                    for _, _, start_time, end_time, schedule_id, ids in slots
+                ]
+                converted.sort(key=lambda occurrence: (occurrence.start, occurrence.end))
+                yield from converted
+        day += ONE_DAY
+        midnight = next_midnight
+
+
+def schedule_occurrences(queryset, start_date, end_date, tz):
+    """Expand the active time slots of ``queryset``'s schedules, loaded with one query."""
+    time_slots = TimeSlot.objects.filter(schedule__in=queryset).order_by().values_list(
+        'schedule_id', 'day_of_week', 'start_time', 'end_time', 'ids'
+    )
+    return expand_occurrences(build_week_template(time_slots), start_date, end_date, tz)
@@ -0,0 +1,69 @@
+"""
+Retention for soft-deleted schedules and time slots.
+
+``soft_delete`` only clears ``is_active`` and stamps ``deleted_at``, so dead
+rows stay in the tables. Rows deleted more than the retention window ago are
+removed here oldest first, a bounded batch per short transaction, so the
+compaction can run next to live traffic. Expiry follows ``deleted_at``, not
+``updated_at``, so later writes to a dead row do not postpone its purge.
+"""
+from datetime import timedelta
+
+from django.core import serializers
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Schedule, TimeSlot, TimeSlotMember
+
+
+def retention_cutoff(days, now=None):
+    return (now or timezone.now()) - timedelta(days=days)
+
+
+def expired_schedules(cutoff):
+    """Inactive schedules deleted before ``cutoff``; their slots go with them."""
+    return Schedule.all_objects.filter(is_active=False, deleted_at__lt=cutoff)
+
+
+def expired_time_slots(cutoff):
+    return TimeSlot.all_objects.filter(is_active=False, deleted_at__lt=cutoff)
+
+
+def _archive(model, pks, stream):
+    """Write the rows about to be deleted, cascades included, as ``loaddata``-able JSON Lines."""
+    if model is Schedule:
+        querysets = [
+            Schedule.all_objects.filter(pk__in=pks),
+            TimeSlot.all_objects.filter(schedule_id__in=pks),
+            TimeSlotMember.objects.filter(time_slot__schedule_id__in=pks),
+        ]
+    else:
+        querysets = [
+            TimeSlot.all_objects.filter(pk__in=pks),
+            TimeSlotMember.objects.filter(time_slot_id__in=pks),
+        ]
+    for queryset in querysets:
+        serializers.serialize('jsonl', queryset.order_by('pk'), stream=stream)
+    stream.flush()
+
+
+def compact(queryset, batch_size, archive=None):
+    """
+    Delete the rows of ``queryset`` (``expired_schedules`` or
+    ``expired_time_slots``) oldest first, ``batch_size`` rows per transaction.
+    Rows locked by a concurrent write are skipped and left for the next run.
+    Yields the ``{model label: rows}`` deleted by each batch, cascades included.
+    """
+    oldest = queryset.order_by('deleted_at', 'pk')
+    while True:
+        with transaction.atomic():
+            pks = list(
+                oldest.select_for_update(skip_locked=True).values_list('pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                return
+            if archive is not None:
+                _archive(queryset.model, pks, archive)
+            # Re-applying the filter keeps rows restored in the meantime.
+            _, deleted = queryset.filter(pk__in=pks).delete()
+        yield deleted
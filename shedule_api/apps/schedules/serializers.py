@@ -1,6 +1,19 @@
 
+import zoneinfo
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
+from schedule_api.database import retry_on_lock
 from .models import Schedule, TimeSlot
+from .members import create_time_slot_members, replace_time_slot_members
+from .documents import (
+    build_schedule_data,
+    fetch_schedule_data,
+    load_snapshot,
+    refresh_schedule_snapshot,
+)
 
 
 
@@ -13,6 +26,8 @@ class TimeSlotSerializer(serializers.ModelSerializer):
         fields = ['id', 'day_of_week', 'start', 'stop', 'ids']
         extra_kwargs = {
             'id': {'read_only': True},
+            # Nested under its day key in ScheduleDataSerializer
+            'day_of_week': {'read_only': True},
         }
 
     def validate_ids(self, value):
@@ -51,11 +66,28 @@ class ScheduleDataSerializer(serializers.Serializer):
     sunday = TimeSlotSerializer(many=True, required=False)
 
 
+def build_time_slots(schedule, schedule_data):
+    """Unsaved ``TimeSlot`` rows for validated ``{day: [slot, ...]}`` data."""
+    return [
+        TimeSlot(
+            schedule=schedule,
+            day_of_week=day,
+            start_time=slot_data['start_time'],
+            end_time=slot_data['end_time'],
+            ids=slot_data['ids'],
+        )
+        for day, slots in schedule_data.items()
+        for slot_data in slots
+    ]
+
+
 class ScheduleCreateUpdateSerializer(serializers.Serializer):
     
     name = serializers.CharField(max_length=255)
     description = serializers.CharField(required=False, allow_blank=True)
     schedule = ScheduleDataSerializer()
+    # Set by update(): counts of created/updated/deleted/unchanged slots
+    time_slot_changes = None
 
     def validate_schedule(self, value):
         
@@ -65,10 +97,19 @@ class ScheduleCreateUpdateSerializer(serializers.Serializer):
             if day not in valid_days:
                 raise serializers.ValidationError(f"Invalid day: {day}")
         
+        for day, slots in value.items():
+            keys = [(slot['start_time'], slot['end_time']) for slot in slots]
+            if len(keys) != len(set(keys)):
+                raise serializers.ValidationError(f"Duplicate time slot on {day}.")
+        
         return value
 
+    @retry_on_lock
+    @transaction.atomic
     def create(self, validated_data):
         
+        # retry_on_lock replays this call with the same dict, so pop from a copy.
+        validated_data = dict(validated_data)
         schedule_data = validated_data.pop('schedule')
         user = self.context['request'].user
         
@@ -78,10 +119,14 @@ class ScheduleCreateUpdateSerializer(serializers.Serializer):
         )
         
         self._create_time_slots(schedule, schedule_data)
+        refresh_schedule_snapshot(schedule)
         return schedule
 
+    @retry_on_lock
+    @transaction.atomic
     def update(self, instance, validated_data):
         
+        validated_data = dict(validated_data)
         schedule_data = validated_data.pop('schedule', None)
         
         # Update schedule fields
@@ -89,45 +134,86 @@ class ScheduleCreateUpdateSerializer(serializers.Serializer):
             setattr(instance, attr, value)
         instance.save()
         
+        self.time_slot_changes = None
         if schedule_data:
-            # Delete existing time slots
-            instance.time_slots.all().delete()
-            # Create new time slots
-            self._create_time_slots(instance, schedule_data)
+            self.time_slot_changes = self._sync_time_slots(instance, schedule_data)
+            if any(self.time_slot_changes[key] for key in ('created', 'updated', 'deleted')):
+                refresh_schedule_snapshot(instance)
         
         return instance
 
-    def _create_time_slots(self, schedule, schedule_data):
-        
-        time_slots_to_create = []
+    def _sync_time_slots(self, schedule, schedule_data):
         
-        for day, slots in schedule_data.items():
-            for slot_data in slots:
-                time_slot = TimeSlot(
-                    schedule=schedule,
-                    day_of_week=day,
-                    start_time=slot_data['start_time'],
-                    end_time=slot_data['end_time'],
-                    ids=slot_data['ids']
-                )
-                time_slots_to_create.append(time_slot)
+        # Diff the submitted week against the stored rows on
+        # (day_of_week, start_time, end_time) so unchanged slots keep their
+        # primary keys and are not rewritten.
+        desired = {
+            (day, slot_data['start_time'], slot_data['end_time']): slot_data['ids']
+            for day, slots in schedule_data.items()
+            for slot_data in slots
+        }
+        existing = {
+            (time_slot.day_of_week, time_slot.start_time, time_slot.end_time): time_slot
+            for time_slot in TimeSlot.all_objects.filter(schedule=schedule)
+        }
+
+        now = timezone.now()
+        to_update, to_delete = [], []
+        unchanged = 0
+        for key, time_slot in existing.items():
+            if key not in desired:
+                if time_slot.is_active:
+                    to_delete.append(time_slot.pk)
+                continue
+            ids = desired[key]
+            if time_slot.is_active and time_slot.ids == ids:
+                unchanged += 1
+                continue
+            time_slot.ids = ids
+            time_slot.is_active = True
+            time_slot.deleted_at = None
+            time_slot.updated_at = now
+            to_update.append(time_slot)
+
+        if to_delete:
+            TimeSlot.all_objects.filter(pk__in=to_delete).delete()
+        if to_update:
+            TimeSlot.all_objects.bulk_update(to_update, ['ids', 'is_active', 'deleted_at', 'updated_at'])
+            replace_time_slot_members(to_update)
+        new_slots = {}
+        for day, start_time, end_time in desired.keys() - existing.keys():
+            new_slots.setdefault(day, []).append({
+                'start_time': start_time,
+                'end_time': end_time,
+                'ids': desired[(day, start_time, end_time)],
+            })
+        created = self._create_time_slots(schedule, new_slots)
+
+        return {
+            'created': len(created),
+            'updated': len(to_update),
+            'deleted': len(to_delete),
+            'unchanged': unchanged,
+        }
+
+    def _create_time_slots(self, schedule, schedule_data):
         
+        time_slots_to_create = build_time_slots(schedule, schedule_data)
         TimeSlot.objects.bulk_create(time_slots_to_create)
+        create_time_slot_members(time_slots_to_create)
+        return time_slots_to_create
 
 
 class ScheduleListSerializer(serializers.ModelSerializer):
   
     owner = serializers.StringRelatedField(read_only=True)
-    time_slots_count = serializers.SerializerMethodField()
+    # Annotated by ScheduleListCreateAPIView.get_queryset()
+    time_slots_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Schedule
         fields = ['id', 'name', 'description', 'owner', 'time_slots_count', 'created_at', 'updated_at']
 
-    def get_time_slots_count(self, obj):
-        
-        return obj.time_slots.count()
-
 
 class ScheduleDetailSerializer(serializers.ModelSerializer):
    
@@ -140,22 +226,88 @@ class ScheduleDetailSerializer(serializers.ModelSerializer):
 
     def get_schedule(self, obj):
        
-        schedule_data = {
-            'monday': [],
-            'tuesday': [],
-            'wednesday': [],
-            'thursday': [],
-            'friday': [],
-            'saturday': [],
-            'sunday': []
-        }
+        # Serve the snapshot maintained on write; fall back to building the
+        # document for rows that predate it or were never backfilled.
+        snapshot = load_snapshot(obj)
+        if snapshot is not None:
+            return snapshot
+        if 'time_slots' in getattr(obj, '_prefetched_objects_cache', {}):
+            return build_schedule_data(obj.time_slots.all())
+        return fetch_schedule_data(obj)
+
 
-        for time_slot in obj.time_slots.all():
-            day_data = {
-                'start': time_slot.start_time.strftime('%H:%M'),
-                'stop': time_slot.end_time.strftime('%H:%M'),
-                'ids': time_slot.ids
-            }
-            schedule_data[time_slot.day_of_week].append(day_data)
+class ActiveSlotQuerySerializer(serializers.Serializer):
+    
+    day = serializers.ChoiceField(choices=TimeSlot.DAYS_OF_WEEK)
+    time = serializers.TimeField(required=False)
+    start = serializers.TimeField(required=False)
+    stop = serializers.TimeField(required=False)
+
+    def validate(self, data):
+        
+        has_point = 'time' in data
+        has_range = 'start' in data or 'stop' in data
+        if has_point == has_range:
+            raise serializers.ValidationError("Provide either 'time' or both 'start' and 'stop'.")
+        if has_range:
+            if 'start' not in data or 'stop' not in data:
+                raise serializers.ValidationError("Both 'start' and 'stop' are required for a range.")
+            if data['start'] >= data['stop']:
+                raise serializers.ValidationError("Start time must be before stop time.")
+        return data
 
-        return schedule_data
\ No newline at end of file
+
+class FreeBusyQuerySerializer(serializers.Serializer):
+    
+    schedule_ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        required=False,
+        allow_empty=False,
+        max_length=10000,
+        help_text="Schedules to combine; defaults to every active schedule of the user"
+    )
+    min_minutes = serializers.IntegerField(
+        default=1,
+        min_value=1,
+        max_value=24 * 60,
+        help_text="Shortest free or common window to report"
+    )
+
+
+class BulkDeactivateSerializer(serializers.Serializer):
+    
+    ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        allow_empty=False,
+        max_length=10000,
+        help_text="Schedules to deactivate, together with their time slots"
+    )
+
+
+class OccurrenceQuerySerializer(serializers.Serializer):
+    
+    start = serializers.DateField(help_text="First local date of the range")
+    end = serializers.DateField(help_text="Last local date of the range (inclusive)")
+    tz = serializers.CharField(default='UTC', help_text="IANA timezone of the weekly template")
+    schedule_ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        required=False,
+        allow_empty=False,
+        help_text="Schedules to expand; defaults to every active schedule of the user"
+    )
+
+    def validate_tz(self, value):
+        
+        try:
+            return zoneinfo.ZoneInfo(value)
+        except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+            raise serializers.ValidationError(f"Unknown timezone: {value}")
+
+    def validate(self, data):
+        
+        if data['start'] > data['end']:
+            raise serializers.ValidationError("Start date must not be after end date.")
+        max_days = settings.SCHEDULE_OCCURRENCES_MAX_DAYS
+        if (data['end'] - data['start']).days + 1 > max_days:
+            raise serializers.ValidationError(f"The range may span at most {max_days} days.")
+        return data
@@ -0,0 +1,182 @@
+from datetime import time
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, Value, When
+from django.utils import timezone
+
+from schedule_api.replicas import use_primary
+
+from .bitmaps import OccupancyMatrix, coverage_by_day
+from .models import Schedule, ScheduleStatistics, TimeSlot, TimeSlotMember
+
+
+DAY_NAMES = [day for day, _ in TimeSlot.DAYS_OF_WEEK]
+HOURS = range(24)
+
+
+def materialized_statistics_enabled():
+    return getattr(settings, 'SCHEDULE_STATISTICS_MATERIALIZED', False)
+
+
+def _owner_time_slots(owner_id):
+    return TimeSlot.objects.filter(schedule__owner_id=owner_id, schedule__is_active=True)
+
+
+def _overlaps_hour(hour):
+    condition = Q(end_time__gt=time(hour))
+    if hour < 23:
+        condition &= Q(start_time__lt=time(hour + 1))
+    return condition
+
+
+def _slot_aggregates(owner_id):
+    """
+    One GROUP BY day_of_week over the owner's active slots returning slot
+    counts, scheduled minutes and per-hour overlap counts.
+    """
+    hour_aggregates = {
+        f'hour_{hour}': Count(Case(
+            When(_overlaps_hour(hour), then=Value(1)),
+            output_field=IntegerField(),
+        ))
+        for hour in HOURS
+    }
+    return (
+        _owner_time_slots(owner_id)
+        .order_by()
+        .values('day_of_week')
+        .annotate(
+            slots=Count('id'),
+            minutes=Sum(F('end_minute') - F('start_minute'), output_field=IntegerField()),
+            **hour_aggregates,
+        )
+    )
+
+
+def _owner_members(owner_id):
+    return TimeSlotMember.objects.filter(
+        time_slot__in=_owner_time_slots(owner_id)
+    ).order_by()
+
+
+def _distinct_ids_by_day(members):
+    return members.values_list('time_slot__day_of_week').annotate(
+        count=Count('member_id', distinct=True)
+    )
+
+
+def _distinct_ids_total():
+    return {'count': Count('member_id', distinct=True)}
+
+
+def _assemble_statistics(slot_rows, distinct_rows, distinct_ids, total_schedules, occupancy):
+    """Shape the query results shared by the sync and async paths into the payload."""
+    schedules_by_day = dict.fromkeys(DAY_NAMES, 0)
+    minutes_by_day = dict.fromkeys(DAY_NAMES, 0)
+    hours_by_day = {day: [0] * len(HOURS) for day in DAY_NAMES}
+    for row in slot_rows:
+        day = row['day_of_week']
+        schedules_by_day[day] = row['slots']
+        minutes_by_day[day] = row['minutes'] or 0
+        hours_by_day[day] = [row[f'hour_{hour}'] for hour in HOURS]
+
+    busiest_hour = None
+    for day in DAY_NAMES:
+        for hour, count in enumerate(hours_by_day[day]):
+            if count and (busiest_hour is None or count > busiest_hour['slots']):
+                busiest_hour = {'day': day, 'hour': hour, 'slots': count}
+
+    distinct_ids_by_day = dict.fromkeys(DAY_NAMES, 0)
+    for day, count in distinct_rows:
+        distinct_ids_by_day[day] = count
+    # Minutes covered by at least one schedule; overlapping slots count once.
+    covered_by_day = coverage_by_day(occupancy)
+
+    return {
+        'total_schedules': total_schedules,
+        'total_time_slots': sum(schedules_by_day.values()),
+        'schedules_by_day': schedules_by_day,
+        'total_minutes': sum(minutes_by_day.values()),
+        'minutes_by_day': minutes_by_day,
+        'covered_minutes': sum(covered_by_day.values()),
+        'covered_minutes_by_day': covered_by_day,
+        'distinct_ids': distinct_ids,
+        'distinct_ids_by_day': distinct_ids_by_day,
+        'hours_by_day': hours_by_day,
+        'busiest_hour': busiest_hour,
+    }
+
+
+def compute_owner_statistics(owner_id):
+    members = _owner_members(owner_id)
+    schedules = Schedule.objects.filter(owner_id=owner_id)
+    return _assemble_statistics(
+        slot_rows=list(_slot_aggregates(owner_id)),
+        distinct_rows=list(_distinct_ids_by_day(members)),
+        distinct_ids=members.aggregate(**_distinct_ids_total())['count'],
+        total_schedules=schedules.count(),
+        occupancy=OccupancyMatrix.from_queryset(schedules).union(),
+    )
+
+
+async def acompute_owner_statistics(owner_id):
+    """``compute_owner_statistics`` on the async ORM."""
+    members = _owner_members(owner_id)
+    schedules = Schedule.objects.filter(owner_id=owner_id)
+    distinct_ids = await members.aaggregate(**_distinct_ids_total())
+    matrix = await OccupancyMatrix.afrom_queryset(schedules)
+    return _assemble_statistics(
+        slot_rows=[row async for row in _slot_aggregates(owner_id)],
+        distinct_rows=[row async for row in _distinct_ids_by_day(members)],
+        distinct_ids=distinct_ids['count'],
+        total_schedules=await schedules.acount(),
+        occupancy=matrix.union(),
+    )
+
+
+def invalidate_owner_statistics(owner_id):
+    """
+    Mark the owner's stored statistics out of date when materialization is
+    enabled: one UPDATE in the writing transaction, whatever the owner's
+    size. The next read recomputes them.
+    """
+    if not materialized_statistics_enabled():
+        return
+    if not ScheduleStatistics.objects.filter(owner_id=owner_id).update(version=F('version') + 1):
+        # A row that never held data is stale already.
+        ScheduleStatistics.objects.get_or_create(owner_id=owner_id)
+
+
+def store_owner_statistics(stored):
+    """
+    Recompute the statistics of ``stored`` and save them, unless a write
+    bumped its version meanwhile; the next read then recomputes again.
+    """
+    # Computed from the primary: a lagging replica would store old figures
+    # under the current version.
+    with use_primary():
+        data = compute_owner_statistics(stored.owner_id)
+    ScheduleStatistics.objects.filter(owner_id=stored.owner_id, version=stored.version).update(
+        data=data, data_version=stored.version, updated_at=timezone.now()
+    )
+    return data
+
+
+def get_owner_statistics(owner_id):
+    if not materialized_statistics_enabled():
+        return compute_owner_statistics(owner_id)
+    stored, _ = ScheduleStatistics.objects.get_or_create(owner_id=owner_id)
+    if stored.data_version == stored.version:
+        return stored.data
+    return store_owner_statistics(stored)
+
+
+async def aget_owner_statistics(owner_id):
+    if not materialized_statistics_enabled():
+        return await acompute_owner_statistics(owner_id)
+    stored, _ = await ScheduleStatistics.objects.aget_or_create(owner_id=owner_id)
+    if stored.data_version == stored.version:
+        return stored.data
+    return await sync_to_async(store_owner_statistics)(stored)
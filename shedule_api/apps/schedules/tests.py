@@ -1,10 +1,37 @@
-from django.test import TestCase
+import gzip
+import importlib
+import json
+import os
+import random
+import re
+import tempfile
+import uuid
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo
+from io import StringIO
+from unittest import mock, skipUnless
+from urllib.parse import parse_qs, urlparse
+from django.apps import apps
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import IntegrityError, OperationalError, connection, transaction
 from django.contrib.auth.models import User
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework_simplejwt.tokens import RefreshToken
-from .models import Schedule, TimeSlot
+from .models import Schedule, ScheduleStatistics, TimeSlot, TimeSlotMember
+from .serializers import ScheduleCreateUpdateSerializer
+from .bitmaps import OccupancyMatrix, coverage, difference, intersection, is_occupied, union, unpack
+from .occurrences import build_week_template, expand_occurrences
+from .intervals import IndexedSlot, IntervalTree, clear_interval_indexes, get_owner_index
+from .documents import DAY_NAMES, build_schedule_data, fetch_schedule_data, load_snapshot, refresh_schedule_snapshot
+from .members import sync_ids_gin_index
+from .statistics import compute_owner_statistics, get_owner_statistics
+from .retention import compact, expired_schedules, expired_time_slots, retention_cutoff
 
 
 
@@ -319,4 +346,1778 @@ class ScheduleAPITest(APITestCase):
         url = reverse('schedules:schedule-list-create')
         response = self.client.post(url, invalid_data, format='json')
         
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+@override_settings(AUTH_USER_CACHE_TTL=0, TOKEN_REVOCATION_CHECK_ACCESS=False)
+class ScheduleListQueryTest(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.url = reverse('schedules:schedule-list-create')
+
+    def _create_schedules(self, count):
+        for index in range(count):
+            schedule = Schedule.objects.create(name=f'Schedule {index}', owner=self.user)
+            TimeSlot.objects.create(
+                schedule=schedule,
+                day_of_week='monday',
+                start_time='09:00',
+                end_time='17:00',
+                ids=[1]
+            )
+
+    def _count_list_queries(self, params=None):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url, params or {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries), response
+
+    def test_list_query_count_is_constant(self):
+
+        self._create_schedules(2)
+        small, _ = self._count_list_queries()
+        self._create_schedules(8)
+        large, response = self._count_list_queries()
+
+        self.assertEqual(small, large)
+        self.assertEqual(len(response.data['results']), 10)
+
+    def test_time_slots_count_ignores_inactive_slots(self):
+
+        schedule = Schedule.objects.create(name='Counted', owner=self.user)
+        TimeSlot.objects.create(
+            schedule=schedule, day_of_week='monday', start_time='09:00', end_time='10:00', ids=[1]
+        )
+        inactive = TimeSlot.objects.create(
+            schedule=schedule, day_of_week='monday', start_time='11:00', end_time='12:00', ids=[1]
+        )
+        inactive.soft_delete()
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.data['results'][0]['time_slots_count'], 1)
+
+    def test_keyset_pagination_walks_all_pages(self):
+
+        self._create_schedules(5)
+        seen = []
+        params = {'pagination': 'cursor', 'page_size': 2}
+        response = self.client.get(self.url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            seen.extend(item['id'] for item in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+
+        expected = [
+            str(pk) for pk in Schedule.objects.filter(owner=self.user)
+            .order_by('-created_at', '-id').values_list('id', flat=True)
+        ]
+        self.assertEqual(seen, expected)
+
+    def test_keyset_pagination_query_count_is_constant(self):
+
+        self._create_schedules(6)
+        params = {'pagination': 'cursor', 'page_size': 2}
+        first, response = self._count_list_queries(params)
+        cursor = parse_qs(urlparse(response.data['next']).query)['cursor'][0]
+        deep, _ = self._count_list_queries({**params, 'cursor': cursor})
+
+        self.assertEqual(first, deep)
+
+    def test_keyset_pagination_invalid_cursor(self):
+
+        response = self.client.get(self.url, {'pagination': 'cursor', 'cursor': 'garbage'})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ScheduleDocumentTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.schedule = Schedule.objects.create(name='Document', owner=self.user)
+        slots = [
+            ('monday', '13:00', '14:30', [4, 5]),
+            ('monday', '08:15', '09:00', [1, 2, 3]),
+            ('wednesday', '00:00', '23:59', [7]),
+            ('sunday', '18:45', '19:05', [100, 2000, 30000]),
+        ]
+        for day, start, end, ids in slots:
+            TimeSlot.objects.create(
+                schedule=self.schedule, day_of_week=day, start_time=start, end_time=end, ids=ids
+            )
+        inactive = TimeSlot.objects.create(
+            schedule=self.schedule, day_of_week='friday', start_time='10:00', end_time='11:00', ids=[9]
+        )
+        inactive.soft_delete()
+
+    def test_database_document_matches_python_document(self):
+
+        expected = build_schedule_data(self.schedule.time_slots.all())
+        with self.assertNumQueries(1):
+            document = fetch_schedule_data(self.schedule)
+
+        renderer = JSONRenderer()
+        self.assertEqual(renderer.render(document), renderer.render(expected))
+        self.assertEqual(list(document), DAY_NAMES)
+        self.assertEqual([slot['start'] for slot in document['monday']], ['08:15', '13:00'])
+        self.assertEqual(document['friday'], [])
+
+    def test_fallback_uses_python_path(self):
+
+        with mock.patch('apps.schedules.documents.supports_json_assembly', return_value=False):
+            document = fetch_schedule_data(self.schedule)
+
+        self.assertEqual(document, build_schedule_data(self.schedule.time_slots.all()))
+
+    def test_empty_schedule_document(self):
+
+        schedule = Schedule.objects.create(name='Empty', owner=self.user)
+
+        self.assertEqual(fetch_schedule_data(schedule), {day: [] for day in DAY_NAMES})
+
+
+class ScheduleSnapshotTest(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.schedule_data = {
+            'name': 'Snapshot Schedule',
+            'schedule': {
+                'monday': [{'start': '09:00', 'stop': '17:00', 'ids': [1, 2, 3]}],
+                'friday': [
+                    {'start': '13:00', 'stop': '15:00', 'ids': [5]},
+                    {'start': '08:00', 'stop': '10:00', 'ids': [4]},
+                ],
+            }
+        }
+
+    def test_create_builds_snapshot(self):
+
+        url = reverse('schedules:schedule-list-create')
+        response = self.client.post(url, self.schedule_data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        schedule = Schedule.objects.get(id=response.data['id'])
+        self.assertEqual(schedule.snapshot_slots_count, 3)
+        self.assertEqual(load_snapshot(schedule), fetch_schedule_data(schedule))
+        self.assertEqual(
+            [slot['start'] for slot in load_snapshot(schedule)['friday']], ['08:00', '13:00']
+        )
+
+    def test_update_refreshes_snapshot(self):
+
+        url = reverse('schedules:schedule-list-create')
+        schedule_id = self.client.post(url, self.schedule_data, format='json').data['id']
+        update_data = {
+            'schedule': {'sunday': [{'start': '10:00', 'stop': '11:00', 'ids': [9]}]}
+        }
+
+        detail_url = reverse('schedules:schedule-detail', kwargs={'id': schedule_id})
+        response = self.client.patch(detail_url, update_data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        schedule = Schedule.objects.get(id=schedule_id)
+        self.assertEqual(schedule.snapshot_slots_count, 1)
+        self.assertEqual(load_snapshot(schedule)['sunday'][0]['ids'], [9])
+        self.assertEqual(load_snapshot(schedule)['monday'], [])
+
+    def test_slot_changes_refresh_snapshot(self):
+
+        schedule = Schedule.objects.create(name='Slots', owner=self.user)
+        slot = TimeSlot.objects.create(
+            schedule=schedule, day_of_week='tuesday', start_time='09:00', end_time='10:00', ids=[1]
+        )
+        schedule.refresh_from_db()
+        self.assertEqual(schedule.snapshot_slots_count, 1)
+
+        slot.soft_delete()
+        schedule.refresh_from_db()
+        self.assertEqual(schedule.snapshot_slots_count, 0)
+        self.assertEqual(load_snapshot(schedule)['tuesday'], [])
+
+    def test_detail_serves_snapshot_without_time_slot_queries(self):
+
+        url = reverse('schedules:schedule-list-create')
+        schedule_id = self.client.post(url, self.schedule_data, format='json').data['id']
+        detail_url = reverse('schedules:schedule-detail', kwargs={'id': schedule_id})
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(detail_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['schedule']['monday'][0]['ids'], [1, 2, 3])
+        self.assertFalse(any(
+            TimeSlot._meta.db_table in query['sql'] for query in context.captured_queries
+        ))
+
+    def test_rebuild_command_backfills_and_verifies(self):
+
+        schedule = Schedule.objects.create(name='Legacy', owner=self.user)
+        TimeSlot.objects.create(
+            schedule=schedule, day_of_week='monday', start_time='09:00', end_time='10:00', ids=[1]
+        )
+        Schedule.all_objects.filter(pk=schedule.pk).update(
+            schedule_snapshot=None, snapshot_slots_count=0
+        )
+
+        out = StringIO()
+        call_command('rebuild_schedule_snapshots', '--verify', stdout=out)
+        self.assertIn('1 stale', out.getvalue())
+        schedule.refresh_from_db()
+        self.assertIsNone(schedule.schedule_snapshot)
+
+        call_command('rebuild_schedule_snapshots', '--batch-size', '1', stdout=StringIO())
+        schedule.refresh_from_db()
+        self.assertEqual(schedule.snapshot_slots_count, 1)
+        self.assertEqual(load_snapshot(schedule), fetch_schedule_data(schedule))
+
+    def test_rebuild_command_skips_deleted_schedules(self):
+
+        schedule = Schedule.objects.create(name='Deleted', owner=self.user)
+        TimeSlot.objects.create(
+            schedule=schedule, day_of_week='monday', start_time='09:00', end_time='10:00', ids=[1]
+        )
+        schedule.soft_delete()
+        state = Schedule.all_objects.values('schedule_snapshot', 'updated_at', 'version').get(pk=schedule.pk)
+
+        call_command('rebuild_schedule_snapshots', stdout=StringIO())
+
+        self.assertEqual(
+            Schedule.all_objects.values('schedule_snapshot', 'updated_at', 'version').get(pk=schedule.pk),
+            state,
+        )
+
+
+class ConditionalGetTest(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.schedule = Schedule.objects.create(name='Polled', owner=self.user)
+        TimeSlot.objects.create(
+            schedule=self.schedule, day_of_week='monday', start_time='09:00', end_time='10:00', ids=[1]
+        )
+        self.detail_url = reverse('schedules:schedule-detail', kwargs={'id': self.schedule.id})
+        self.list_url = reverse('schedules:schedule-list-create')
+
+    def test_detail_emits_validators(self):
+
+        response = self.client.get(self.detail_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['ETag'].startswith('"'))
+        self.assertIn('Last-Modified', response)
+
+    def test_detail_if_none_match_returns_304_without_loading_slots(self):
+
+        etag = self.client.get(self.detail_url)['ETag']
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        self.assertFalse(any(
+            TimeSlot._meta.db_table in query['sql'] or 'schedule_snapshot' in query['sql']
+            for query in context.captured_queries
+        ))
+
+    def test_detail_if_modified_since_returns_304(self):
+
+        last_modified = self.client.get(self.detail_url)['Last-Modified']
+
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_etag_changes_after_slot_write(self):
+
+        etag = self.client.get(self.detail_url)['ETag']
+        TimeSlot.objects.create(
+            schedule=self.schedule, day_of_week='friday', start_time='09:00', end_time='10:00', ids=[2]
+        )
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_detail_missing_schedule_returns_404(self):
+
+        other = User.objects.create_user(username='other', password='testpass123')
+        schedule = Schedule.objects.create(name='Hidden', owner=other)
+        url = reverse('schedules:schedule-detail', kwargs={'id': schedule.id})
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH='*')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_if_none_match_returns_304(self):
+
+        etag = self.client.get(self.list_url)['ETag']
+
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_list_etag_changes_after_rename(self):
+
+        etag = self.client.get(self.list_url)['ETag']
+        self.schedule.name = 'Renamed'
+        self.schedule.save()
+
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['name'], 'Renamed')
+
+    def test_list_ignores_if_modified_since_after_delete(self):
+
+        Schedule.objects.create(name='Older', owner=self.user)
+        response = self.client.get(self.list_url)
+        self.assertNotIn('Last-Modified', response)
+        etag = response['ETag']
+
+        self.client.delete(self.detail_url)
+        for headers in ({'HTTP_IF_NONE_MATCH': etag}, {'HTTP_IF_MODIFIED_SINCE': 'Fri, 01 Jan 2100 00:00:00 GMT'}):
+            response = self.client.get(self.list_url, **headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual([item['name'] for item in response.data['results']], ['Older'])
+
+    def test_list_etag_depends_on_query_string(self):
+
+        first = self.client.get(self.list_url)['ETag']
+        cursor = self.client.get(self.list_url, {'pagination': 'cursor'})['ETag']
+
+        self.assertNotEqual(first, cursor)
+
+
+class ScheduleStatisticsTest(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.url = reverse('schedules:schedule-statistics')
+
+        first = Schedule.objects.create(name='First', owner=self.user)
+        second = Schedule.objects.create(name='Second', owner=self.user)
+        slots = [
+            (first, 'monday', '09:00', '10:30', [1, 2]),
+            (first, 'monday', '10:00', '11:00', [2, 3]),
+            (second, 'monday', '10:15', '10:45', [3]),
+            (second, 'friday', '22:00', '23:30', [4]),
+        ]
+        for schedule, day, start, end, ids in slots:
+            TimeSlot.objects.create(
+                schedule=schedule, day_of_week=day, start_time=start, end_time=end, ids=ids
+            )
+        inactive = Schedule.objects.create(name='Inactive', owner=self.user)
+        TimeSlot.objects.create(
+            schedule=inactive, day_of_week='sunday', start_time='09:00', end_time='10:00', ids=[99]
+        )
+        inactive.soft_delete()
+
+    def test_statistics_payload(self):
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data
+        self.assertEqual(data['total_schedules'], 2)
+        self.assertEqual(data['total_time_slots'], 4)
+        self.assertEqual(data['schedules_by_day']['monday'], 3)
+        self.assertEqual(data['schedules_by_day']['sunday'], 0)
+        self.assertEqual(data['minutes_by_day']['monday'], 90 + 60 + 30)
+        self.assertEqual(data['total_minutes'], 180 + 90)
+        self.assertEqual(data['covered_minutes_by_day']['monday'], 120)
+        self.assertEqual(data['covered_minutes'], 120 + 90)
+        self.assertEqual(data['distinct_ids'], 4)
+        self.assertEqual(data['distinct_ids_by_day']['monday'], 3)
+        self.assertEqual(data['hours_by_day']['monday'][9], 1)
+        self.assertEqual(data['hours_by_day']['monday'][10], 3)
+        self.assertEqual(data['hours_by_day']['friday'][23], 1)
+        self.assertEqual(data['busiest_hour'], {'day': 'monday', 'hour': 10, 'slots': 3})
+        self.assertEqual(data['user'], 'testuser')
+
+    @override_settings(AUTH_USER_CACHE_TTL=0, TOKEN_REVOCATION_CHECK_ACCESS=False)
+    def test_statistics_query_count_is_constant(self):
+
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(self.url)
+        schedule = Schedule.objects.create(name='Third', owner=self.user)
+        for day in DAY_NAMES:
+            TimeSlot.objects.create(
+                schedule=schedule, day_of_week=day, start_time='01:00', end_time='02:00', ids=[5]
+            )
+        with CaptureQueriesContext(connection) as large:
+            self.client.get(self.url)
+
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+    @override_settings(SCHEDULE_STATISTICS_MATERIALIZED=True)
+    def test_materialized_statistics_follow_writes(self):
+
+        self.client.get(self.url)
+        # Writes only bump the row's version; the recompute waits for a read.
+        schedule = Schedule.objects.create(name='Materialized', owner=self.user)
+        TimeSlot.objects.create(
+            schedule=schedule, day_of_week='sunday', start_time='08:00', end_time='09:00', ids=[7]
+        )
+        stored = ScheduleStatistics.objects.get(owner=self.user)
+        self.assertNotEqual(stored.data_version, stored.version)
+        self.assertEqual(stored.data['total_schedules'], 2)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.data['total_schedules'], 3)
+        self.assertEqual(response.data['total_time_slots'], 5)
+        self.assertEqual(response.data['schedules_by_day']['sunday'], 1)
+        self.assertEqual(response.data['distinct_ids'], 5)
+        stored.refresh_from_db()
+        self.assertEqual(stored.data_version, stored.version)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_owner_statistics(self.user.pk)['total_schedules'], 3)
+
+    @override_settings(SCHEDULE_STATISTICS_MATERIALIZED=True)
+    def test_materialized_statistics_survive_a_concurrent_write(self):
+
+        def compute_during_write(owner_id):
+            data = compute_owner_statistics(owner_id)
+            Schedule.objects.create(name='Concurrent', owner=self.user)
+            return data
+
+        with mock.patch('apps.schedules.statistics.compute_owner_statistics', side_effect=compute_during_write):
+            self.assertEqual(get_owner_statistics(self.user.pk)['total_schedules'], 2)
+
+        stored = ScheduleStatistics.objects.get(owner=self.user)
+        self.assertNotEqual(stored.data_version, stored.version)
+        self.assertEqual(get_owner_statistics(self.user.pk)['total_schedules'], 3)
+
+
+class IntervalTreeTest(TestCase):
+
+    def test_queries_match_brute_force(self):
+
+        rng = random.Random(1234)
+        intervals = []
+        for index in range(500):
+            start = rng.randrange(0, 86000)
+            intervals.append(IndexedSlot(index, start, start + rng.randrange(1, 7200), ()))
+        tree = IntervalTree(intervals)
+
+        self.assertEqual(len(tree), len(intervals))
+        for _ in range(200):
+            point = rng.randrange(0, 90000)
+            expected = {slot for slot in intervals if slot.start <= point < slot.end}
+            self.assertEqual(set(tree.at(point)), expected)
+
+            start = rng.randrange(0, 86000)
+            end = start + rng.randrange(1, 5000)
+            expected = {slot for slot in intervals if slot.start < end and slot.end > start}
+            self.assertEqual(set(tree.overlapping(start, end)), expected)
+
+    def test_empty_tree(self):
+
+        tree = IntervalTree([])
+
+        self.assertEqual(tree.at(100), [])
+        self.assertEqual(tree.overlapping(0, 100), [])
+
+
+class ActiveSchedulesTest(APITestCase):
+
+    def setUp(self):
+        clear_interval_indexes()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.url = reverse('schedules:schedule-active')
+
+        self.morning = Schedule.objects.create(name='Morning', owner=self.user)
+        self.evening = Schedule.objects.create(name='Evening', owner=self.user)
+        TimeSlot.objects.create(
+            schedule=self.morning, day_of_week='monday', start_time='08:00', end_time='12:00', ids=[1, 2]
+        )
+        TimeSlot.objects.create(
+            schedule=self.evening, day_of_week='monday', start_time='11:30', end_time='20:00', ids=[2, 3]
+        )
+        other = User.objects.create_user(username='other', password='testpass123')
+        other_schedule = Schedule.objects.create(name='Other', owner=other)
+        TimeSlot.objects.create(
+            schedule=other_schedule, day_of_week='monday', start_time='00:00', end_time='23:00', ids=[9]
+        )
+
+    def test_point_query(self):
+
+        response = self.client.get(self.url, {'day': 'monday', 'time': '11:45'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([entry['name'] for entry in response.data['schedules']], ['Evening', 'Morning'])
+        self.assertEqual(response.data['ids'], [1, 2, 3])
+
+    def test_point_query_end_is_exclusive(self):
+
+        response = self.client.get(self.url, {'day': 'monday', 'time': '12:00'})
+
+        self.assertEqual([entry['name'] for entry in response.data['schedules']], ['Evening'])
+
+    def test_range_query(self):
+
+        response = self.client.get(self.url, {'day': 'monday', 'start': '06:00', 'stop': '08:30'})
+
+        self.assertEqual([entry['name'] for entry in response.data['schedules']], ['Morning'])
+        self.assertEqual(response.data['schedules'][0]['time_slots'][0]['start'], '08:00')
+
+    def test_index_follows_writes(self):
+
+        self.client.get(self.url, {'day': 'tuesday', 'time': '10:00'})
+        TimeSlot.objects.create(
+            schedule=self.morning, day_of_week='tuesday', start_time='09:00', end_time='11:00', ids=[5]
+        )
+        self.evening.soft_delete()
+
+        tuesday = self.client.get(self.url, {'day': 'tuesday', 'time': '10:00'})
+        monday = self.client.get(self.url, {'day': 'monday', 'time': '13:00'})
+
+        self.assertEqual(tuesday.data['ids'], [5])
+        self.assertEqual(monday.data['schedules'], [])
+
+    def test_database_engine_matches_index(self):
+
+        params = {'day': 'monday', 'start': '11:00', 'stop': '12:00'}
+        indexed = self.client.get(self.url, params).data
+        with override_settings(SCHEDULE_INTERVAL_INDEX_ENABLED=False):
+            database = self.client.get(self.url, params).data
+
+        self.assertEqual(indexed, database)
+
+    @override_settings(SCHEDULE_INTERVAL_INDEX_SIZE=2, SCHEDULE_INTERVAL_INDEX_TTL=60)
+    def test_owner_indexes_are_bounded(self):
+
+        owners = [self.user] + [User.objects.create_user(username=f'owner{index}') for index in range(2)]
+        with mock.patch('apps.schedules.intervals.time.monotonic', return_value=1000.0) as monotonic:
+            first = get_owner_index(owners[0].pk)
+            self.assertIs(get_owner_index(owners[0].pk), first)
+            second = get_owner_index(owners[1].pk)
+            get_owner_index(owners[0].pk)
+            # The least recently used owner makes room for a third one.
+            get_owner_index(owners[2].pk)
+            self.assertIs(get_owner_index(owners[0].pk), first)
+            self.assertIsNot(get_owner_index(owners[1].pk), second)
+
+            monotonic.return_value = 1061.0
+            expired = get_owner_index(owners[0].pk)
+        self.assertIsNot(expired, first)
+        self.assertEqual([slot.ids for slot, _ in expired.query('monday', time(9))], [[1, 2]])
+
+    def test_invalid_query(self):
+
+        for params in [
+            {'day': 'monday'},
+            {'day': 'monday', 'time': '10:00', 'start': '09:00', 'stop': '11:00'},
+            {'day': 'monday', 'start': '11:00', 'stop': '09:00'},
+            {'day': 'funday', 'time': '10:00'},
+        ]:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TimeSlotMemberTest(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.list_url = reverse('schedules:schedule-list-create')
+
+    def _create(self, name, schedule):
+        response = self.client.post(self.list_url, {'name': name, 'schedule': schedule}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data['id']
+
+    def test_create_and_update_keep_members_in_sync(self):
+
+        schedule_id = self._create('Members', {
+            'monday': [{'start': '09:00', 'stop': '10:00', 'ids': [4711, 1, 4711]}],
+        })
+        self.assertEqual(
+            sorted(TimeSlotMember.objects.values_list('member_id', flat=True)), [1, 4711]
+        )
+
+        url = reverse('schedules:schedule-detail', kwargs={'id': schedule_id})
+        self.client.put(url, {'schedule': {'friday': [{'start': '09:00', 'stop': '10:00', 'ids': [5]}]}}, format='json')
+
+        self.assertEqual(list(TimeSlotMember.objects.values_list('member_id', flat=True)), [5])
+
+    def test_slot_save_reindexes_members(self):
+
+        schedule = Schedule.objects.create(name='Direct', owner=self.user)
+        slot = TimeSlot.objects.create(
+            schedule=schedule, day_of_week='monday', start_time='09:00', end_time='10:00', ids=[1, 2]
+        )
+        slot.ids = [3]
+        slot.save()
+
+        self.assertEqual(list(slot.members.values_list('member_id', flat=True)), [3])
+
+    def test_list_filter_contains_id(self):
+
+        self._create('With', {'monday': [{'start': '09:00', 'stop': '10:00', 'ids': [4711]}]})
+        self._create('Without', {'monday': [{'start': '09:00', 'stop': '10:00', 'ids': [1]}]})
+        other = User.objects.create_user(username='other', password='testpass123')
+        other_schedule = Schedule.objects.create(name='Other', owner=other)
+        TimeSlot.objects.create(
+            schedule=other_schedule, day_of_week='monday', start_time='09:00', end_time='10:00', ids=[4711]
+        )
+
+        response = self.client.get(self.list_url, {'contains_id': 4711})
+
+        self.assertEqual([item['name'] for item in response.data['results']], ['With'])
+        self.assertEqual(response.data['results'][0]['time_slots_count'], 1)
+
+    def test_list_filter_rejects_invalid_id(self):
+
+        response = self.client.get(self.list_url, {'contains_id': 'abc'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_member_lookup_endpoint(self):
+
+        self._create('First', {
+            'monday': [{'start': '09:00', 'stop': '10:00', 'ids': [4711]}],
+            'tuesday': [{'start': '11:00', 'stop': '12:00', 'ids': [4711, 2]}],
+            'friday': [{'start': '11:00', 'stop': '12:00', 'ids': [2]}],
+        })
+        self._create('Second', {'monday': [{'start': '09:00', 'stop': '10:00', 'ids': [3]}]})
+
+        url = reverse('schedules:member-time-slots', kwargs={'member_id': 4711})
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['schedules']), 1)
+        self.assertEqual(
+            [slot['day_of_week'] for slot in response.data['schedules'][0]['time_slots']],
+            ['monday', 'tuesday']
+        )
+
+    def test_gin_index_follows_the_member_lookup_setting(self):
+
+        db = mock.MagicMock(vendor='postgresql')
+        cursor = db.cursor.return_value.__enter__.return_value
+        with mock.patch('apps.schedules.members.connections', {'default': db}):
+            with override_settings(SCHEDULE_MEMBER_LOOKUP='table'):
+                sync_ids_gin_index()
+            with override_settings(SCHEDULE_MEMBER_LOOKUP='gin'):
+                sync_ids_gin_index()
+
+        statements = [call.args[0] for call in cursor.execute.call_args_list]
+        self.assertTrue(statements[0].startswith('DROP INDEX IF EXISTS time_slots_ids_gin_idx'))
+        self.assertTrue(statements[1].startswith('CREATE INDEX IF NOT EXISTS time_slots_ids_gin_idx'))
+        # Other backends have no such index.
+        sync_ids_gin_index()
+
+
+class ScheduleDiffUpdateTest(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.week = {
+            'monday': [
+                {'start': '09:00', 'stop': '10:00', 'ids': [1]},
+                {'start': '11:00', 'stop': '12:00', 'ids': [2]},
+            ],
+            'tuesday': [{'start': '09:00', 'stop': '10:00', 'ids': [3]}],
+        }
+        response = self.client.post(
+            reverse('schedules:schedule-list-create'),
+            {'name': 'Diffed', 'schedule': self.week},
+            format='json'
+        )
+        self.schedule = Schedule.objects.get(id=response.data['id'])
+        self.url = reverse('schedules:schedule-detail', kwargs={'id': self.schedule.id})
+
+    def _slot_ids(self):
+        return {
+            (slot.day_of_week, slot.start_time.strftime('%H:%M')): slot.pk
+            for slot in TimeSlot.objects.filter(schedule=self.schedule)
+        }
+
+    def test_update_applies_minimal_diff(self):
+
+        before = self._slot_ids()
+        week = {
+            'monday': [
+                {'start': '09:00', 'stop': '10:00', 'ids': [1]},
+                {'start': '11:00', 'stop': '12:00', 'ids': [2, 20]},
+            ],
+            'wednesday': [{'start': '09:00', 'stop': '10:00', 'ids': [4]}],
+        }
+
+        response = self.client.put(self.url, {'schedule': week}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data['time_slot_changes'],
+            {'created': 1, 'updated': 1, 'deleted': 1, 'unchanged': 1}
+        )
+        after = self._slot_ids()
+        self.assertEqual(after[('monday', '09:00')], before[('monday', '09:00')])
+        self.assertEqual(after[('monday', '11:00')], before[('monday', '11:00')])
+        self.assertNotIn(('tuesday', '09:00'), after)
+        self.assertEqual(response.data['schedule']['monday'][1]['ids'], [2, 20])
+        self.assertEqual(
+            sorted(TimeSlotMember.objects.filter(time_slot__schedule=self.schedule)
+                   .values_list('member_id', flat=True)),
+            [1, 2, 4, 20]
+        )
+
+    def test_unchanged_update_writes_no_slots(self):
+
+        before = Schedule.objects.get(pk=self.schedule.pk).snapshot_slots_count
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.put(self.url, {'schedule': self.week}, format='json')
+
+        self.assertEqual(response.data['time_slot_changes']['unchanged'], 3)
+        self.assertFalse(any(
+            query['sql'].startswith(('INSERT', 'DELETE')) and TimeSlot._meta.db_table in query['sql']
+            for query in context.captured_queries
+        ))
+        self.assertEqual(Schedule.objects.get(pk=self.schedule.pk).snapshot_slots_count, before)
+
+    def test_update_reactivates_soft_deleted_slot(self):
+
+        TimeSlot.objects.get(schedule=self.schedule, day_of_week='tuesday').soft_delete()
+
+        response = self.client.put(self.url, {'schedule': self.week}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['time_slot_changes']['updated'], 1)
+        self.assertEqual(TimeSlot.objects.filter(schedule=self.schedule).count(), 3)
+
+    def test_duplicate_slots_rejected(self):
+
+        week = {'monday': [
+            {'start': '09:00', 'stop': '10:00', 'ids': [1]},
+            {'start': '09:00', 'stop': '10:00', 'ids': [2]},
+        ]}
+
+        response = self.client.put(self.url, {'schedule': week}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def _lock_once(self, method):
+        original = getattr(ScheduleCreateUpdateSerializer, method)
+        calls = []
+
+        def flaky(serializer, *args):
+            calls.append(1)
+            if len(calls) == 1:
+                raise OperationalError('database is locked')
+            return original(serializer, *args)
+        return mock.patch.object(ScheduleCreateUpdateSerializer, method, flaky)
+
+    @override_settings(DATABASE_WRITE_RETRIES=1, DATABASE_WRITE_RETRY_BACKOFF=0)
+    def test_lock_retries_replay_the_slots(self):
+
+        week = {'friday': [{'start': '13:00', 'stop': '14:00', 'ids': [7]}]}
+        with mock.patch('schedule_api.database.connection_in_atomic_block', return_value=False):
+            with self._lock_once('_create_time_slots'):
+                created = self.client.post(
+                    reverse('schedules:schedule-list-create'), {'name': 'Retried', 'schedule': week}, format='json'
+                )
+            with self._lock_once('_sync_time_slots'):
+                updated = self.client.put(self.url, {'name': 'Renamed', 'schedule': week}, format='json')
+
+        self.assertEqual(created.status_code, status.HTTP_201_CREATED)
+        retried = Schedule.objects.get(id=created.data['id'])
+        self.assertEqual(list(retried.time_slots.values_list('day_of_week', 'ids')), [('friday', [7])])
+        self.assertEqual(updated.status_code, status.HTTP_200_OK)
+        self.schedule.refresh_from_db()
+        self.assertEqual(self.schedule.name, 'Renamed')
+        self.assertEqual(list(self.schedule.time_slots.values_list('day_of_week', 'ids')), [('friday', [7])])
+        self.assertEqual(self.client.get(self.url).data['schedule']['friday'][0]['ids'], [7])
+
+
+class ScheduleImportTest(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.url = reverse('schedules:schedule-import')
+
+    def _import(self, lines, **params):
+        body = '\n'.join(lines).encode()
+        url = self.url + ('?' + '&'.join(f'{key}={value}' for key, value in params.items()) if params else '')
+        response = self.client.generic('POST', url, body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+
+    def test_import_reports_each_line(self):
+
+        lines = [
+            json.dumps({'name': f'Imported {index}', 'schedule': {
+                'monday': [{'start': '09:00', 'stop': '10:00', 'ids': [index + 1]}],
+                'friday': [
+                    {'start': '13:00', 'stop': '14:00', 'ids': [7]},
+                    {'start': '08:00', 'stop': '09:00', 'ids': [8]},
+                ],
+            }})
+            for index in range(5)
+        ]
+        lines.insert(2, '{not json')
+        lines.insert(4, '')
+        lines.append(json.dumps({'name': 'Invalid', 'schedule': {
+            'monday': [{'start': '10:00', 'stop': '09:00', 'ids': [1]}],
+        }}))
+
+        results = self._import(lines, batch_size=2)
+
+        self.assertEqual(results[-1], {'summary': {'created': 5, 'failed': 2}})
+        by_line = {result['line']: result for result in results[:-1]}
+        self.assertEqual(by_line[3]['status'], 'error')
+        self.assertEqual(by_line[8]['status'], 'error')
+        self.assertEqual(Schedule.objects.filter(owner=self.user).count(), 5)
+        self.assertEqual(TimeSlot.objects.filter(schedule__owner=self.user).count(), 15)
+        self.assertEqual(TimeSlotMember.objects.filter(member_id=7).count(), 5)
+
+        schedule = Schedule.objects.get(id=by_line[1]['id'])
+        self.assertEqual(schedule.snapshot_slots_count, 3)
+        self.assertEqual(load_snapshot(schedule), fetch_schedule_data(schedule))
+
+    def test_import_rejects_oversized_lines(self):
+
+        with override_settings(SCHEDULE_IMPORT_MAX_LINE_BYTES=64):
+            results = self._import([
+                json.dumps({'name': 'x' * 100, 'schedule': {}}),
+                json.dumps({'name': 'Small', 'schedule': {}}),
+            ])
+
+        self.assertEqual(results[0]['status'], 'error')
+        self.assertEqual(results[1]['status'], 'created')
+
+    def test_import_completes_before_the_report_is_read(self):
+
+        lines = [json.dumps({'name': f'Unread {index}', 'schedule': {}}) for index in range(3)]
+        with mock.patch('apps.schedules.imports.REPORT_SPOOL_BYTES', 16):
+            response = self.client.generic(
+                'POST', self.url + '?batch_size=1', '\n'.join(lines).encode(), content_type='application/x-ndjson'
+            )
+
+        # A client that drops the connection now still gets every line imported.
+        self.assertEqual(Schedule.objects.filter(owner=self.user).count(), 3)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        results = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(results[-1], {'summary': {'created': 3, 'failed': 0}})
+
+    def test_import_hides_database_errors(self):
+
+        error = IntegrityError('UNIQUE constraint failed: schedules.id')
+        with mock.patch('apps.schedules.imports._insert_batch', side_effect=error):
+            with self.assertLogs('apps.schedules.imports', 'ERROR') as logs:
+                results = self._import([json.dumps({'name': 'Clash', 'schedule': {}})])
+
+        self.assertEqual(results[0]['errors'], {'non_field_errors': ['Could not be saved.']})
+        self.assertIn('UNIQUE constraint failed', logs.output[0])
+
+    def test_import_rejects_invalid_batch_size(self):
+
+        response = self.client.generic(
+            'POST', self.url + '?batch_size=0', b'', content_type='application/x-ndjson'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ScheduleExportTest(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.url = reverse('schedules:schedule-export')
+        for index in range(5):
+            schedule = Schedule.objects.create(name=f'Export {index}', owner=self.user)
+            TimeSlot.objects.create(
+                schedule=schedule, day_of_week='monday',
+                start_time='09:00', end_time='10:00', ids=[index + 1, 99],
+            )
+            TimeSlot.objects.create(
+                schedule=schedule, day_of_week='friday',
+                start_time='13:00', end_time='14:00', ids=[],
+            )
+        # One schedule without a stored snapshot takes the prefetch path.
+        Schedule.objects.filter(name='Export 3').update(schedule_snapshot=None)
+
+    def _export(self, query='', **extra):
+        response = self.client.get(self.url + query, **extra)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, b''.join(response.streaming_content)
+
+    def test_ndjson_export_matches_detail_documents(self):
+
+        with override_settings(SCHEDULE_EXPORT_CHUNK_SIZE=2):
+            response, body = self._export()
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        documents = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(len(documents), 5)
+        for document in documents:
+            detail = self.client.get(reverse('schedules:schedule-detail', kwargs={'id': document['id']}))
+            self.assertEqual(document, detail.json())
+
+    def test_export_queries_are_bounded_by_chunks(self):
+
+        with override_settings(SCHEDULE_EXPORT_CHUNK_SIZE=2):
+            with CaptureQueriesContext(connection) as queries:
+                self._export()
+
+        # Three chunks of schedules plus one slot prefetch for the schedule
+        # without a snapshot; never one query per schedule.
+        slot_queries = [query for query in queries if 'time_slots' in query['sql']]
+        self.assertEqual(len(slot_queries), 1)
+        self.assertLessEqual(len(queries), 6)
+
+    def test_csv_export_flattens_time_slots(self):
+
+        response, body = self._export('?output=csv')
+
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = body.decode().splitlines()
+        self.assertEqual(rows[0], 'schedule_id,schedule_name,day_of_week,start,stop,ids')
+        self.assertEqual(len(rows), 1 + 10)
+        self.assertTrue(any(row.endswith(',Export 0,monday,09:00,10:00,1 99') for row in rows))
+
+    def test_gzip_export(self):
+
+        response, body = self._export(HTTP_ACCEPT_ENCODING='gzip, deflate')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        lines = gzip.decompress(body).splitlines()
+        self.assertEqual(len(lines), 5)
+
+    def test_gzip_export_honours_qvalues(self):
+
+        response, body = self._export(HTTP_ACCEPT_ENCODING='gzip;q=0, deflate')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(len(body.splitlines()), 5)
+
+        response, body = self._export(HTTP_ACCEPT_ENCODING='*;q=0.5, gzip;q=0')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+        response, body = self._export(HTTP_ACCEPT_ENCODING='identity, *;q=0.5')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(len(gzip.decompress(body).splitlines()), 5)
+
+    def test_export_rejects_unknown_output(self):
+
+        response = self.client.get(self.url + '?output=xml')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class OccupancyBitmapTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.morning = self._schedule('Morning', [('monday', '09:00', '12:00'), ('sunday', '23:00', '23:59')])
+        self.midday = self._schedule('Midday', [('monday', '11:00', '13:00')])
+
+    def _schedule(self, name, slots):
+        schedule = Schedule.objects.create(name=name, owner=self.user)
+        for day, start, end in slots:
+            TimeSlot.objects.create(schedule=schedule, day_of_week=day, start_time=start, end_time=end, ids=[1])
+        schedule.refresh_from_db()
+        return schedule
+
+    def test_occupancy_is_maintained_on_write(self):
+
+        occupancy = bytes(self.morning.occupancy)
+        self.assertEqual(len(occupancy), 1260)
+        self.assertEqual(coverage(occupancy), 180 + 59)
+        self.assertTrue(is_occupied(occupancy, 'monday', '09:00'))
+        self.assertTrue(is_occupied(occupancy, 'monday', '11:59'))
+        self.assertFalse(is_occupied(occupancy, 'monday', '12:00'))
+        self.assertTrue(is_occupied(occupancy, 'sunday', '23:58'))
+        self.assertEqual(int(unpack(occupancy).sum()), 239)
+
+        self.morning.time_slots.filter(day_of_week='sunday').get().delete()
+        self.morning.refresh_from_db()
+        self.assertEqual(coverage(self.morning.occupancy), 180)
+
+    def test_set_operations(self):
+
+        morning, midday = self.morning.occupancy, self.midday.occupancy
+
+        self.assertEqual(coverage(union(morning, midday)), 240 + 59)
+        self.assertEqual(coverage(intersection(morning, midday)), 60)
+        self.assertEqual(coverage(difference(morning, midday)), 120 + 59)
+
+    def test_matrix_from_queryset(self):
+
+        # Rows written before bitmaps existed fall back to the time slots.
+        Schedule.objects.filter(pk=self.midday.pk).update(occupancy=None, schedule_snapshot=None)
+
+        matrix = OccupancyMatrix.from_queryset(Schedule.objects.filter(owner=self.user).order_by('name'))
+        minutes = dict(zip(matrix.schedule_ids, matrix.coverage()))
+
+        self.assertEqual(minutes[self.morning.pk], 239)
+        self.assertEqual(minutes[self.midday.pk], 120)
+        self.assertEqual(coverage(matrix.union()), 299)
+        self.assertEqual(coverage(matrix.intersection()), 60)
+        busy = dict(zip(matrix.schedule_ids, matrix.occupied_at('monday', '12:30')))
+        self.assertEqual(busy, {self.morning.pk: False, self.midday.pk: True})
+        during = dict(zip(matrix.schedule_ids, matrix.occupied_during('monday', '08:03', '09:01')))
+        self.assertEqual(during, {self.morning.pk: True, self.midday.pk: False})
+
+
+class FreeBusyTest(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.url = reverse('schedules:schedule-free-busy')
+
+        self.first = Schedule.objects.create(name='First', owner=self.user)
+        self.second = Schedule.objects.create(name='Second', owner=self.user)
+        slots = [
+            (self.first, 'monday', '09:00', '12:00'),
+            (self.first, 'monday', '12:10', '13:00'),
+            (self.second, 'monday', '11:00', '12:05'),
+            (self.second, 'tuesday', '08:00', '09:00'),
+        ]
+        for schedule, day, start, end in slots:
+            TimeSlot.objects.create(schedule=schedule, day_of_week=day, start_time=start, end_time=end, ids=[1])
+
+    def test_free_busy_across_all_schedules(self):
+
+        response = self.client.post(self.url, {}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['schedules'], 2)
+        monday = response.data['days']['monday']
+        self.assertEqual(monday['busy'], [
+            {'start': '09:00', 'stop': '12:05'},
+            {'start': '12:10', 'stop': '13:00'},
+        ])
+        self.assertEqual(monday['free'], [
+            {'start': '00:00', 'stop': '09:00'},
+            {'start': '12:05', 'stop': '12:10'},
+            {'start': '13:00', 'stop': '24:00'},
+        ])
+        self.assertEqual(monday['common'], [{'start': '11:00', 'stop': '12:00'}])
+        self.assertEqual(response.data['days']['sunday']['free'], [{'start': '00:00', 'stop': '24:00'}])
+
+    def test_min_minutes_drops_short_windows(self):
+
+        response = self.client.post(self.url, {'min_minutes': 10}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['days']['monday']['free'], [
+            {'start': '00:00', 'stop': '09:00'},
+            {'start': '13:00', 'stop': '24:00'},
+        ])
+
+    def test_selected_schedules(self):
+
+        response = self.client.post(self.url, {'schedule_ids': [str(self.second.id)]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['schedules'], 1)
+        self.assertEqual(response.data['days']['tuesday']['common'], [{'start': '08:00', 'stop': '09:00'}])
+        self.assertEqual(response.data['days']['monday']['busy'], [{'start': '11:00', 'stop': '12:05'}])
+
+    def test_unknown_schedule_ids_are_rejected(self):
+
+        other = User.objects.create_user(username='other', password='testpass123')
+        foreign = Schedule.objects.create(name='Foreign', owner=other)
+
+        response = self.client.post(
+            self.url, {'schedule_ids': [str(self.first.id), str(foreign.id)]}, format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(str(foreign.id), response.data['schedule_ids'][0])
+
+
+class OccurrenceExpansionTest(TestCase):
+
+    def setUp(self):
+        self.schedule_id = uuid.uuid4()
+        self.berlin = ZoneInfo('Europe/Berlin')
+
+    def _expand(self, rows, start, end):
+        template = build_week_template([(self.schedule_id, *row) for row in rows])
+        return [
+            (occurrence.start, occurrence.end)
+            for occurrence in expand_occurrences(template, start, end, self.berlin)
+        ]
+
+    def test_regular_days_use_the_local_offset(self):
+
+        occurrences = self._expand([('friday', time(9), time(10), [1])], date(2026, 1, 1), date(2026, 7, 31))
+
+        utc = dt_timezone.utc
+        self.assertEqual(occurrences[0], (datetime(2026, 1, 2, 8, tzinfo=utc), datetime(2026, 1, 2, 9, tzinfo=utc)))
+        self.assertEqual(occurrences[-1], (datetime(2026, 7, 31, 7, tzinfo=utc), datetime(2026, 7, 31, 8, tzinfo=utc)))
+        self.assertEqual(len(occurrences), 31)
+
+    def test_dst_transition_days(self):
+
+        rows = [('sunday', time(1), time(4), [1]), ('sunday', time(2, 30), time(2, 45), [2])]
+        utc = dt_timezone.utc
+
+        spring = self._expand(rows, date(2026, 3, 29), date(2026, 3, 29))
+        # 01:00 CET to 04:00 CEST is two real hours; 02:30 does not exist and
+        # moves forward by the gap.
+        self.assertEqual(spring[0], (datetime(2026, 3, 29, 0, tzinfo=utc), datetime(2026, 3, 29, 2, tzinfo=utc)))
+        self.assertEqual(spring[1][0], datetime(2026, 3, 29, 1, 30, tzinfo=utc))
+
+        autumn = self._expand(rows, date(2026, 10, 25), date(2026, 10, 25))
+        # Ambiguous 02:30 resolves to its first (CEST) occurrence.
+        self.assertEqual(autumn[0], (datetime(2026, 10, 24, 23, tzinfo=utc), datetime(2026, 10, 25, 3, tzinfo=utc)))
+        self.assertEqual(autumn[1], (datetime(2026, 10, 25, 0, 30, tzinfo=utc), datetime(2026, 10, 25, 0, 45, tzinfo=utc)))
+
+
+class OccurrenceAPITest(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.url = reverse('schedules:schedule-occurrences')
+
+        self.first = Schedule.objects.create(name='First', owner=self.user)
+        self.second = Schedule.objects.create(name='Second', owner=self.user)
+        TimeSlot.objects.create(
+            schedule=self.first, day_of_week='monday', start_time='09:00', end_time='10:00', ids=[1]
+        )
+        TimeSlot.objects.create(
+            schedule=self.second, day_of_week='monday', start_time='08:00', end_time='09:30', ids=[2]
+        )
+
+    def _occurrences(self, query):
+        response = self.client.get(self.url + query)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+
+    def test_streams_occurrences_in_order(self):
+
+        occurrences = self._occurrences('?start=2026-06-01&end=2026-06-14&tz=America/New_York')
+
+        self.assertEqual(len(occurrences), 4)
+        self.assertEqual(occurrences[0], {
+            'schedule_id': str(self.second.id),
+            'start': '2026-06-01T12:00:00Z',
+            'end': '2026-06-01T13:30:00Z',
+            'ids': [2],
+        })
+        self.assertEqual(occurrences[1]['start'], '2026-06-01T13:00:00Z')
+        self.assertEqual(occurrences[3]['start'], '2026-06-08T13:00:00Z')
+
+    def test_filters_schedules(self):
+
+        occurrences = self._occurrences(f'?start=2026-06-01&end=2026-06-01&schedule_ids={self.first.id}')
+
+        self.assertEqual([occurrence['start'] for occurrence in occurrences], ['2026-06-01T09:00:00Z'])
+
+    def test_rejects_invalid_queries(self):
+
+        for query in (
+            '?start=2026-06-01&end=2026-06-14&tz=Mars/Olympus',
+            '?start=2026-06-14&end=2026-06-01',
+            '?start=2026-01-01&end=2027-12-31',
+        ):
+            response = self.client.get(self.url + query)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, query)
+
+
+class AsyncReadEndpointTest(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        for index in range(3):
+            schedule = Schedule.objects.create(name=f'Schedule {index}', owner=self.user)
+            TimeSlot.objects.create(
+                schedule=schedule, day_of_week='monday',
+                start_time='09:00', end_time='10:00', ids=[index + 1],
+            )
+        self.schedule = schedule
+
+    def _assert_same(self, sync_name, async_name, query='', **kwargs):
+        sync_response = self.client.get(reverse(f'schedules:{sync_name}', kwargs=kwargs) + query)
+        async_response = self.client.get(reverse(f'schedules_async:{async_name}', kwargs=kwargs) + query)
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        # Pagination links point back at the URL set that served the page.
+        async_body = async_response.content.decode().replace('/api/v1/async/schedules/', '/api/v1/schedules/')
+        self.assertEqual(json.loads(async_body), sync_response.json())
+        return async_response
+
+    def test_list_matches_sync_view(self):
+
+        self._assert_same('schedule-list-create', 'schedule-list')
+        self._assert_same('schedule-list-create', 'schedule-list', '?pagination=cursor&page_size=2')
+        self._assert_same('schedule-list-create', 'schedule-list', '?contains_id=2')
+        self._assert_same('schedule-list-create', 'schedule-list', '?page=9')
+        self._assert_same('schedule-list-create', 'schedule-list', '?contains_id=x')
+
+    def test_detail_matches_sync_view(self):
+
+        self._assert_same('schedule-detail', 'schedule-detail', id=self.schedule.id)
+        Schedule.objects.filter(pk=self.schedule.pk).update(schedule_snapshot=None)
+        self._assert_same('schedule-detail', 'schedule-detail', id=self.schedule.id)
+        self._assert_same('schedule-detail', 'schedule-detail', id=uuid.uuid4())
+
+    def test_statistics_and_protected_match_sync_views(self):
+
+        self._assert_same('schedule-statistics', 'schedule-statistics')
+        self._assert_same('protected-endpoint', 'protected-endpoint')
+        with override_settings(SCHEDULE_STATISTICS_MATERIALIZED=True):
+            self._assert_same('schedule-statistics', 'schedule-statistics')
+
+    def test_conditional_get(self):
+
+        url = reverse('schedules_async:schedule-detail', kwargs={'id': self.schedule.id})
+        etag = self.client.get(url)['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(etag, self.client.get(reverse('schedules:schedule-detail', kwargs={'id': self.schedule.id}))['ETag'])
+
+    def test_authentication_errors(self):
+
+        url = reverse('schedules_async:schedule-list')
+        self.client.credentials()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.json(), {'detail': 'Authentication credentials were not provided.'})
+
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer not-a-token')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.json()['code'], 'token_not_valid')
+
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+@skipUnless(connection.vendor in ('sqlite', 'postgresql'), "Query plan checks need SQLite or PostgreSQL")
+@override_settings(SCHEDULE_INTERVAL_INDEX_ENABLED=False)
+class QueryPlanTest(APITestCase):
+    """Every SELECT issued by the hot read endpoints must be served by an index."""
+
+    # SQLite: "SCAN schedules" without "USING ... INDEX"; PostgreSQL: "Seq Scan on ...".
+    FULL_SCAN = {
+        'sqlite': re.compile(r'^SCAN (?!CONSTANT ROW|\(?subquery)\S+$'),
+        'postgresql': re.compile(r'Seq Scan on '),
+    }
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+        for index in range(3):
+            schedule = Schedule.objects.create(name=f'Schedule {index}', owner=self.user)
+            TimeSlot.objects.create(
+                schedule=schedule, day_of_week='monday',
+                start_time='09:00', end_time='10:00', ids=[index + 1],
+            )
+        Schedule.objects.create(name='Deleted', owner=self.user, is_active=False)
+        # Without a snapshot the detail view builds the document from time_slots.
+        Schedule.objects.filter(pk=schedule.pk).update(schedule_snapshot=None)
+        self.schedule = schedule
+
+    def _explain(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+                return [row[-1] for row in cursor.fetchall()]
+            # Seq scans stay possible only where no index applies at all.
+            cursor.execute('SET enable_seqscan = off')
+            try:
+                cursor.execute('EXPLAIN ' + sql)
+                return [row[0] for row in cursor.fetchall()]
+            finally:
+                cursor.execute('RESET enable_seqscan')
+
+    def _assert_indexed(self, method, url, data=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data, format='json')
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+
+        selects = [query['sql'] for query in queries if query['sql'].startswith('SELECT')]
+        self.assertTrue(selects, url)
+        full_scan = self.FULL_SCAN[connection.vendor]
+        for sql in selects:
+            plan = self._explain(sql)
+            scans = [line for line in plan if full_scan.search(line.strip())]
+            self.assertFalse(scans, f"{url} scans a whole table:\n{sql}\n" + '\n'.join(plan))
+
+    def test_hot_queries_use_indexes(self):
+
+        list_url = reverse('schedules:schedule-list-create')
+        for url in (
+            list_url,
+            list_url + '?pagination=cursor',
+            list_url + '?contains_id=2',
+            reverse('schedules:schedule-detail', kwargs={'id': self.schedule.id}),
+            reverse('schedules:schedule-statistics'),
+            reverse('schedules:schedule-active') + '?day=monday&time=09:30',
+            reverse('schedules:member-time-slots', kwargs={'member_id': 1}),
+            reverse('schedules:schedule-export'),
+            reverse('schedules:schedule-occurrences') + '?start=2026-06-01&end=2026-06-07&tz=UTC',
+        ):
+            with self.subTest(url=url):
+                self._assert_indexed('get', url)
+
+        self._assert_indexed('post', reverse('schedules:schedule-free-busy'), {})
+
+    def test_detects_full_scans(self):
+
+        plan = self._explain('SELECT "name" FROM "schedules" WHERE "description" = \'\'')
+        self.assertTrue(any(self.FULL_SCAN[connection.vendor].search(line.strip()) for line in plan))
+
+
+class ScheduleRetentionTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.old = timezone.now() - timedelta(days=100)
+
+        self.live = Schedule.objects.create(name='Live', owner=self.user)
+        self.live_slot = self._slot(self.live, '09:00', [1])
+        self.dead_slot = self._slot(self.live, '11:00', [2])
+        self.dead_slot.soft_delete()
+
+        self.expired = []
+        for index in range(3):
+            schedule = Schedule.objects.create(name=f'Expired {index}', owner=self.user)
+            self._slot(schedule, '09:00', [index + 10])
+            schedule.soft_delete()
+            self.expired.append(schedule)
+        self.recent = Schedule.objects.create(name='Recently deleted', owner=self.user)
+        self.recent.soft_delete()
+
+        # Backdate the soft deletes; updated_at stays recent, as after a later
+        # write to the dead rows, and must not postpone their purge.
+        Schedule.all_objects.filter(pk__in=[schedule.pk for schedule in self.expired]).update(deleted_at=self.old)
+        TimeSlot.all_objects.filter(pk=self.dead_slot.pk).update(deleted_at=self.old)
+
+    def _slot(self, schedule, start, ids):
+        end = f'{int(start[:2]) + 1:02d}:00'
+        return TimeSlot.objects.create(
+            schedule=schedule, day_of_week='monday', start_time=start, end_time=end, ids=ids
+        )
+
+    def test_compact_deletes_expired_rows_in_batches(self):
+
+        cutoff = retention_cutoff(90)
+        batches = list(compact(expired_schedules(cutoff), batch_size=2))
+
+        self.assertEqual([batch['schedules.Schedule'] for batch in batches], [2, 1])
+        self.assertEqual(sum(batch['schedules.TimeSlot'] for batch in batches), 3)
+        self.assertEqual(sum(batch['schedules.TimeSlotMember'] for batch in batches), 3)
+        self.assertEqual(
+            set(Schedule.all_objects.values_list('pk', flat=True)), {self.live.pk, self.recent.pk}
+        )
+
+        list(compact(expired_time_slots(cutoff), batch_size=2))
+        self.assertEqual(list(TimeSlot.all_objects.values_list('pk', flat=True)), [self.live_slot.pk])
+        self.assertEqual(
+            list(TimeSlotMember.objects.values_list('member_id', flat=True)), [1]
+        )
+
+    def test_command_reports_progress(self):
+
+        out = StringIO()
+        call_command('compact_schedules', '--batch-size', '2', stdout=out)
+
+        output = out.getvalue()
+        self.assertIn('Deleted 2/3 schedules', output)
+        self.assertIn('Deleted 3/3 schedules (9 rows', output)
+        self.assertIn('Compacted 1 inactive time slots (2 rows)', output)
+        self.assertEqual(Schedule.all_objects.count(), 2)
+        self.assertEqual(TimeSlot.all_objects.count(), 1)
+
+    def test_command_survives_instant_batches(self):
+
+        out = StringIO()
+        with mock.patch('apps.schedules.management.commands.compact_schedules.time.perf_counter', return_value=1.0):
+            call_command('compact_schedules', stdout=out)
+
+        self.assertIn('Compacted 3 inactive schedules (9 rows) in 0.00s.', out.getvalue())
+
+    def test_dry_run_deletes_nothing(self):
+
+        out = StringIO()
+        call_command('compact_schedules', '--dry-run', stdout=out)
+
+        self.assertIn('3 inactive schedules', out.getvalue())
+        self.assertIn('1 inactive time slots', out.getvalue())
+        self.assertEqual(Schedule.all_objects.count(), 5)
+
+        call_command('compact_schedules', '--days', '0', '--dry-run', stdout=out)
+        self.assertIn('4 inactive schedules', out.getvalue())
+
+    def test_archive_can_be_loaded_back(self):
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'archive.jsonl')
+            call_command('compact_schedules', '--archive', path, stdout=StringIO())
+            self.assertEqual(Schedule.all_objects.count(), 2)
+
+            call_command('loaddata', path, stdout=StringIO())
+
+        self.assertEqual(Schedule.all_objects.count(), 5)
+        self.assertEqual(TimeSlot.all_objects.count(), 5)
+        self.assertEqual(TimeSlotMember.objects.count(), 5)
+        self.assertFalse(Schedule.all_objects.get(pk=self.expired[0].pk).is_active)
+
+
+class BulkSoftDeleteTest(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.url = reverse('schedules:schedule-bulk-deactivate')
+
+        self.schedules = []
+        for index in range(3):
+            schedule = Schedule.objects.create(name=f'Schedule {index}', owner=self.user)
+            for hour in (9, 11):
+                TimeSlot.objects.create(
+                    schedule=schedule, day_of_week='monday',
+                    start_time=f'{hour:02d}:00', end_time=f'{hour + 1:02d}:00', ids=[index + 1],
+                )
+            self.schedules.append(schedule)
+
+    def _updates(self, queries):
+        return [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+
+    def test_soft_delete_is_one_update_per_table(self):
+
+        versions = dict(Schedule.objects.values_list('pk', 'version'))
+        with CaptureQueriesContext(connection) as queries:
+            count = Schedule.objects.filter(owner=self.user).soft_delete()
+
+        self.assertEqual(count, 3)
+        updates = self._updates(queries)
+        self.assertEqual(len(updates), 2)
+        self.assertTrue(updates[0].startswith('UPDATE "time_slots"'))
+        self.assertTrue(updates[1].startswith('UPDATE "schedules"'))
+        self.assertFalse(Schedule.objects.exists())
+        self.assertFalse(TimeSlot.objects.exists())
+        for pk, version in Schedule.all_objects.values_list('pk', 'version'):
+            self.assertEqual(version, versions[pk] + 1)
+        self.assertEqual(Schedule.all_objects.filter(owner=self.user).soft_delete(), 0)
+
+    def test_restore_only_brings_back_cascaded_slots(self):
+
+        first = self.schedules[0]
+        deleted_before = first.time_slots.get(start_time='09:00')
+        deleted_before.soft_delete()
+        Schedule.objects.filter(pk=first.pk).soft_delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(Schedule.all_objects.filter(pk=first.pk).restore(), 1)
+
+        # The cascade, then the restored schedule's snapshot.
+        updates = self._updates(queries)
+        self.assertEqual(len(updates), 3)
+        self.assertTrue(updates[2].startswith('UPDATE "schedules"'))
+        self.assertEqual(
+            list(TimeSlot.objects.filter(schedule=first).values_list('start_time', flat=True)),
+            [time(11)],
+        )
+        self.assertFalse(TimeSlot.all_objects.get(pk=deleted_before.pk).is_active)
+
+    def test_restore_refreshes_snapshots(self):
+
+        first = self.schedules[0]
+        Schedule.objects.filter(pk=first.pk).soft_delete()
+        # Rendered while deleted: only active slots count, so the week is empty.
+        refresh_schedule_snapshot(Schedule.all_objects.get(pk=first.pk))
+
+        Schedule.all_objects.filter(pk=first.pk).restore()
+
+        first.refresh_from_db()
+        self.assertEqual(first.snapshot_slots_count, 2)
+        self.assertEqual(load_snapshot(first), fetch_schedule_data(first))
+        self.assertEqual([len(slots) for slots in load_snapshot(first).values()], [2, 0, 0, 0, 0, 0, 0])
+        self.assertTrue(any(first.occupancy))
+
+    def test_restore_matches_the_cascade_not_timestamps(self):
+
+        first = self.schedules[0]
+        own = first.time_slots.get(start_time='09:00')
+        own.soft_delete()
+        first.soft_delete()
+        self.assertEqual(
+            TimeSlot.all_objects.get(schedule=first, start_time='11:00').deleted_at, first.deleted_at
+        )
+        # Later writes to either row (admin edits, snapshot refreshes) must not matter.
+        now = timezone.now()
+        Schedule.all_objects.filter(pk=first.pk).update(updated_at=now + timedelta(minutes=5))
+        TimeSlot.all_objects.filter(pk=own.pk).update(updated_at=now + timedelta(minutes=10))
+
+        first.restore()
+
+        self.assertIsNone(first.deleted_at)
+        self.assertEqual(
+            list(TimeSlot.objects.filter(schedule=first).values_list('start_time', flat=True)), [time(11)]
+        )
+        self.assertIsNone(TimeSlot.objects.get(schedule=first).deleted_at)
+        self.assertIsNotNone(TimeSlot.all_objects.get(pk=own.pk).deleted_at)
+
+    def test_time_slot_soft_delete_refreshes_snapshots(self):
+
+        TimeSlot.objects.filter(start_time='09:00').soft_delete()
+
+        for schedule in Schedule.objects.all():
+            self.assertEqual(schedule.snapshot_slots_count, 1)
+            self.assertEqual(load_snapshot(schedule), fetch_schedule_data(schedule))
+
+        TimeSlot.all_objects.restore()
+        self.assertEqual(set(Schedule.objects.values_list('snapshot_slots_count', flat=True)), {2})
+
+    def test_instance_soft_delete_cascades(self):
+
+        schedule = self.schedules[0]
+        schedule.soft_delete()
+        self.assertFalse(schedule.is_active)
+        self.assertFalse(TimeSlot.objects.filter(schedule=schedule).exists())
+
+        schedule.restore()
+        self.assertTrue(schedule.is_active)
+        self.assertEqual(TimeSlot.objects.filter(schedule=schedule).count(), 2)
+
+    def test_bulk_deactivate_endpoint(self):
+
+        ids = [str(schedule.pk) for schedule in self.schedules[:2]]
+        response = self.client.post(self.url, {'ids': ids}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'deactivated': 2})
+        self.assertEqual(list(Schedule.objects.values_list('pk', flat=True)), [self.schedules[2].pk])
+        self.assertEqual(TimeSlot.objects.count(), 2)
+        detail = self.client.get(reverse('schedules:schedule-detail', kwargs={'id': ids[0]}))
+        self.assertEqual(detail.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_bulk_deactivate_rejects_unknown_ids(self):
+
+        other = User.objects.create_user(username='other', password='testpass123')
+        foreign = Schedule.objects.create(name='Other', owner=other)
+        missing = uuid.uuid4()
+        ids = [str(self.schedules[0].pk), str(foreign.pk), str(missing)]
+
+        response = self.client.post(self.url, {'ids': ids}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(response.data['ids']), 2)
+        self.assertEqual(Schedule.objects.count(), 4)
+        self.assertEqual(self.client.post(self.url, {'ids': []}, format='json').status_code, 400)
+
+    def test_admin_actions(self):
+
+        admin_user = User.objects.create_superuser(username='admin', password='testpass123')
+        client = APIClient()
+        client.force_login(admin_user)
+        url = reverse('admin:schedules_schedule_changelist')
+        selected = [str(schedule.pk) for schedule in self.schedules[:2]]
+
+        response = client.post(url, {'action': 'soft_delete_selected', '_selected_action': selected})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Schedule.objects.count(), 1)
+        self.assertEqual(TimeSlot.objects.count(), 2)
+
+        # Inactive schedules stay listed in the admin so they can be restored.
+        client.post(url, {'action': 'restore_selected', '_selected_action': selected})
+        self.assertEqual(Schedule.objects.count(), 3)
+        self.assertEqual(TimeSlot.objects.count(), 6)
+
+
+class TimeSlotMinuteOfWeekTest(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.schedule = Schedule.objects.create(name='Week', owner=self.user)
+
+    def _minutes(self, slot):
+        slot.refresh_from_db()
+        return slot.start_minute, slot.end_minute
+
+    def test_minutes_follow_day_and_times(self):
+
+        slot = TimeSlot.objects.create(
+            schedule=self.schedule, day_of_week='tuesday', start_time='09:30', end_time='10:00', ids=[1]
+        )
+        self.assertEqual(self._minutes(slot), (1440 + 570, 1440 + 600))
+
+        slot.day_of_week = 'sunday'
+        slot.end_time = time(23, 59)
+        slot.save(update_fields=['day_of_week', 'end_time'])
+        self.assertEqual(self._minutes(slot), (6 * 1440 + 570, 6 * 1440 + 1439))
+
+        bulk, = TimeSlot.objects.bulk_create([
+            TimeSlot(schedule=self.schedule, day_of_week='monday', start_time=time(0), end_time=time(1), ids=[])
+        ])
+        self.assertEqual(self._minutes(bulk), (0, 60))
+
+    def test_backfill_migration(self):
+
+        migration = importlib.import_module('apps.schedules.migrations.0011_time_slot_minute_of_week')
+        slot = TimeSlot.objects.create(
+            schedule=self.schedule, day_of_week='friday', start_time='13:15', end_time='14:00', ids=[1]
+        )
+        TimeSlot.objects.update(start_minute=0, end_minute=0)
+
+        migration.backfill_minutes_of_week(apps, connection.schema_editor())
+
+        self.assertEqual(self._minutes(slot), (4 * 1440 + 795, 4 * 1440 + 840))
+
+    def test_slots_sort_by_week_order(self):
+
+        for day in ('sunday', 'friday', 'monday', 'tuesday'):
+            TimeSlot.objects.create(
+                schedule=self.schedule, day_of_week=day, start_time='09:00', end_time='10:00', ids=[7]
+            )
+        TimeSlot.objects.create(
+            schedule=self.schedule, day_of_week='monday', start_time='08:00', end_time='09:00', ids=[7]
+        )
+        expected = ['monday', 'monday', 'tuesday', 'friday', 'sunday']
+
+        self.assertEqual(list(self.schedule.time_slots.values_list('day_of_week', flat=True)), expected)
+        url = reverse('schedules:member-time-slots', kwargs={'member_id': 7})
+        time_slots = self.client.get(url).data['schedules'][0]['time_slots']
+        self.assertEqual([slot['day_of_week'] for slot in time_slots], expected)
+        self.assertEqual(time_slots[0]['start'], '08:00')
+        self.assertEqual(time_slots[0]['stop'], '09:00')
+
+    @override_settings(SCHEDULE_INTERVAL_INDEX_ENABLED=False)
+    def test_active_filters_by_minute_range(self):
+
+        for day, start, end in [('monday', '09:00', '10:00'), ('monday', '10:00', '11:00'), ('tuesday', '09:00', '12:00')]:
+            TimeSlot.objects.create(
+                schedule=self.schedule, day_of_week=day, start_time=start, end_time=end, ids=[1]
+            )
+        url = reverse('schedules:schedule-active')
+
+        def starts(**params):
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return sorted(
+                slot['start'] for schedule in response.data['schedules'] for slot in schedule['time_slots']
+            )
+
+        self.assertEqual(starts(day='monday', time='10:00'), ['10:00'])
+        self.assertEqual(starts(day='monday', time='09:59:30'), ['09:00'])
+        self.assertEqual(starts(day='monday', start='09:30', stop='10:00'), ['09:00'])
+        self.assertEqual(starts(day='monday', start='09:30', stop='10:00:30'), ['09:00', '10:00'])
+        self.assertEqual(starts(day='tuesday', time='11:00'), ['09:00'])
+        self.assertEqual(starts(day='sunday', time='09:00'), [])
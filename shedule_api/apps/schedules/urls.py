@@ -4,6 +4,13 @@ from .views import (
     ScheduleRetrieveUpdateDestroyAPIView,
     protected_endpoint,
     schedule_statistics,
+    active_schedules,
+    member_time_slots,
+    import_schedules_ndjson,
+    export_schedules,
+    schedule_free_busy,
+    bulk_deactivate_schedules,
+    schedule_occurrences_ndjson,
 )
 
 app_name = 'schedules'
@@ -13,4 +20,11 @@ urlpatterns = [
     path('<uuid:id>/', ScheduleRetrieveUpdateDestroyAPIView.as_view(), name='schedule-detail'),
     path('protected/', protected_endpoint, name='protected-endpoint'),
     path('statistics/', schedule_statistics, name='schedule-statistics'),
+    path('active/', active_schedules, name='schedule-active'),
+    path('members/<int:member_id>/', member_time_slots, name='member-time-slots'),
+    path('import/', import_schedules_ndjson, name='schedule-import'),
+    path('export/', export_schedules, name='schedule-export'),
+    path('free-busy/', schedule_free_busy, name='schedule-free-busy'),
+    path('bulk-deactivate/', bulk_deactivate_schedules, name='schedule-bulk-deactivate'),
+    path('occurrences/', schedule_occurrences_ndjson, name='schedule-occurrences'),
 ]
\ No newline at end of file
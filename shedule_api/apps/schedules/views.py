@@ -1,23 +1,92 @@
+import json
+
+from django.conf import settings
+from django.db import transaction
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.db.models import Count, Q
 from rest_framework import generics, status, permissions
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-from .models import Schedule, TimeSlot
+from apps.authentication.authentication import TOKEN_USER_AUTHENTICATION_CLASSES
+from schedule_api.database import retry_on_lock
+from .models import Schedule
+from .availability import free_busy
+from .bitmaps import OccupancyMatrix
+from .conditional import ConditionalGetMixin, schedule_list_validators, schedule_validators
+from .exports import csv_lines, gzip_stream, iter_schedule_documents, ndjson_lines
+from .imports import import_schedules_report
+from .intervals import get_owner_index, query_active_slots
+from .occurrences import schedule_occurrences
+from .members import schedules_containing, time_slots_containing
+from .pagination import ScheduleKeysetPagination
+from .statistics import get_owner_statistics
 from .serializers import (
     ScheduleListSerializer,
     ScheduleDetailSerializer,
     ScheduleCreateUpdateSerializer,
+    ActiveSlotQuerySerializer,
+    BulkDeactivateSerializer,
+    FreeBusyQuerySerializer,
+    OccurrenceQuerySerializer,
 )
 
 
-class ScheduleListCreateAPIView(generics.ListCreateAPIView):
+def _parse_member_id(value):
+    try:
+        member_id = int(value)
+    except ValueError:
+        member_id = 0
+    if member_id <= 0:
+        raise ValidationError({'contains_id': ["Must be a positive integer."]})
+    return member_id
+
+
+def schedule_list_queryset(owner, contains_id=None):
+    """Schedules listed for ``owner``, shared by the sync and async list views."""
+    queryset = Schedule.objects.filter(owner_id=owner.pk)
+    if contains_id is not None:
+        queryset = queryset.filter(
+            pk__in=schedules_containing(_parse_member_id(contains_id)).values('pk')
+        )
+    return queryset.select_related('owner').annotate(
+        time_slots_count=Count('time_slots', filter=Q(time_slots__is_active=True))
+    ).order_by('-created_at', '-id')
+
+
+class ScheduleListCreateAPIView(ConditionalGetMixin, generics.ListCreateAPIView):
     
+    authentication_classes = TOKEN_USER_AUTHENTICATION_CLASSES
     permission_classes = [permissions.IsAuthenticated]
+    keyset_pagination_value = 'cursor'
     
     def get_queryset(self):
         
+        if self.request.method == 'GET':
+            return schedule_list_queryset(
+                self.request.user, self.request.query_params.get('contains_id')
+            )
         return Schedule.objects.filter(owner=self.request.user)
+
+    @property
+    def paginator(self):
+        
+        if not hasattr(self, '_paginator'):
+            request = self.request
+            if request is not None and request.query_params.get('pagination') == self.keyset_pagination_value:
+                self._paginator = ScheduleKeysetPagination()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
+
+    def get_conditional_validators(self):
+        
+        return schedule_list_validators(
+            Schedule.objects.filter(owner_id=self.request.user.pk), self.request
+        )
     
     def get_serializer_class(self):
         
@@ -27,8 +96,30 @@ class ScheduleListCreateAPIView(generics.ListCreateAPIView):
 
     @swagger_auto_schema(
         operation_description="Get list of schedules for the authenticated user",
+        manual_parameters=[
+            openapi.Parameter(
+                'pagination',
+                openapi.IN_QUERY,
+                description="Set to 'cursor' for keyset pagination over (created_at, id)",
+                type=openapi.TYPE_STRING,
+                enum=['cursor'],
+            ),
+            openapi.Parameter(
+                'cursor',
+                openapi.IN_QUERY,
+                description="Opaque cursor taken from the 'next' link of a keyset page",
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                'contains_id',
+                openapi.IN_QUERY,
+                description="Only schedules with an active time slot containing this id",
+                type=openapi.TYPE_INTEGER,
+            ),
+        ],
         responses={
             200: ScheduleListSerializer(many=True),
+            304: "Not Modified",
             401: "Unauthorized"
         }
     )
@@ -55,14 +146,15 @@ class ScheduleListCreateAPIView(generics.ListCreateAPIView):
         return Response(detail_serializer.data, status=status.HTTP_201_CREATED)
 
 
-class ScheduleRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
+class ScheduleRetrieveUpdateDestroyAPIView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     
+    authentication_classes = TOKEN_USER_AUTHENTICATION_CLASSES
     permission_classes = [permissions.IsAuthenticated]
     lookup_field = 'id'
     
     def get_queryset(self):
         
-        return Schedule.objects.filter(owner=self.request.user)
+        return Schedule.objects.filter(owner_id=self.request.user.pk)
     
     def get_serializer_class(self):
         
@@ -70,10 +162,15 @@ class ScheduleRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView
             return ScheduleCreateUpdateSerializer
         return ScheduleDetailSerializer
 
+    def get_conditional_validators(self):
+        
+        return schedule_validators(self.get_queryset(), self.kwargs[self.lookup_field])
+
     @swagger_auto_schema(
         operation_description="Get a specific schedule",
         responses={
             200: ScheduleDetailSerializer,
+            304: "Not Modified",
             401: "Unauthorized",
             404: "Not Found"
         }
@@ -118,7 +215,10 @@ class ScheduleRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView
         schedule = serializer.save()        
         
         detail_serializer = ScheduleDetailSerializer(schedule)
-        return Response(detail_serializer.data)
+        data = detail_serializer.data
+        if serializer.time_slot_changes is not None:
+            data['time_slot_changes'] = serializer.time_slot_changes
+        return Response(data)
 
     @swagger_auto_schema(
         operation_description="Delete a specific schedule",
@@ -132,6 +232,11 @@ class ScheduleRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView
         
         return super().delete(request, *args, **kwargs)
 
+    @retry_on_lock
+    def perform_destroy(self, instance):
+        
+        instance.delete()
+
 
 @swagger_auto_schema(
     method='get',
@@ -189,6 +294,12 @@ def protected_endpoint(request):
                     'total_schedules': openapi.Schema(type=openapi.TYPE_INTEGER),
                     'total_time_slots': openapi.Schema(type=openapi.TYPE_INTEGER),
                     'schedules_by_day': openapi.Schema(type=openapi.TYPE_OBJECT),
+                    'total_minutes': openapi.Schema(type=openapi.TYPE_INTEGER),
+                    'minutes_by_day': openapi.Schema(type=openapi.TYPE_OBJECT),
+                    'distinct_ids': openapi.Schema(type=openapi.TYPE_INTEGER),
+                    'distinct_ids_by_day': openapi.Schema(type=openapi.TYPE_OBJECT),
+                    'hours_by_day': openapi.Schema(type=openapi.TYPE_OBJECT),
+                    'busiest_hour': openapi.Schema(type=openapi.TYPE_OBJECT),
                 }
             )
         ),
@@ -196,26 +307,380 @@ def protected_endpoint(request):
     }
 )
 @api_view(['GET'])
+@authentication_classes(TOKEN_USER_AUTHENTICATION_CLASSES)
 @permission_classes([permissions.IsAuthenticated])
 def schedule_statistics(request):
     
     user = request.user
-    schedules = Schedule.objects.filter(owner=user)
-    total_schedules = schedules.count()
+    statistics = get_owner_statistics(user.pk)
     
-    total_time_slots = TimeSlot.objects.filter(schedule__owner=user).count()    
+    return Response({
+        **statistics,
+        'user': user.username,
+    })
+
+
+def _format_seconds(seconds):
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}"
+
+
+@swagger_auto_schema(
+    method='get',
+    operation_description="Get the schedules and ids active at a point in time or during a time range",
+    query_serializer=ActiveSlotQuerySerializer,
+    responses={
+        200: openapi.Response(
+            description="Success",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'day': openapi.Schema(type=openapi.TYPE_STRING),
+                    'start': openapi.Schema(type=openapi.TYPE_STRING),
+                    'stop': openapi.Schema(type=openapi.TYPE_STRING),
+                    'schedules': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT)),
+                    'ids': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER)),
+                }
+            )
+        ),
+        400: "Bad Request",
+        401: "Unauthorized"
+    }
+)
+@api_view(['GET'])
+@authentication_classes(TOKEN_USER_AUTHENTICATION_CLASSES)
+@permission_classes([permissions.IsAuthenticated])
+def active_schedules(request):
     
-    schedules_by_day = {}
-    for day, _ in TimeSlot.DAYS_OF_WEEK:
-        count = TimeSlot.objects.filter(
-            schedule__owner=user, 
-            day_of_week=day
-        ).count()
-        schedules_by_day[day] = count
+    query = ActiveSlotQuerySerializer(data=request.query_params)
+    query.is_valid(raise_exception=True)
+    day = query.validated_data['day']
+    start = query.validated_data.get('time') or query.validated_data['start']
+    stop = query.validated_data.get('stop')
+
+    if settings.SCHEDULE_INTERVAL_INDEX_ENABLED:
+        matches = get_owner_index(request.user.pk).query(day, start, stop)
+    else:
+        matches = query_active_slots(request.user.pk, day, start, stop)
+
+    schedules = {}
+    ids = set()
+    for slot, name in matches:
+        entry = schedules.setdefault(slot.schedule_id, {
+            'id': str(slot.schedule_id),
+            'name': name,
+            'time_slots': [],
+        })
+        entry['time_slots'].append({
+            'start': _format_seconds(slot.start),
+            'stop': _format_seconds(slot.end),
+            'ids': slot.ids,
+        })
+        ids.update(slot.ids)
+
+    for entry in schedules.values():
+        entry['time_slots'].sort(key=lambda time_slot: (time_slot['start'], time_slot['stop']))
+
+    return Response({
+        'day': day,
+        'start': start.strftime('%H:%M'),
+        'stop': stop.strftime('%H:%M') if stop else None,
+        'schedules': sorted(schedules.values(), key=lambda entry: (entry['name'], entry['id'])),
+        'ids': sorted(ids),
+    })
+
+
+
+@swagger_auto_schema(
+    method='get',
+    operation_description="Get every schedule and time slot of the authenticated user that contains an id",
+    responses={
+        200: openapi.Response(
+            description="Success",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'id': openapi.Schema(type=openapi.TYPE_INTEGER),
+                    'schedules': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT)),
+                }
+            )
+        ),
+        401: "Unauthorized"
+    }
+)
+@api_view(['GET'])
+@authentication_classes(TOKEN_USER_AUTHENTICATION_CLASSES)
+@permission_classes([permissions.IsAuthenticated])
+def member_time_slots(request, member_id):
     
+    time_slots = time_slots_containing(member_id).filter(
+        schedule__owner_id=request.user.pk,
+        schedule__is_active=True,
+    ).select_related('schedule').order_by('schedule__name', 'schedule_id', 'start_minute', 'end_minute')
+
+    schedules = {}
+    for time_slot in time_slots:
+        entry = schedules.setdefault(time_slot.schedule_id, {
+            'id': str(time_slot.schedule_id),
+            'name': time_slot.schedule.name,
+            'time_slots': [],
+        })
+        entry['time_slots'].append({
+            'id': str(time_slot.id),
+            'day_of_week': time_slot.day_of_week,
+            'start': time_slot.start_time.strftime('%H:%M'),
+            'stop': time_slot.end_time.strftime('%H:%M'),
+        })
+
     return Response({
-        'total_schedules': total_schedules,
-        'total_time_slots': total_time_slots,
-        'schedules_by_day': schedules_by_day,
-        'user': user.username,
-    })
\ No newline at end of file
+        'id': member_id,
+        'schedules': list(schedules.values()),
+    })
+
+
+
+@swagger_auto_schema(
+    method='post',
+    operation_description=(
+        "Bulk import schedules from an NDJSON body (one ScheduleCreateUpdateSerializer "
+        "document per line). Returns one NDJSON result per input line and a final summary "
+        "once the whole body has been imported."
+    ),
+    manual_parameters=[
+        openapi.Parameter(
+            'batch_size',
+            openapi.IN_QUERY,
+            description="Schedules committed per transaction",
+            type=openapi.TYPE_INTEGER,
+        ),
+    ],
+    responses={
+        200: "NDJSON stream of per-line results",
+        400: "Bad Request",
+        401: "Unauthorized"
+    }
+)
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def import_schedules_ndjson(request):
+    
+    try:
+        batch_size = int(request.query_params.get('batch_size', settings.SCHEDULE_IMPORT_BATCH_SIZE))
+    except ValueError:
+        batch_size = 0
+    if not 1 <= batch_size <= 5000:
+        raise ValidationError({'batch_size': ["Must be an integer between 1 and 5000."]})
+
+    # Read the raw WSGI stream line by line; touching request.data would
+    # buffer and parse the whole upload. The import runs here, inside the
+    # view, rather than lazily while the response is sent.
+    report = import_schedules_report(
+        request._request,
+        request.user,
+        batch_size,
+        settings.SCHEDULE_IMPORT_MAX_LINE_BYTES,
+    )
+    return FileResponse(report, content_type='application/x-ndjson')
+
+
+def _accepts_gzip(accept_encoding):
+    """
+    Whether an Accept-Encoding header allows gzip: listed, or covered by
+    ``*``, with a non-zero q-value. An explicit ``gzip`` entry wins over ``*``.
+    """
+    qvalues = {}
+    for coding in accept_encoding.split(','):
+        name, *params = [part.strip() for part in coding.split(';')]
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qvalues[name.lower()] = quality
+    return qvalues.get('gzip', qvalues.get('*', 0.0)) > 0
+
+
+def _streaming_response(request, lines, content_type):
+    """Stream ``lines``, gzip-compressed on the fly when the client accepts it."""
+    compress = _accepts_gzip(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    response = StreamingHttpResponse(
+        gzip_stream(lines) if compress else lines,
+        content_type=content_type,
+    )
+    if compress:
+        response['Content-Encoding'] = 'gzip'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+EXPORT_CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+@swagger_auto_schema(
+    method='get',
+    operation_description=(
+        "Stream every schedule of the authenticated user. 'ndjson' emits one detail "
+        "document per line, 'csv' one row per time slot. The body is gzip-compressed "
+        "on the fly when the client sends Accept-Encoding: gzip."
+    ),
+    manual_parameters=[
+        openapi.Parameter(
+            'output',
+            openapi.IN_QUERY,
+            description="Export format",
+            type=openapi.TYPE_STRING,
+            enum=list(EXPORT_CONTENT_TYPES),
+            default='ndjson',
+        ),
+    ],
+    responses={
+        200: "NDJSON or CSV stream",
+        400: "Bad Request",
+        401: "Unauthorized"
+    }
+)
+@api_view(['GET'])
+@authentication_classes(TOKEN_USER_AUTHENTICATION_CLASSES)
+@permission_classes([permissions.IsAuthenticated])
+def export_schedules(request):
+    
+    # Not ``format``: DRF reserves that parameter for renderer selection.
+    output = request.query_params.get('output', 'ndjson')
+    if output not in EXPORT_CONTENT_TYPES:
+        raise ValidationError({'output': [f"Must be one of: {', '.join(EXPORT_CONTENT_TYPES)}."]})
+
+    documents = iter_schedule_documents(
+        Schedule.objects.filter(owner_id=request.user.pk),
+        settings.SCHEDULE_EXPORT_CHUNK_SIZE,
+    )
+    lines = ndjson_lines(documents) if output == 'ndjson' else csv_lines(documents)
+
+    response = _streaming_response(request, lines, EXPORT_CONTENT_TYPES[output])
+    response['Content-Disposition'] = f'attachment; filename="schedules.{output}"'
+    return response
+
+
+
+@swagger_auto_schema(
+    method='post',
+    operation_description=(
+        "Merged free/busy windows per day across a set of schedules (the given ids, "
+        "or every active schedule of the user). 'busy' is when any schedule is active, "
+        "'free' when none is and 'common' when all are."
+    ),
+    request_body=FreeBusyQuerySerializer,
+    responses={
+        200: "Per-day busy, free and common intervals",
+        400: "Bad Request",
+        401: "Unauthorized"
+    }
+)
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def schedule_free_busy(request):
+    
+    query = FreeBusyQuerySerializer(data=request.data)
+    query.is_valid(raise_exception=True)
+    schedule_ids = query.validated_data.get('schedule_ids')
+
+    queryset = Schedule.objects.filter(owner=request.user)
+    if schedule_ids is not None:
+        schedule_ids = set(schedule_ids)
+        queryset = queryset.filter(pk__in=schedule_ids)
+    matrix = OccupancyMatrix.from_queryset(queryset)
+    if schedule_ids is not None and len(matrix) != len(schedule_ids):
+        unknown = schedule_ids - set(matrix.schedule_ids)
+        raise ValidationError({'schedule_ids': [f"Unknown schedule: {pk}" for pk in sorted(map(str, unknown))]})
+
+    return Response({
+        'schedules': len(matrix),
+        'min_minutes': query.validated_data['min_minutes'],
+        'days': free_busy(matrix, query.validated_data['min_minutes']),
+    })
+
+
+
+@retry_on_lock
+@transaction.atomic
+def _deactivate_schedules(owner, schedule_ids):
+    queryset = Schedule.objects.filter(owner_id=owner.pk, pk__in=schedule_ids)
+    found = set(queryset.select_for_update().values_list('pk', flat=True))
+    unknown = schedule_ids - found
+    if unknown:
+        raise ValidationError({'ids': [f"Unknown schedule: {pk}" for pk in sorted(map(str, unknown))]})
+    return queryset.soft_delete()
+
+
+@swagger_auto_schema(
+    method='post',
+    operation_description=(
+        "Deactivate (soft delete) several schedules of the authenticated user and their "
+        "time slots with one UPDATE per table. Nothing changes when an id is unknown or "
+        "already deactivated."
+    ),
+    request_body=BulkDeactivateSerializer,
+    responses={
+        200: "Number of deactivated schedules",
+        400: "Bad Request",
+        401: "Unauthorized"
+    }
+)
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def bulk_deactivate_schedules(request):
+    
+    query = BulkDeactivateSerializer(data=request.data)
+    query.is_valid(raise_exception=True)
+
+    deactivated = _deactivate_schedules(request.user, set(query.validated_data['ids']))
+    return Response({'deactivated': deactivated})
+
+
+def _format_utc(value):
+    return value.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+@swagger_auto_schema(
+    method='get',
+    operation_description=(
+        "Stream the concrete occurrences of the weekly schedules between two local dates "
+        "in an IANA timezone as NDJSON, one occurrence per line with UTC start/end, in "
+        "chronological order. DST gaps shift a slot forward; ambiguous times take the "
+        "first occurrence."
+    ),
+    query_serializer=OccurrenceQuerySerializer,
+    responses={
+        200: "NDJSON stream of occurrences",
+        400: "Bad Request",
+        401: "Unauthorized"
+    }
+)
+@api_view(['GET'])
+@authentication_classes(TOKEN_USER_AUTHENTICATION_CLASSES)
+@permission_classes([permissions.IsAuthenticated])
+def schedule_occurrences_ndjson(request):
+    
+    query = OccurrenceQuerySerializer(data=request.query_params)
+    query.is_valid(raise_exception=True)
+    data = query.validated_data
+
+    queryset = Schedule.objects.filter(owner_id=request.user.pk)
+    if 'schedule_ids' in data:
+        queryset = queryset.filter(pk__in=data['schedule_ids'])
+    occurrences = schedule_occurrences(queryset, data['start'], data['end'], data['tz'])
+
+    lines = (
+        json.dumps({
+            'schedule_id': str(occurrence.schedule_id),
+            'start': _format_utc(occurrence.start),
+            'end': _format_utc(occurrence.end),
+            'ids': occurrence.ids,
+        }) + '\n'
+        for occurrence in occurrences
+    )
+    return _streaming_response(request, lines, 'application/x-ndjson')
@@ -0,0 +1,145 @@
+"""
+``DATABASE_URL`` parsing, connection reuse and SQLite tuning for
+``DATABASES``, plus retrying of write transactions that hit SQLite locks.
+"""
+import random
+import time
+from functools import wraps
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import OperationalError
+
+
+ENGINES = {
+    'postgres': 'django.db.backends.postgresql',
+    'postgresql': 'django.db.backends.postgresql',
+    'pgsql': 'django.db.backends.postgresql',
+    'sqlite': 'django.db.backends.sqlite3',
+    'mysql': 'django.db.backends.mysql',
+}
+
+
+def _sqlite_name(parsed):
+    # sqlite:///relative.db, sqlite:////absolute/path.db, sqlite:// (in memory)
+    path = parsed.path
+    if parsed.netloc == ':memory:' or path in ('', '/', '/:memory:'):
+        return ':memory:'
+    return unquote(path[1:])
+
+
+def database_from_url(url, conn_max_age=0, conn_health_checks=False, pool=None):
+    """
+    Build one ``DATABASES`` entry from ``url``.
+
+    Query string parameters become ``OPTIONS`` (e.g. ``?sslmode=require``).
+    ``pool`` is a dict of psycopg pool options (``min_size``, ``max_size``,
+    ``timeout``...); Django requires psycopg 3 for it and manages the pool
+    itself, so persistent connections are turned off when it is set.
+    """
+    parsed = urlsplit(url)
+    try:
+        engine = ENGINES[parsed.scheme]
+    except KeyError:
+        raise ImproperlyConfigured(f"Unsupported DATABASE_URL scheme: {parsed.scheme!r}")
+
+    options = dict(parse_qsl(parsed.query))
+    if engine == ENGINES['sqlite']:
+        config = {'ENGINE': engine, 'NAME': _sqlite_name(parsed)}
+    else:
+        config = {
+            'ENGINE': engine,
+            'NAME': unquote(parsed.path[1:]),
+            'USER': unquote(parsed.username or ''),
+            'PASSWORD': unquote(parsed.password or ''),
+            # Percent-encoded hosts are Unix socket directories.
+            'HOST': unquote(parsed.hostname or ''),
+            'PORT': str(parsed.port or ''),
+        }
+
+    if pool:
+        if engine != ENGINES['postgresql']:
+            raise ImproperlyConfigured("Connection pooling is only supported on PostgreSQL.")
+        options['pool'] = pool
+        conn_max_age = 0
+
+    config['CONN_MAX_AGE'] = conn_max_age
+    config['CONN_HEALTH_CHECKS'] = conn_health_checks
+    if options:
+        config['OPTIONS'] = options
+    return config
+
+
+def pool_stats(alias='default'):
+    """
+    Return the psycopg pool counters of ``alias`` in this process, or
+    ``None`` when the connection is not pooled.
+    """
+    from django.db import connections
+
+    pool = getattr(connections[alias], 'pool', None)
+    if pool is None:
+        return None
+    return pool.get_stats()
+
+
+def sqlite_tuning_options(mmap_size, cache_size_kib, busy_timeout):
+    """
+    ``OPTIONS`` for a SQLite database shared by several worker processes.
+
+    Every new connection switches to WAL (readers no longer block the
+    writer), fsyncs only at checkpoints (``synchronous=NORMAL``), memory-maps
+    up to ``mmap_size`` bytes and caches ``cache_size_kib`` KiB of pages.
+    Transactions start with ``BEGIN IMMEDIATE`` so a writer takes the lock up
+    front and waits up to ``busy_timeout`` seconds for it, instead of failing
+    when it upgrades from a read lock mid-transaction.
+    """
+    pragmas = [
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        f'PRAGMA mmap_size={int(mmap_size)}',
+        f'PRAGMA cache_size=-{int(cache_size_kib)}',
+        f'PRAGMA busy_timeout={int(busy_timeout * 1000)}',
+    ]
+    return {
+        'init_command': '; '.join(pragmas),
+        'transaction_mode': 'IMMEDIATE',
+        'timeout': busy_timeout,
+    }
+
+
+def is_lock_error(exc):
+    return isinstance(exc, OperationalError) and 'locked' in str(exc)
+
+
+def connection_in_atomic_block():
+    from django.db import connection
+
+    return connection.in_atomic_block
+
+
+def retry_on_lock(func):
+    """
+    Re-run ``func`` (an outermost write transaction) when SQLite reports the
+    database as locked, up to ``DATABASE_WRITE_RETRIES`` more times with
+    jittered exponential backoff from ``DATABASE_WRITE_RETRY_BACKOFF``
+    seconds. Inside an enclosing transaction the error is raised at once,
+    since only the outermost block can be replayed.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        from django.conf import settings
+
+        retries = getattr(settings, 'DATABASE_WRITE_RETRIES', 0)
+        backoff = getattr(settings, 'DATABASE_WRITE_RETRY_BACKOFF', 0.05)
+        attempt = 0
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except OperationalError as exc:
+                if not is_lock_error(exc) or connection_in_atomic_block() or attempt >= retries:
+                    raise
+            delay = backoff * 2 ** attempt
+            time.sleep(delay + random.uniform(0, delay))
+            attempt += 1
+    return wrapper
@@ -0,0 +1,241 @@
+"""
+Read-replica routing.
+
+``ReplicaRouter`` sends reads to a replica only while a request handled by
+``ReplicaRoutingMiddleware`` has marked itself replica-safe: a GET/HEAD/
+OPTIONS request to one of ``DATABASE_REPLICA_PATHS`` from a user who has not
+written in the last ``DATABASE_READ_YOUR_WRITES_SECONDS``. The replica is
+picked once per request, so all of its reads see the same data. Everything
+else - writes, transactions, management commands, other endpoints - uses the
+primary.
+"""
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import TokenError, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PIN_KEY = 'replicas:primary-until:{}'
+
+_replica = ContextVar('replica', default=None)
+_round_robin = itertools.count()
+_lag_cache = {}
+_authentication = JWTAuthentication()
+
+
+def replica_aliases():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def replica_lag(alias):
+    """
+    Seconds ``alias`` is behind the primary. PostgreSQL standbys report the
+    age of the last replayed transaction; other backends (e.g. a SQLite copy
+    used locally) are treated as current.
+    """
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+        )
+        return float(cursor.fetchone()[0])
+
+
+def _cached_lag(alias):
+    # Lag is sampled at most every DATABASE_REPLICA_LAG_CHECK_INTERVAL seconds
+    # per process; an unreachable replica counts as infinitely behind.
+    now = time.monotonic()
+    checked_at, lag = _lag_cache.get(alias, (None, None))
+    if checked_at is None or now - checked_at >= settings.DATABASE_REPLICA_LAG_CHECK_INTERVAL:
+        try:
+            lag = replica_lag(alias)
+        except Exception:
+            lag = float('inf')
+        _lag_cache[alias] = (now, lag)
+    return lag
+
+
+def choose_replica():
+    """
+    Pick a replica for a request's reads, or ``None`` to read from the primary
+    when none is configured or all are behind ``DATABASE_REPLICA_MAX_LAG``.
+    """
+    lags = {alias: _cached_lag(alias) for alias in replica_aliases()}
+    current = [alias for alias, lag in lags.items() if lag <= settings.DATABASE_REPLICA_MAX_LAG]
+    if not current:
+        return None
+    if settings.DATABASE_REPLICA_SELECTION == 'lowest_lag':
+        return min(current, key=lags.get)
+    return current[next(_round_robin) % len(current)]
+
+
+class ReplicaRouter:
+    """Database router that reads from the request's replica, if it has one."""
+
+    def db_for_read(self, model, **hints):
+        alias = _replica.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema through replication.
+        return db not in replica_aliases()
+
+
+@contextmanager
+def use_primary():
+    """Read from the primary inside the block, even in a replica-safe request."""
+    token = _replica.set(None)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+def pin_to_primary(user_key, seconds=None):
+    """Send ``user_key``'s reads to the primary for the next ``seconds``."""
+    if seconds is None:
+        seconds = settings.DATABASE_READ_YOUR_WRITES_SECONDS
+    if user_key is not None and seconds > 0:
+        cache.set(PIN_KEY.format(user_key), time.time() + seconds, timeout=seconds)
+
+
+def is_pinned_to_primary(user_key):
+    if user_key is None:
+        return False
+    return (cache.get(PIN_KEY.format(user_key)) or 0) > time.time()
+
+
+def request_user_key(request):
+    """
+    Identify the caller without touching the database: the ``user_id`` claim
+    of a valid bearer token, else the session user.
+    """
+    header = _authentication.get_header(request)
+    raw_token = _authentication.get_raw_token(header) if header else None
+    if raw_token is not None:
+        try:
+            return _authentication.get_validated_token(raw_token).get(api_settings.USER_ID_CLAIM)
+        except (InvalidToken, TokenError):
+            return None
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user.pk
+    return None
+
+
+def _replica_path(path):
+    return any(path.startswith(prefix) for prefix in settings.DATABASE_REPLICA_PATHS)
+
+
+def _replica_chunks(chunks, alias):
+    chunks = iter(chunks)
+    while True:
+        token = _replica.set(alias)
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            return
+        finally:
+            _replica.reset(token)
+        yield chunk
+
+
+async def _areplica_chunks(chunks, alias):
+    chunks = aiter(chunks)
+    while True:
+        token = _replica.set(alias)
+        try:
+            chunk = await anext(chunks)
+        except StopAsyncIteration:
+            return
+        finally:
+            _replica.reset(token)
+        yield chunk
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Sends the reads of safe-method requests to ``DATABASE_REPLICA_PATHS`` to
+    one replica unless the caller wrote recently, and starts the caller's
+    read-your-writes window after every successful unsafe request.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _route(self, request):
+        # Falls back to request.user, which may load the session and user from
+        # the database, and may sample replica lag, so the async path runs
+        # this in a thread.
+        user_key = request_user_key(request)
+        replica_safe = (
+            request.method in SAFE_METHODS
+            and _replica_path(request.path)
+            and not is_pinned_to_primary(user_key)
+        )
+        return user_key, choose_replica() if replica_safe else None
+
+    def _pin_after_write(self, request, response, user_key):
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_to_primary(user_key)
+
+    def _stream_from_replica(self, response, alias):
+        # Streaming views run their queries while the body is consumed, after
+        # the middleware has returned, so the request's replica is set again
+        # around each chunk.
+        if alias is not None and response.streaming:
+            if response.is_async:
+                response.streaming_content = _areplica_chunks(response.streaming_content, alias)
+            else:
+                response.streaming_content = _replica_chunks(response.streaming_content, alias)
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not replica_aliases():
+            return self.get_response(request)
+        user_key, alias = self._route(request)
+        token = _replica.set(alias)
+        try:
+            response = self.get_response(request)
+        finally:
+            _replica.reset(token)
+        self._pin_after_write(request, response, user_key)
+        return self._stream_from_replica(response, alias)
+
+    async def __acall__(self, request):
+        if not replica_aliases():
+            return await self.get_response(request)
+        user_key, alias = await sync_to_async(self._route)(request)
+        token = _replica.set(alias)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _replica.reset(token)
+        self._pin_after_write(request, response, user_key)
+        return self._stream_from_replica(response, alias)
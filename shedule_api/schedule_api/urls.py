@@ -5,6 +5,7 @@ from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from django.http import JsonResponse
 from django.shortcuts import render
+from apps.core.views import database_status
 
 def api_info(request):
     return JsonResponse({
@@ -29,7 +30,18 @@ def api_info(request):
                 'list_create': '/api/v1/schedules/',
                 'detail': '/api/v1/schedules/{id}/',
                 'protected_demo': '/api/v1/schedules/protected/',
-                'statistics': '/api/v1/schedules/statistics/'
+                'statistics': '/api/v1/schedules/statistics/',
+                'active': '/api/v1/schedules/active/',
+                'member_lookup': '/api/v1/schedules/members/{id}/',
+                'export': '/api/v1/schedules/export/',
+                'free_busy': '/api/v1/schedules/free-busy/',
+                'occurrences': '/api/v1/schedules/occurrences/'
+            },
+            'async_schedules': {
+                'list': '/api/v1/async/schedules/',
+                'detail': '/api/v1/async/schedules/{id}/',
+                'protected_demo': '/api/v1/async/schedules/protected/',
+                'statistics': '/api/v1/async/schedules/statistics/'
             }
         },
         'usage': {
@@ -65,6 +77,9 @@ urlpatterns = [
     
     path('api/v1/auth/', include('apps.authentication.urls')),
     path('api/v1/schedules/', include('apps.schedules.urls')),
+    # Async read-only twins of the schedule endpoints for ASGI deployments.
+    path('api/v1/async/schedules/', include('apps.schedules.async_urls')),
+    path('api/v1/database/', database_status, name='database-status'),
    
     path('api/', api_info, name='api-info'),
     